@@ -6,18 +6,43 @@ __version__ = "2.2"
 __date__ = "2025/06/07" 
 
 import appModuleHandler
+import collections  # Pour l'origine des derniers codes exécutés
+import functools  # Pour envelopper les commandes dans la mesure de leurs performances
 import logging
 import speech
+import config
 import textInfos
+import textInfos.offsets  # Pour placer le curseur directement sur un offset
 import gui  # Pour les boîtes de dialogue
 import api
+import scriptHandler  # Pour détecter un double appui sur un raccourci
+import winUser  # Pour interroger directement la fenêtre Scintilla
 import wx
-import subprocess  # Pour lancer un terminal
 import os  # Pour manipuler les chemins de fichiers
-import keyboardHandler  # Pour simuler l'appui sur la touche Suppr
-import tempfile  # Pour créer des fichiers temporaires
-
-import re 
+import re  # Pour les erreurs de compilation des motifs de repères
+import winKernel  # Pour écrire le texte restauré dans la mémoire de Notepad++
+import ctypes  # Pour le tampon du texte restauré
+import tempfile  # Pour le répertoire temporaire
+import subprocess  # Pour ouvrir un fichier dans Notepad++
+import globalVars  # Pour le répertoire de configuration de NVDA
+
+from .nppTools.backends import backendForPath
+from .nppTools.background import OutlineBuilder
+from .nppTools.blocks import BlockRange
+from .nppTools.breadcrumb import scopeBreadcrumb, scopeLabel, whereAmI
+from .nppTools.cells import firstChangedCell, splitCells
+from .nppTools.deletions import DeletedBlock, DeletionStacks, contextDigest, contextRange
+from .nppTools.execution import STREAM_STDERR, ExecutionEngine
+from .nppTools.indentation import NO_LINE
+from .nppTools.instrumentation import CountingEditProxy, ScriptMetrics, countRoundTrip
+from .nppTools.outline import scanNearby
+from .nppTools.outlineCache import OutlineCache
+from .nppTools.projectIndex import ProjectIndexer, describeProjectSymbol
+from .nppTools.patterns import KIND_FUNCTION, KIND_CLASS, KIND_MAIN, PatternRegistry, parseLandmark
+from .nppTools.snapshot import DocumentSnapshot
+from .nppTools.streaming import OutputSpeaker
+from .nppTools.symbols import buildSymbols, describeSymbol, symbolIndexAtLine
+from .nppTools.tracebacks import documentLine
 
 # Configuration du logger
 log = logging.getLogger(__name__)
@@ -26,6 +51,88 @@ handler = logging.StreamHandler()  # Afficher les logs dans la console (le débo
 handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
 log.addHandler(handler)
 
+# Options de l'add-on, dans la section [notepadPlusPlus] de la configuration de NVDA
+confspec = {
+    "tabWidth": "integer(default=4, min=1, max=16)",  # Largeur d'une tabulation pour les commandes d'indentation
+    "snapshotTTL": "integer(default=300, min=0, max=86400)",  # Secondes de conservation du texte d'un document après la perte du focus
+    "executionTimeout": "integer(default=60, min=0, max=86400)",  # Secondes avant l'arrêt d'une exécution (0 : aucune limite)
+    "interpreterPoolSize": "integer(default=0, min=0, max=8)",  # Interpréteurs lancés à l'avance pour Control+F5 (0 : aucun)
+    "interpreterPreload": "string_list(default=list())",  # Modules importés à l'avance par ces interpréteurs
+    "interpreterMaxRuns": "integer(default=1, min=1, max=1000)",  # Exécutions avant le remplacement d'un interpréteur
+    "speakOutput": "boolean(default=True)",  # Lire la sortie de Control+F5 au fil de l'eau
+    "outputLines": "integer(default=10000, min=100, max=1000000)",  # Lignes de sortie conservées (les plus anciennes sont oubliées)
+    "syntaxCheckDelay": "integer(default=1000, min=0, max=60000)",  # Millisecondes de pause de la frappe avant la vérification de la syntaxe (0 : jamais)
+    "sessionMode": "boolean(default=False)",  # Control+F5 exécute le code dans l'interpréteur persistant du document
+    "announceScope": "boolean(default=False)",  # Annoncer la portée (classe, méthode) quand le curseur en change
+    "announceScopeDelay": "integer(default=400, min=0, max=5000)",  # Millisecondes d'immobilité du curseur avant cette annonce
+    # Dossiers et fichiers ignorés par l'index du projet (motifs fnmatch)
+    "projectExcludes": 'string_list(default=list(".git", ".hg", ".svn", "__pycache__", ".venv", "venv", ".tox", "build", "dist", "node_modules", "site-packages"))',
+    "indexWorkers": "integer(default=0, min=0, max=32)",  # Processus d'analyse des fichiers du projet (0 : un par processeur)
+    "outlineCacheSize": "integer(default=64, min=0, max=4096)",  # Mo de structures de documents conservées sur disque (0 : aucun cache)
+    # Repères de navigation : "nom|motif|raccourci suivant|raccourci précédent"
+    "landmarks": 'string_list(default=list("cell|# ?%%|kb:alt+pageDown|kb:alt+pageUp", "region|# ?region|kb:control+alt+pageDown|kb:control+alt+pageUp"))',
+}
+config.conf.spec["notepadPlusPlus"] = confspec
+
+
+def _loadLandmarks():
+    """
+    Lit les repères de navigation configurés ; un repère invalide, ou dont
+    le motif empêche la compilation du registre, est ignoré.
+
+    Returns
+    -------
+    list of Landmark
+        Les repères valides, dans l'ordre de la configuration.
+    """
+    landmarks = []
+    for spec in config.conf["notepadPlusPlus"]["landmarks"]:
+        try:
+            landmark = parseLandmark(spec)
+        except ValueError as e:
+            log.error(f"Repère ignoré : {e}")
+            continue
+        if any(known.name == landmark.name for known in landmarks):
+            log.error(f"Repère ignoré : le nom {landmark.name} est déjà utilisé.")
+            continue
+        try:
+            # Un repère qui empêcherait la compilation du registre le rendrait inutilisable
+            PatternRegistry(landmarks + [landmark])
+        except re.error as e:
+            log.error(f"Repère ignoré : le motif du repère {landmark.name} est incompatible avec les autres motifs : {e}")
+            continue
+        landmarks.append(landmark)
+    return landmarks
+
+
+# Repères configurés et motifs de structure, compilés une seule fois au chargement
+LANDMARKS = _loadLandmarks()
+PATTERNS = PatternRegistry(LANDMARKS)
+
+# Repère des cellules exécutées une à une en mode session
+CELL_LANDMARK = "cell"
+
+# Nombre de fichiers exécutés dont l'origine (document, première ligne) est conservée
+RUN_ORIGINS = 256
+
+# Message Scintilla : longueur du document (dans l'unité des offsets du TextInfo)
+SCI_GETTEXTLENGTH = 2183
+
+# Messages Scintilla : suppression et insertion d'une zone, page de code du document
+SCI_DELETERANGE = 2645
+SCI_INSERTTEXT = 2003
+SCI_GETCODEPAGE = 2137
+SC_CP_UTF8 = 65001
+
+# Répertoire des index de projet, dans la configuration de NVDA
+PROJECT_INDEX_DIRECTORY = os.path.join(globalVars.appArgs.configPath, "notepadPlusPlus", "projects")
+
+# Répertoire du cache des structures des documents, dans la configuration de NVDA
+OUTLINE_CACHE_DIRECTORY = os.path.join(globalVars.appArgs.configPath, "notepadPlusPlus", "outlines")
+
+# Nombre maximal de lignes lues par la recherche de repli, tant que l'outline n'est pas prêt
+SYNC_SCAN_LINES = 2000
+
 
 class AppModule(appModuleHandler.AppModule):
 
@@ -44,6 +151,51 @@ class AppModule(appModuleHandler.AppModule):
         super().__init__(*args, **kwargs)
         log.debug("Module Notepad++ chargé avec succès.")
         self.edit = None  # Initialiser l'objet d'édition
+        self._snapshots = {}  # Snapshots du document (texte et structures) par fenêtre d'édition
+        self._outlineBuilder = OutlineBuilder()  # Construit les outlines hors du thread principal
+        # Structures des gros documents conservées sur disque d'une session à l'autre
+        cacheSize = config.conf["notepadPlusPlus"]["outlineCacheSize"]
+        self._outlineCache = OutlineCache(OUTLINE_CACHE_DIRECTORY, cacheSize * 1024 * 1024) if cacheSize else None
+        self._metrics = ScriptMetrics()  # Mesures de performance de chaque commande
+        self._executionEngine = ExecutionEngine()  # Exécute le code python, sortie capturée
+        # Lit la sortie au fil de l'eau, regroupée et à débit limité
+        self._outputSpeaker = OutputSpeaker(lambda message: wx.CallAfter(speech.speakMessage, message))
+        self._executionEngine.onOutput = self._streamOutputLine
+        self._runOrigins = collections.OrderedDict()  # Document et première ligne du code de chaque fichier exécuté
+        self._errorFrames = []  # Appels de la dernière trace d'appels, du plus interne au plus externe
+        self._errorFrameIndex = -1
+        self._syntaxTimer = None  # Vérification de la syntaxe après une pause de la frappe
+        self._scopeTimer = None  # Annonce de la portée après une pause du curseur
+        self._announcedScope = None  # Dernière portée annoncée (type, nom, ligne)
+        self._deletedBlocks = DeletionStacks()  # Blocs supprimés de chaque document, restaurables
+        self._projectIndexer = ProjectIndexer(PROJECT_INDEX_DIRECTORY)  # Index des déclarations du dossier du document
+        self._configureExecution()  # Lance les interpréteurs préchargés, si l'option est activée
+        # Raccourcis des repères configurés
+        for landmark in LANDMARKS:
+            for gestureId, forward in ((landmark.nextGesture, True), (landmark.previousGesture, False)):
+                if not gestureId:
+                    continue
+                try:
+                    self.bindGesture(gestureId, _landmarkScriptName(landmark, forward))
+                except Exception as e:
+                    log.error(f"Raccourci {gestureId} du repère {landmark.name} ignoré : {e}")
+
+
+    def terminate(self):
+        """
+        Arrête le thread de construction des outlines, l'exécution en cours,
+        les interpréteurs préchargés et l'indexation du projet lorsque le
+        module est déchargé.
+        """
+        if self._syntaxTimer is not None:
+            self._syntaxTimer.Stop()
+        if self._scopeTimer is not None:
+            self._scopeTimer.Stop()
+        self._outlineBuilder.stop()
+        self._executionEngine.terminate()
+        self._outputSpeaker.stop()
+        self._projectIndexer.stop()
+        super().terminate()
 
 
     def event_gainFocus(self, obj, nextHandler):
@@ -58,7 +210,100 @@ class AppModule(appModuleHandler.AppModule):
             Fonction à appeler après le traitement de l'événement.
         """
         self.edit = obj  # Enregistrer l'objet d'édition
+        if obj.windowClassName == "Scintilla":
+            try:
+                # Lire le document maintenant : son outline se construit en arrière-plan
+                self._getSnapshot()
+            except Exception as e:
+                log.error(f"Erreur lors de la préparation de l'outline : {e}")
+        nextHandler()
+
+
+    def event_typedCharacter(self, obj, nextHandler, ch):
+        """
+        Programme la vérification de la syntaxe après une pause de la frappe.
+
+        Chaque caractère tapé repousse la vérification : elle n'a lieu
+        qu'une fois la frappe interrompue pendant le délai configuré.
+
+        Parameters
+        ----------
+        obj : object
+            L'objet NVDA dans lequel le caractère a été tapé.
+        nextHandler : function
+            Fonction à appeler après le traitement de l'événement.
+        ch : str
+            Le caractère tapé.
+        """
+        delay = config.conf["notepadPlusPlus"]["syntaxCheckDelay"]
+        if delay and obj.windowClassName == "Scintilla":
+            if self._syntaxTimer is not None and self._syntaxTimer.IsRunning():
+                self._syntaxTimer.Restart(delay)
+            else:
+                self._syntaxTimer = wx.CallLater(delay, self._checkSyntaxLater)
+        nextHandler()
+
+
+    def _checkSyntaxLater(self):
+        """
+        Relit le document après une pause de la frappe : son outline et sa
+        syntaxe sont analysés en arrière-plan, dans le snapshot que les
+        commandes réutiliseront.
+        """
+        if not self.edit or self.edit.windowClassName != "Scintilla":
+            return
+        try:
+            self._getSnapshot()
+        except Exception as e:
+            log.error(f"Erreur lors de la préparation de la vérification de la syntaxe : {e}")
+
+
+    def event_caret(self, obj, nextHandler):
+        """
+        Programme l'annonce de la portée du curseur, si l'option est activée.
+
+        Chaque déplacement du curseur repousse l'annonce : elle n'a lieu
+        qu'une fois le curseur immobile pendant le délai configuré, et
+        seulement si la portée a changé depuis la dernière annonce.
+
+        Parameters
+        ----------
+        obj : object
+            L'objet NVDA dont le curseur a bougé.
+        nextHandler : function
+            Fonction à appeler après le traitement de l'événement.
+        """
         nextHandler()
+        options = config.conf["notepadPlusPlus"]
+        if options["announceScope"] and obj.windowClassName == "Scintilla":
+            delay = options["announceScopeDelay"]
+            if self._scopeTimer is not None and self._scopeTimer.IsRunning():
+                self._scopeTimer.Restart(delay)
+            else:
+                self._scopeTimer = wx.CallLater(delay, self._announceScopeChange)
+
+
+    def _announceScopeChange(self):
+        """
+        Annonce le fil d'Ariane de la portée du curseur lorsqu'elle a changé.
+
+        Seul un arbre des portées déjà calculé en arrière-plan est utilisé :
+        tant qu'il ne l'est pas, rien n'est annoncé plutôt que de retarder NVDA.
+        """
+        if not self.edit or self.edit.windowClassName != "Scintilla":
+            return
+        try:
+            snapshot, caretLine = self._getSnapshot()
+            tree = snapshot.readyScopeTree
+            if tree is None:
+                return
+            scope = tree.scopeAt(caretLine)
+            identity = (scope.kind, scope.name, scope.line) if scope is not None else None
+            if identity != self._announcedScope:
+                self._announcedScope = identity
+                speech.speakMessage(scopeBreadcrumb(scope))
+        except Exception as e:
+            log.error(f"Erreur lors de l'annonce de la portée : {e}")
 
 
     def event_loseFocus(self, obj, nextHandler):
@@ -73,23 +318,301 @@ class AppModule(appModuleHandler.AppModule):
             Fonction à appeler après le traitement de l'événement.
         """
         self.edit = None  # Nettoyer l'objet d'édition
+        self._evictSnapshots()  # Oublier les documents inutilisés depuis trop longtemps
         nextHandler()
 
-    def _getIndentationLevel(self, lineText):
+    def _readSnapshot(self, backend, previous=None, edit=None):
+        """
+        Lit le texte complet du document en un seul appel et en fait un snapshot.
+
+        Parameters
+        ----------
+        backend : StructureBackend
+            Le moteur de structure du langage du document.
+        previous : DocumentSnapshot, optional
+            Le snapshot périmé de la même fenêtre, dont l'outline est repris.
+        edit : object, optional
+            L'objet d'édition à lire, self.edit par défaut.
+
+        Returns
+        -------
+        DocumentSnapshot
+            Le nouveau snapshot du document.
+        """
+        allInfo = (edit or self.edit).makeTextInfo(textInfos.POSITION_ALL)
+        text = allInfo.text
+        endOffset = allInfo.bookmark.endOffset
+        # Offsets en octets (document UTF-8) plutôt qu'en caractères
+        log.debug("Lecture complète du document.")
+        return DocumentSnapshot(text, endOffset != len(text), endOffset, previous, PATTERNS, self._outlineCache, backend)
+
+
+    def _readRange(self, start, end, edit=None):
+        """
+        Lit une courte zone du document, entre deux offsets.
+
+        Parameters
+        ----------
+        start, end : int
+            Les offsets de début et de fin de la zone.
+        edit : object, optional
+            L'objet d'édition à lire, self.edit par défaut (voir _removeBlock).
+        """
+        return (edit or self.edit).makeTextInfo(textInfos.offsets.Offsets(start, end)).text
+
+
+    def _getSnapshot(self, edit=None, document=None):
+        """
+        Retourne le snapshot à jour du document et la ligne du curseur.
+
+        Le snapshot de la fenêtre d'édition est réutilisé tant que la longueur
+        du document et les zones échantillonnées (dont la ligne du curseur)
+        n'ont pas changé : le texte complet n'est relu qu'après une modification,
+        et l'outline du nouveau snapshot est alors construit en arrière-plan.
+        Le moteur de structure est choisi selon l'extension du document affiché
+        (un changement d'extension, par "Enregistrer sous", relit le document).
+
+        Parameters
+        ----------
+        edit : object, optional
+            L'objet d'édition du document, self.edit par défaut (il vaut None
+            tant qu'une boîte de dialogue ouverte par une commande a le focus).
+        document : str, optional
+            Le document (voir _documentPath), lu dans le titre de la fenêtre par défaut.
+
+        Returns
+        -------
+        tuple of (DocumentSnapshot, int)
+            Le snapshot du document et le numéro (à partir de 0) de la ligne
+            contenant le curseur.
+        """
+        edit = edit or self.edit
+        key = edit.windowHandle
+        snapshot = self._snapshots.get(key)
+        backend = backendForPath(document if document is not None else self._documentPath())
+        caretOffset = edit.makeTextInfo(textInfos.POSITION_CARET).bookmark.startOffset
+        if snapshot is not None and snapshot.backend is backend:
+            endOffset = winUser.sendMessage(key, SCI_GETTEXTLENGTH, 0, 0)
+            countRoundTrip()
+            caretLine = None
+            if caretOffset <= snapshot.endOffset:
+                caretLine = snapshot.lineAt(snapshot.offsetToIndex(caretOffset))
+            readRange = functools.partial(self._readRange, edit=edit)
+            if caretLine is not None and snapshot.matches(endOffset, readRange, (snapshot.sampleLine(caretLine),)):
+                snapshot.touch()
+                return snapshot, caretLine
+        snapshot = self._readSnapshot(backend, snapshot, edit)
+        self._snapshots[key] = snapshot
+        self._outlineBuilder.submit(key, snapshot, self._tabWidth())
+        return snapshot, snapshot.lineAt(snapshot.offsetToIndex(caretOffset))
+
+
+    def _evictSnapshots(self):
+        """
+        Oublie les snapshots qui n'ont pas servi depuis le délai configuré.
+        """
+        ttl = config.conf["notepadPlusPlus"]["snapshotTTL"]
+        for key, snapshot in list(self._snapshots.items()):
+            if snapshot.isExpired(ttl):
+                del self._snapshots[key]
+                log.debug(f"Snapshot de la fenêtre {key} oublié.")
+
+
+    def _moveCaretToOffset(self, offset, edit=None):
+        """
+        Déplace le curseur directement à un offset du document.
+
+        Parameters
+        ----------
+        offset : int
+            L'offset de destination dans le document.
+        edit : object, optional
+            L'objet d'édition du document, self.edit par défaut.
+        """
+        targetInfo = (edit or self.edit).makeTextInfo(textInfos.offsets.Offsets(offset, offset))
+        targetInfo.updateCaret()
+
+
+    def _tabWidth(self):
+        # Largeur de tabulation configurée pour les commandes d'indentation
+        return config.conf["notepadPlusPlus"]["tabWidth"]
+
+
+    def _nearbyScopes(self, snapshot, caretLine, blocks=False):
+        """
+        Choisit le snapshot dont l'arbre des portées répond sans retarder NVDA.
+
+        L'arbre du document est utilisé s'il est déjà calculé en arrière-plan,
+        ou si le document est petit. Sinon, une fenêtre bornée autour du
+        curseur, limitée grâce à l'outline à des instructions de premier
+        niveau, est analysée : les portées qui contiennent le curseur y sont
+        complètes (voir DocumentSnapshot.window).
+
+        Parameters
+        ----------
+        snapshot : DocumentSnapshot
+            Le snapshot du document.
+        caretLine : int
+            La ligne du curseur.
+        blocks : bool
+            Si True, la table des blocs du document doit aussi être prête.
+
+        Returns
+        -------
+        tuple or None
+            Le snapshot à interroger (le document ou la fenêtre) et le numéro
+            de sa première ligne dans le document, ou None si l'outline
+            n'est pas prêt ou si aucune fenêtre ne convient.
+        """
+        ready = snapshot.readyScopeTree is not None and (not blocks or snapshot.hasBlockExtents(self._tabWidth()))
+        # Sur un petit document, la construction complète ne coûte pas plus que la fenêtre
+        if ready or snapshot.lineCount <= SYNC_SCAN_LINES:
+            return snapshot, 0
+        log.debug("Arbre des portées pas encore prêt : analyse d'une fenêtre autour du curseur.")
+        return snapshot.window(caretLine, SYNC_SCAN_LINES)
+
+
+    def _resolveBlock(self, kinds, onDeclaration=False):
+        """
+        Résout l'étendue de la portée la plus interne des types donnés
+        contenant le curseur.
+
+        La portée vient de l'arbre des portées du snapshot, ou d'une fenêtre
+        autour du curseur s'il n'est pas prêt (voir _nearbyScopes), et son
+        étendue de la table des fins de bloc (python) ou de ses accolades.
+        Faute de fenêtre, l'outline est attendu, puis l'arbre complet si
+        aucune fenêtre ne convient.
+
+        Parameters
+        ----------
+        kinds : tuple of str
+            Les types de portée recherchés (voir nppTools.structure).
+        onDeclaration : bool
+            Si True, le curseur doit être sur la déclaration ou ses décorateurs.
+
+        Returns
+        -------
+        tuple or None
+            Le snapshot et l'étendue du bloc (BlockRange), ou None si aucune
+            portée ne convient.
+        """
+        snapshot, caretLine = self._getSnapshot()
+        nearby = self._nearbyScopes(snapshot, caretLine, blocks=True)
+        if nearby is None:
+            # L'outline, bien moins coûteux que l'arbre des portées, suffit à délimiter la fenêtre
+            log.debug("Aucune fenêtre autour du curseur : attente de l'outline.")
+            snapshot.outline
+            nearby = snapshot.window(caretLine, SYNC_SCAN_LINES) or (snapshot, 0)
+        scopes, firstLine = nearby
+        line = caretLine - firstLine
+        scope = scopes.scopeTree.scopeAt(line, kinds)
+        if scope is None or (onDeclaration and line > scope.line):
+            return None
+        block = scopes.blockRange(scope, self._tabWidth())
+        if scopes is not snapshot:
+            # Lignes et indices de la fenêtre ramenés au document
+            base = snapshot.lineStarts[firstLine]
+            block = BlockRange(
+                block.line + firstLine, block.startLine + firstLine, block.endLine + firstLine,
+                block.startIndex + base, block.endIndex + base
+            )
+        return snapshot, block
+
+
+    def _selectBlock(self, kinds, onDeclaration=False):
+        """
+        Sélectionne la portée la plus interne des types donnés contenant le curseur.
+
+        La sélection couvre les décorateurs, la déclaration et tout le corps,
+        et elle est appliquée en un seul appel à updateSelection.
+
+        Parameters
+        ----------
+        kinds : tuple of str
+            Les types de portée recherchés (voir nppTools.structure).
+        onDeclaration : bool
+            Si True, le curseur doit être sur la déclaration ou ses décorateurs.
+
+        Returns
+        -------
+        BlockRange or None
+            L'étendue sélectionnée, ou None si aucune portée ne convient.
+        """
+        resolved = self._resolveBlock(kinds, onDeclaration)
+        if resolved is None:
+            return None
+        snapshot, block = resolved
+        start = snapshot.indexToOffset(block.startIndex)
+        end = snapshot.indexToOffset(block.endIndex)
+        self.edit.makeTextInfo(textInfos.offsets.Offsets(start, end)).updateSelection()
+        return block
+
+
+    def _getIndentationContext(self):
+        """
+        Retourne ce dont ont besoin les commandes d'indentation.
+
+        Returns
+        -------
+        tuple
+            Le snapshot du document, son profil d'indentation et la ligne du
+            curseur.
+        """
+        snapshot, caretLine = self._getSnapshot()
+        return snapshot, snapshot.indentationProfile(self._tabWidth()), caretLine
+
+
+    def _moveCaretToLineStart(self, snapshot, profile, line):
+        """
+        Place le curseur sur le premier caractère non blanc d'une ligne.
+        """
+        self._moveCaretToOffset(snapshot.indexToOffset(profile.firstCharIndex(line)))
+
+
+    def _moveToOutlineEntry(self, kinds, forward):
         """
-        Retourne le niveau d'indentation d'une ligne de texte.
+        Déplace le curseur vers la déclaration suivante ou précédente.
+
+        Le snapshot du document est réutilisé tant qu'il est à jour. Si son
+        outline n'est pas encore prêt (construction en arrière-plan), une
+        recherche bornée autour du curseur répond d'abord ; l'outline n'est
+        attendu que si elle ne trouve rien. Le curseur n'est déplacé qu'une
+        fois, directement sur la cible.
 
         Parameters
         ----------
-        lineText : str
-            La ligne de texte à analyser.
+        kinds : tuple of str
+            Les types de déclaration recherchés (voir nppTools.outline).
+        forward : bool
+            True pour chercher après le curseur, False pour chercher avant.
 
         Returns
         -------
-        int
-            Le niveau d'indentation de la ligne.
+        OutlineEntry or None
+            La déclaration atteinte, ou None si aucune n'a été trouvée.
         """
-        return len(lineText) - len(lineText.lstrip())
+        snapshot, caretLine = self._getSnapshot()
+        outline = snapshot.readyOutline
+        entry = None
+        # Sur un petit document, la construction complète ne coûte pas plus que la recherche bornée
+        if (
+            outline is None and snapshot.backend.incremental
+            and not snapshot.hasBaseOutline and snapshot.lineCount > SYNC_SCAN_LINES
+        ):
+            entry = scanNearby(snapshot.text, snapshot.lineStarts, caretLine, kinds, forward, SYNC_SCAN_LINES, PATTERNS)
+            if entry is None:
+                log.debug("Outline pas encore prêt : construction sur le thread principal.")
+        if entry is None:
+            # Outline prêt, mise à jour incrémentale rapide, ou attente de la construction
+            outline = snapshot.outline
+            if forward:
+                entry = outline.findNext(caretLine, kinds)
+            else:
+                entry = outline.findPrevious(caretLine, kinds)
+        if entry is not None:
+            self._moveCaretToOffset(snapshot.indexToOffset(entry.offset))
+        return entry
+
     
     def script_moveToNextFunction(self, gesture):
         """
@@ -107,50 +630,13 @@ class AppModule(appModuleHandler.AppModule):
         # Vérifier si l'objet d'édition est disponible
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLine = caretInfo.bookmark.startOffset  # Position de départ de la ligne actuelle
-
-
-                # Parcourir les lignes suivantes pour trouver la déclaration de fonction
-                while True:
-                    # Déplacer le curseur à la ligne suivante
-                    caretInfo.move(textInfos.UNIT_LINE, 1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text.strip()  # Obtenir le texte de la ligne
-
-
-                    # Vérifier si la ligne commence par "def " (déclaration de fonction Python)
-                    # FLB 2025-06-07
-                    # if lineText.startswith("def "):
-                    if re.match(r"^\s*(async\s+)?def\s+", lineText):
-                        # Déplacer le curseur au début de la ligne
-                        caretInfo.updateCaret()
-                        # FLB 1 : deplacement du curseur au niveau de def 
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' '))
-                        # lineText
-                        # log.debug(f"Line text : {caretInfo.text}")
-                        # log.debug(f"Len : {len(caretInfo.text)}")
-                        # log.debug(f"caret offset : {caretOffset}")
-                        # move caret close to def  
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret()
-                        
-                        log.debug(f"Déclaration de fonction suivante trouvée : {lineText}")
-                        speech.speakMessage(f"{lineText}")
-                        break
-
-
-                    # Si on atteint la fin du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset <= currentLine:
-                        log.debug("Aucune déclaration de fonction suivante trouvée.")
-                        speech.speakMessage("Aucune déclaration de fonction suivante trouvée.")
-                        break
-
-
-                    # Mettre à jour la position actuelle pour éviter les boucles infinies
-                    currentLine = caretInfo.bookmark.startOffset
+                entry = self._moveToOutlineEntry((KIND_FUNCTION,), forward=True)
+                if entry:
+                    log.debug(f"Déclaration de fonction suivante trouvée : {entry.text}")
+                    speech.speakMessage(f"{entry.text}")
+                else:
+                    log.debug("Aucune déclaration de fonction suivante trouvée.")
+                    speech.speakMessage("Aucune déclaration de fonction suivante trouvée.")
 
 
             except Exception as e:
@@ -178,46 +664,13 @@ class AppModule(appModuleHandler.AppModule):
         # Vérifier si l'objet d'édition est disponible
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLine = caretInfo.bookmark.startOffset  # Position de départ de la ligne actuelle
-
-
-                # Parcourir les lignes précédentes pour trouver la déclaration de fonction
-                while True:
-                    # Déplacer le curseur à la ligne précédente
-                    caretInfo.move(textInfos.UNIT_LINE, -1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text.strip()  # Obtenir le texte de la ligne
-
-
-                    # Vérifier si la ligne commence par "def " (déclaration de fonction Python)
-                    # FLB 2025-06-07
-                    # if lineText.startswith("def "):
-                    if re.match(r"^\s*(async\s+)?def\s+", lineText):
-                        # Déplacer le curseur au début de la ligne
-                        caretInfo.updateCaret()
-                        log.debug(f"Déclaration de fonction précédente trouvée : {lineText}")
-                        # FLB 2 : deplacement du curseur vers le haut 
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' ')) 
-                        # move caret close to def  
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret()
-                        
-                        speech.speakMessage(f"{lineText}")
-                        break
-
-
-                    # Si on atteint le début du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset >= currentLine:
-                        log.debug("Aucune déclaration de fonction précédente trouvée.")
-                        speech.speakMessage("Aucune déclaration de fonction précédente trouvée.")
-                        break
-
-
-                    # Mettre à jour la position actuelle pour éviter les boucles infinies
-                    currentLine = caretInfo.bookmark.startOffset
+                entry = self._moveToOutlineEntry((KIND_FUNCTION,), forward=False)
+                if entry:
+                    log.debug(f"Déclaration de fonction précédente trouvée : {entry.text}")
+                    speech.speakMessage(f"{entry.text}")
+                else:
+                    log.debug("Aucune déclaration de fonction précédente trouvée.")
+                    speech.speakMessage("Aucune déclaration de fonction précédente trouvée.")
 
 
             except Exception as e:
@@ -238,51 +691,20 @@ class AppModule(appModuleHandler.AppModule):
         gesture : object
             L'événement de raccourci clavier déclenchant cette action.
         """
-    # Envoyer un message dans le journal de NVDA
+        # Envoyer un message dans le journal de NVDA
         log.debug("Raccourci DETECTE (F7)")
 
 
-    # Vérifier si l'objet d'édition est disponible
+        # Vérifier si l'objet d'édition est disponible
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLine = caretInfo.bookmark.startOffset  # Position de départ de la ligne actuelle
-
-
-                # Parcourir les lignes suivantes pour trouver la déclaration de classe
-                while True:
-                    # Déplacer le curseur à la ligne suivante
-                    caretInfo.move(textInfos.UNIT_LINE, 1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text.strip()  # Obtenir le texte de la ligne
-
-
-                    # Vérifier si la ligne commence par "class " (déclaration de classe Python)
-                    if lineText.startswith("class "):
-                        # Déplacer le curseur au début de la ligne
-                        caretInfo.updateCaret()
-                        # FLB 3 : deplacement du curseur vers le base definition de classe 
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' ')) 
-                        # move caret close to def  
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret() 
-
-                        log.debug(f"Déclaration de classe suivante trouvée : {lineText}")
-                        speech.speakMessage(f"Déclaration de classe suivante trouvée : {lineText}")
-                        break
-
-
-                    # Si on atteint la fin du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset <= currentLine:
-                        log.debug("Aucune déclaration de classe suivante trouvée.")
-                        speech.speakMessage("Aucune déclaration de classe suivante trouvée.")
-                        break
-
-
-                    # Mettre à jour la position actuelle pour éviter les boucles infinies
-                    currentLine = caretInfo.bookmark.startOffset
+                entry = self._moveToOutlineEntry((KIND_CLASS,), forward=True)
+                if entry:
+                    log.debug(f"Déclaration de classe suivante trouvée : {entry.text}")
+                    speech.speakMessage(f"Déclaration de classe suivante trouvée : {entry.text}")
+                else:
+                    log.debug("Aucune déclaration de classe suivante trouvée.")
+                    speech.speakMessage("Aucune déclaration de classe suivante trouvée.")
 
 
             except Exception as e:
@@ -310,44 +732,13 @@ class AppModule(appModuleHandler.AppModule):
         # Vérifier si l'objet d'édition est disponible
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLine = caretInfo.bookmark.startOffset  # Position de départ de la ligne actuelle
-
-
-                # Parcourir les lignes précédentes pour trouver la déclaration de classe
-                while True:
-                    # Déplacer le curseur à la ligne précédente
-                    caretInfo.move(textInfos.UNIT_LINE, -1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text.strip()  # Obtenir le texte de la ligne
-
-
-                    # Vérifier si la ligne commence par "class " (déclaration de classe Python)
-                    if lineText.startswith("class "):
-                        # Déplacer le curseur au début de la ligne
-                        caretInfo.updateCaret()
-                        # FLB 3 : deplacement du curseur vers le bas pour la classe precedent  
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' ')) 
-                        # move caret close to classe   
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret()
-                        
-                        log.debug(f"Déclaration de classe précédente trouvée : {lineText}")
-                        speech.speakMessage(f"{lineText}")
-                        break
-
-
-                    # Si on atteint le début du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset >= currentLine:
-                        log.debug("Aucune déclaration de classe précédente trouvée.")
-                        speech.speakMessage("Aucune déclaration de classe précédente trouvée.")
-                        break
-
-
-                    # Mettre à jour la position actuelle pour éviter les boucles infinies
-                    currentLine = caretInfo.bookmark.startOffset
+                entry = self._moveToOutlineEntry((KIND_CLASS,), forward=False)
+                if entry:
+                    log.debug(f"Déclaration de classe précédente trouvée : {entry.text}")
+                    speech.speakMessage(f"{entry.text}")
+                else:
+                    log.debug("Aucune déclaration de classe précédente trouvée.")
+                    speech.speakMessage("Aucune déclaration de classe précédente trouvée.")
 
 
             except Exception as e:
@@ -367,27 +758,11 @@ class AppModule(appModuleHandler.AppModule):
 
         if self.edit:
             try:
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)
-                currentOffset = caretInfo.bookmark.startOffset
-
-                while True:
-                    caretInfo.move(textInfos.UNIT_LINE, 1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text.strip()
-
-                    if lineText.startswith("if __name__") and "__main__" in lineText:
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' '))
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret()
-                        log.debug("Ligne principale trouvée : " + lineText)
-                        speech.speakMessage("Bloc principal trouvé.")
-                        return
-
-                    # Fin du document atteinte
-                    if caretInfo.bookmark.startOffset <= currentOffset:
-                        break
-                    currentOffset = caretInfo.bookmark.startOffset
+                entry = self._moveToOutlineEntry((KIND_MAIN,), forward=True)
+                if entry:
+                    log.debug("Ligne principale trouvée : " + entry.text)
+                    speech.speakMessage("Bloc principal trouvé.")
+                    return
 
                 log.debug("Ligne if __name__ == '__main__': non trouvée.")
                 speech.speakMessage("Ligne if name égal main non trouvée.")
@@ -398,14 +773,671 @@ class AppModule(appModuleHandler.AppModule):
         else:
             log.debug("Aucun objet d'édition trouvé.")
 
-    script_jumpToMain.__doc__ = _("Déplace le curseur vers la ligne principale if __name__ == '__main__'")
-    script_jumpToMain.category = "Notepad++"
+    script_jumpToMain.__doc__ = _("Déplace le curseur vers la ligne principale if __name__ == '__main__'")
+    script_jumpToMain.category = "Notepad++"
+
+
+    def script_reportCurrentScope(self, gesture):
+        """
+        Annonce les portées qui contiennent le curseur, de la plus externe à
+        la plus interne, puis la ligne du curseur.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Control+F7)")
+
+        if self.edit:
+            try:
+                snapshot, caretLine = self._getSnapshot()
+                nearby = self._nearbyScopes(snapshot, caretLine)
+                if nearby is None:
+                    speech.speakMessage("Analyse du document en cours.")
+                    return
+                scopes, firstLine = nearby
+                scope = scopes.scopeTree.scopeAt(caretLine - firstLine)
+                self._announcedScope = (scope.kind, scope.name, scope.line + firstLine) if scope is not None else None
+                speech.speakMessage(whereAmI(scope, caretLine, snapshot.lineCount))
+            except Exception as e:
+                log.error(f"Erreur lors de l'annonce de la portée : {e}")
+                speech.speakMessage("Erreur lors de l'annonce de la portée.")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_reportCurrentScope.__doc__ = _("Annonce la classe et la fonction qui contiennent le curseur, puis sa ligne.")
+    script_reportCurrentScope.category = "Notepad++"
+
+
+    def script_toggleScopeAnnouncement(self, gesture):
+        """
+        Active ou désactive l'annonce automatique de la portée du curseur.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Control+Shift+F7)")
+
+        options = config.conf["notepadPlusPlus"]
+        options["announceScope"] = not options["announceScope"]
+        self._announcedScope = None
+        speech.speakMessage("Annonce de la portée activée." if options["announceScope"] else "Annonce de la portée désactivée.")
+
+    script_toggleScopeAnnouncement.__doc__ = _("Active ou désactive l'annonce automatique de la classe et de la fonction du curseur quand il en change.")
+    script_toggleScopeAnnouncement.category = "Notepad++"
+
+
+    def _moveToRelatedScope(self, find, missing):
+        """
+        Déplace le curseur sur la déclaration d'une portée voisine de celle du
+        curseur, trouvée dans l'arbre des portées du snapshot ou d'une fenêtre
+        autour du curseur (voir _nearbyScopes), et l'annonce.
+
+        Les lignes vides, les commentaires et les lignes continuées ne
+        comptent pas : seules les portées (classes, fonctions, bloc __main__)
+        sont parcourues, et le curseur est déplacé en une seule mise à jour.
+
+        Parameters
+        ----------
+        find : callable
+            Reçoit l'arbre des portées et la ligne du curseur, retourne la
+            portée de destination ou None.
+        missing : str
+            Le message annoncé si aucune portée ne convient.
+        """
+        snapshot, caretLine = self._getSnapshot()
+        nearby = self._nearbyScopes(snapshot, caretLine)
+        if nearby is None:
+            speech.speakMessage("Analyse du document en cours.")
+            return
+        scopes, firstLine = nearby
+        tree = scopes.scopeTree
+        scope = find(tree, caretLine - firstLine)
+        if scope is None:
+            # Une fenêtre partielle ne permet pas de conclure : la portée peut se trouver au-delà
+            speech.speakMessage(missing if scopes is snapshot else "Analyse du document en cours.")
+            return
+        self._moveCaretToOffset(snapshot.indexToOffset(snapshot.lineStarts[firstLine] + tree.declarationIndex(scope)))
+        speech.speakMessage(f"{scopeLabel(scope)}, ligne {scope.line + firstLine + 1}")
+
+
+    def script_moveToNextSibling(self, gesture):
+        """
+        Déplace le curseur sur la déclaration de la portée sœur suivante : la
+        classe ou fonction suivante de même niveau que celle du curseur.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (NVDA+Alt+Down)")
+
+        if self.edit:
+            try:
+                self._moveToRelatedScope(lambda tree, line: tree.siblingAt(line, True), "Aucune portée suivante de même niveau.")
+            except Exception as e:
+                log.error(f"Erreur lors de la recherche de la portée sœur suivante : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_moveToNextSibling.__doc__ = _("Déplace le curseur vers la classe ou la fonction suivante de même niveau.")
+    script_moveToNextSibling.category = "Notepad++"
+
+
+    def script_moveToPreviousSibling(self, gesture):
+        """
+        Déplace le curseur sur la déclaration de la portée sœur précédente.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (NVDA+Alt+Up)")
+
+        if self.edit:
+            try:
+                self._moveToRelatedScope(lambda tree, line: tree.siblingAt(line, False), "Aucune portée précédente de même niveau.")
+            except Exception as e:
+                log.error(f"Erreur lors de la recherche de la portée sœur précédente : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_moveToPreviousSibling.__doc__ = _("Déplace le curseur vers la classe ou la fonction précédente de même niveau.")
+    script_moveToPreviousSibling.category = "Notepad++"
+
+
+    def script_moveToParentScope(self, gesture):
+        """
+        Déplace le curseur sur la déclaration de la portée englobante : celle
+        qui contient le curseur depuis son corps, sa parente depuis sa
+        déclaration.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (NVDA+Alt+Left)")
+
+        if self.edit:
+            try:
+                self._moveToRelatedScope(lambda tree, line: tree.parentAt(line), "Niveau du module.")
+            except Exception as e:
+                log.error(f"Erreur lors de la recherche de la portée englobante : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_moveToParentScope.__doc__ = _("Déplace le curseur vers la déclaration de la classe ou de la fonction englobante.")
+    script_moveToParentScope.category = "Notepad++"
+
+
+    def script_moveToFirstChildScope(self, gesture):
+        """
+        Déplace le curseur sur la déclaration de la première portée enfant de
+        la portée du curseur.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (NVDA+Alt+Right)")
+
+        if self.edit:
+            try:
+                self._moveToRelatedScope(lambda tree, line: tree.childAt(line), "Aucune portée enfant.")
+            except Exception as e:
+                log.error(f"Erreur lors de la recherche de la première portée enfant : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_moveToFirstChildScope.__doc__ = _("Déplace le curseur vers la première classe ou fonction contenue dans la portée du curseur.")
+    script_moveToFirstChildScope.category = "Notepad++"
+
+
+    def script_moveToLastChildScope(self, gesture):
+        """
+        Déplace le curseur sur la déclaration de la dernière portée enfant de
+        la portée du curseur.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (NVDA+Alt+Shift+Right)")
+
+        if self.edit:
+            try:
+                self._moveToRelatedScope(lambda tree, line: tree.childAt(line, last=True), "Aucune portée enfant.")
+            except Exception as e:
+                log.error(f"Erreur lors de la recherche de la dernière portée enfant : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_moveToLastChildScope.__doc__ = _("Déplace le curseur vers la dernière classe ou fonction contenue dans la portée du curseur.")
+    script_moveToLastChildScope.category = "Notepad++"
+
+
+    def script_showQuickOutline(self, gesture):
+        """
+        Ouvre la liste des classes, fonctions et méthodes du document, filtrable
+        au clavier ; le symbole choisi reçoit le curseur en un seul déplacement.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Alt+F7)")
+
+        if self.edit:
+            try:
+                # Importée à la demande : la boîte de dialogue n'est pas utile aux autres commandes
+                from .nppTools.symbolDialog import SymbolDialog
+
+                snapshot, caretLine = self._getSnapshot()
+                symbols = buildSymbols(snapshot.outline.entries, PATTERNS)
+                if not symbols:
+                    speech.speakMessage("Aucun symbole dans le document.")
+                    return
+                dialog = SymbolDialog(
+                    gui.mainFrame, _("Symboles du document"), symbols,
+                    lambda symbol: f"{'  ' * symbol.depth}{describeSymbol(symbol)}",
+                    symbolIndexAtLine(symbols, caretLine),
+                )
+                # Le focus n'est pas encore revenu à Notepad++ (self.edit vaut None) à la fermeture de la boîte
+                edit, document = self.edit, self._documentPath()
+
+                def onClosed(result):
+                    if result != wx.ID_OK or dialog.symbol is None:
+                        return
+                    symbol = dialog.symbol
+                    try:
+                        # Le snapshot peut avoir changé pendant que la boîte était ouverte
+                        current = self._getSnapshot(edit, document)[0]
+                        if current is not snapshot:
+                            log.debug("Document modifié pendant le choix du symbole.")
+                        if symbol.line < current.lineCount:
+                            index = current.lineStarts[symbol.line] + (symbol.offset - snapshot.lineStarts[symbol.line])
+                            self._moveCaretToOffset(current.indexToOffset(min(index, current.lineEndIndex(symbol.line))), edit)
+                            speech.speakMessage(describeSymbol(symbol))
+                    except Exception as e:
+                        log.error(f"Erreur lors du déplacement vers le symbole {symbol.name} : {e}")
+
+                gui.runScriptModalDialog(dialog, onClosed)
+            except Exception as e:
+                log.error(f"Erreur lors de l'ouverture de la liste des symboles : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_showQuickOutline.__doc__ = _("Affiche la liste filtrable des classes, fonctions et méthodes du document et place le curseur sur le symbole choisi.")
+    script_showQuickOutline.category = "Notepad++"
+
+
+    def _showProjectSymbols(self, index):
+        """
+        Ouvre la liste des déclarations du projet ; la déclaration choisie est
+        ouverte dans Notepad++.
+
+        Parameters
+        ----------
+        index : ProjectIndex or None
+            L'index à jour du dossier, ou None si l'indexation a échoué.
+        """
+        if index is None:
+            speech.speakMessage("Indexation du dossier impossible.")
+            return
+        if not index.symbols:
+            speech.speakMessage("Aucune déclaration dans le dossier.")
+            return
+        from .nppTools.symbolDialog import SymbolDialog
+
+        dialog = SymbolDialog(
+            gui.mainFrame, _("Symboles du projet"), index.symbols,
+            lambda symbol: describeProjectSymbol(symbol, index.root),
+        )
+
+        def onClosed(result):
+            if result != wx.ID_OK or dialog.symbol is None:
+                return
+            symbol = dialog.symbol
+            try:
+                # Notepad++ transmet le fichier à l'instance ouverte et place le curseur sur la déclaration
+                subprocess.Popen([self.appPath, f"-n{symbol.line + 1}", f"-c{symbol.column + 1}", symbol.path])
+                speech.speakMessage(describeProjectSymbol(symbol, index.root))
+            except Exception as e:
+                log.error(f"Erreur lors de l'ouverture de {symbol.path} : {e}")
+
+        gui.runScriptModalDialog(dialog, onClosed)
+
+
+    def script_goToProjectSymbol(self, gesture):
+        """
+        Ouvre la liste filtrable des classes, fonctions et méthodes de tous les
+        fichiers python du dossier du document ; la déclaration choisie est
+        ouverte dans Notepad++, curseur placé dessus.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (NVDA+Shift+F7)")
+
+        path = self._documentPath()
+        if not os.path.isfile(path):
+            speech.speakMessage("Document non enregistré : aucun dossier de projet.")
+            return
+        try:
+            root = os.path.dirname(os.path.abspath(path))
+            options = config.conf["notepadPlusPlus"]
+            if not self._projectIndexer.isIndexed(root):
+                speech.speakMessage("Indexation du dossier.")
+            self._projectIndexer.request(
+                root, options["projectExcludes"], self._executionEngine.interpreter, options["indexWorkers"],
+                lambda index: wx.CallAfter(self._showProjectSymbols, index),
+            )
+        except Exception as e:
+            log.error(f"Erreur lors de l'indexation du projet : {e}")
+
+    script_goToProjectSymbol.__doc__ = _("Affiche la liste filtrable des déclarations de tous les fichiers python du dossier du document et ouvre celle choisie.")
+    script_goToProjectSymbol.category = "Notepad++"
+
+###
+
+    def script_selectCurrentClass(self, gesture):
+        """
+        Sélectionne la classe entière qui contient le curseur.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        # Envoyer un message dans le journal de NVDA
+        log.debug("Raccourci DETECTE (Shift+F8)")
+
+        # Vérifier si l'objet d'édition est disponible
+        if self.edit:
+            try:
+                block = self._selectBlock((KIND_CLASS,))
+                if block is None:
+                    log.debug("Aucune déclaration de classe trouvée.")
+                    speech.speakMessage("Aucune déclaration de classe trouvée.")
+                    return
+
+                lineCount = block.endLine - block.startLine + 1
+                log.debug(f"Classe sélectionnée avec succès. Nombre de lignes sélectionnées : {lineCount}")
+                speech.speakMessage(f"Classe sélectionnée. {lineCount} lignes sélectionnées.")
+
+            except Exception as e:
+                log.error(f"Erreur lors de la sélection de la classe : {e}")
+                speech.speakMessage("Erreur lors de la sélection de la classe.")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_selectCurrentClass.__doc__ = _("Sélectionne la classe entière qui contient le curseur.")
+    script_selectCurrentClass.category = "Notepad++"
+
+
+    def script_selectClass(self, gesture):
+        """
+        Sélectionne la classe entière à partir de la première ligne.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Ctrl+Shift+R)")
+
+
+        if self.edit:
+            try:
+                # Le curseur doit être sur la déclaration de classe (ou ses décorateurs)
+                if self._selectBlock((KIND_CLASS,), onDeclaration=True):
+                    log.debug("Classe sélectionnée avec succès.")
+                    speech.speakMessage("Classe sélectionnée.")
+                else:
+                    log.debug("Le curseur n'est pas sur une déclaration de classe.")
+                    speech.speakMessage("Le curseur n'est pas sur une déclaration de classe.")
+
+
+            except Exception as e:
+                log.error(f"Erreur lors de la sélection de la classe : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_selectClass.__doc__ = _("Sélectionne la classe entière")
+    script_selectClass.category = "Notepad++"
+
+
+    def script_selectCurrentFunction(self, gesture):
+        """
+        Sélectionne la fonction entière qui contient le curseur.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        # Envoyer un message dans le journal de NVDA
+        log.debug("Raccourci DETECTE (Shift+F3)")
+
+        # Vérifier si l'objet d'édition est disponible
+        if self.edit:
+            try:
+                block = self._selectBlock((KIND_FUNCTION,))
+                if block is None:
+                    log.debug("Aucune déclaration de fonction trouvée.")
+                    speech.speakMessage("Aucune déclaration de fonction trouvée.")
+                    return
+
+                lineCount = block.endLine - block.startLine + 1
+                log.debug(f"Fonction sélectionnée avec succès. Nombre de lignes sélectionnées : {lineCount}")
+                speech.speakMessage(f"Fonction sélectionnée. {lineCount} lignes sélectionnées.")
+
+            except Exception as e:
+                log.error(f"Erreur lors de la sélection de la fonction : {e}")
+                speech.speakMessage("Erreur lors de la sélection de la fonction.")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_selectCurrentFunction.__doc__ = _("Sélectionne la fonction entière qui contient le curseur.")
+    script_selectCurrentFunction.category = "Notepad++"
+
+
+    def script_selectFunction(self, gesture):
+        """
+        Sélectionne la fonction entière à partir de la première ligne.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Ctrl+R)")
+
+
+        if self.edit:
+            try:
+                # Le curseur doit être sur la déclaration de fonction (ou ses décorateurs)
+                if self._selectBlock((KIND_FUNCTION,), onDeclaration=True):
+                    log.debug("Fonction sélectionnée avec succès.")
+                    speech.speakMessage("Fonction sélectionnée.")
+                else:
+                    log.debug("Le curseur n'est pas sur une déclaration de fonction.")
+                    speech.speakMessage("Le curseur n'est pas sur une déclaration de fonction.")
+
+
+            except Exception as e:
+                log.error(f"Erreur lors de la sélection de la fonction : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_selectFunction.__doc__ = _("Sélectionne la fonction entière")
+    script_selectFunction.category = "Notepad++"
+    
+
+    def _removeBlock(self, edit, document, snapshot, block, kind):
+        """
+        Supprime un bloc du document en une seule opération Scintilla, sans
+        passer par la sélection ni par le clavier, et l'empile pour une
+        restauration éventuelle.
+
+        La boîte de confirmation fait perdre le focus à Notepad++ (self.edit
+        vaut alors None) : l'objet d'édition et le document sont ceux retenus
+        avant son ouverture.
+
+        Le document doit être identique au snapshot (longueur et zones
+        échantillonnées, dont la première et la dernière ligne du bloc) et le
+        texte exact du bloc, relu juste avant la suppression, doit être celui
+        du snapshot ; la longueur du document après la suppression est
+        vérifiée.
+
+        Parameters
+        ----------
+        edit : object
+            L'objet d'édition du document.
+        document : str
+            Le document (voir _documentPath), pour la pile des blocs supprimés.
+        snapshot : DocumentSnapshot
+            Le snapshot dans lequel l'étendue du bloc a été résolue.
+        block : BlockRange
+            L'étendue du bloc.
+        kind : str
+            Le type de la portée (KIND_CLASS ou KIND_FUNCTION).
+
+        Returns
+        -------
+        bool
+            True si le bloc a été supprimé.
+        """
+        handle = edit.windowHandle
+        readRange = functools.partial(self._readRange, edit=edit)
+        start = snapshot.indexToOffset(block.startIndex)
+        end = snapshot.indexToOffset(block.endIndex)
+        lengthBefore = winUser.sendMessage(handle, SCI_GETTEXTLENGTH, 0, 0)
+        countRoundTrip()
+        blockSamples = (snapshot.sampleLine(block.startLine), snapshot.sampleLine(block.endLine))
+        if not snapshot.matches(lengthBefore, readRange, blockSamples):
+            log.debug("Document modifié depuis la résolution du bloc : suppression abandonnée.")
+            speech.speakMessage("Le document a changé, suppression abandonnée.")
+            return False
+        # Une modification de même longueur dans le bloc échappe aux échantillons
+        blockText = readRange(start, end)
+        if blockText != snapshot.text[block.startIndex:block.endIndex]:
+            log.debug("Texte du bloc modifié depuis la résolution du bloc : suppression abandonnée.")
+            speech.speakMessage("Le document a changé, suppression abandonnée.")
+            return False
+        codePage = winUser.sendMessage(handle, SCI_GETCODEPAGE, 0, 0)
+        countRoundTrip()
+        data = blockText.encode("utf-8" if codePage == SC_CP_UTF8 else "mbcs")
+        winUser.sendMessage(handle, SCI_DELETERANGE, start, end - start)
+        lengthAfter = winUser.sendMessage(handle, SCI_GETTEXTLENGTH, 0, 0)
+        countRoundTrip(2)
+        if lengthAfter != lengthBefore - (end - start):
+            log.error(f"Suppression incomplète : {lengthBefore} puis {lengthAfter} au lieu de {lengthBefore - (end - start)}.")
+            speech.speakMessage("Suppression incomplète, vérifiez le document.")
+            return False
+        if len(data) == end - start:
+            context = contextDigest(readRange(*contextRange(start, lengthAfter)))
+            self._deletedBlocks.push(
+                document,
+                DeletedBlock(kind, start, data, block.endLine - block.startLine + 1, lengthAfter, context),
+            )
+        else:
+            log.debug("Texte du bloc dans un autre encodage que le document : restauration impossible.")
+        self._moveCaretToOffset(start, edit)
+        return True
+
+
+    def _insertData(self, offset, data):
+        """
+        Insère du texte déjà encodé dans le document, en une seule opération
+        Scintilla. Le texte est d'abord écrit dans la mémoire de Notepad++.
+
+        Parameters
+        ----------
+        offset : int
+            La position d'insertion dans le document.
+        data : bytes
+            Le texte, encodé comme le document.
+        """
+        processHandle = self.edit.processHandle
+        buffer = ctypes.create_string_buffer(data)
+        address = winKernel.virtualAllocEx(processHandle, None, len(buffer), winKernel.MEM_COMMIT, winKernel.PAGE_READWRITE)
+        try:
+            winKernel.writeProcessMemory(processHandle, address, buffer, len(buffer), None)
+            winUser.sendMessage(self.edit.windowHandle, SCI_INSERTTEXT, offset, address)
+            countRoundTrip()
+        finally:
+            winKernel.virtualFreeEx(processHandle, address, 0, winKernel.MEM_RELEASE)
+
+
+    def _deleteClass(self):
+        """
+        Supprime la classe entière qui contient le curseur après confirmation.
+        """
+        try:
+            resolved = self._resolveBlock((KIND_CLASS,))
+            if resolved is None:
+                log.debug("Aucune déclaration de classe trouvée.")
+                speech.speakMessage("Aucune déclaration de classe trouvée.")
+                return
+
+            snapshot, block = resolved
+            lineCount = block.endLine - block.startLine + 1
+            speech.speakMessage(f"êtes vous sûr de vouloir supprimer la classe?")
+            # Notepad++ perd le focus pendant la confirmation : objet d'édition et document retenus avant
+            edit, document = self.edit, self._documentPath()
+            # Demander confirmation avant suppression avec un message personnalisé
+            if gui.messageBox(
+                "Voulez-vous vraiment supprimer cette classe ?",  # Message personnalisé
+                "Confirmation de suppression",  # Titre de la boîte de dialogue
+                wx.YES_NO | wx.ICON_QUESTION  # Boutons Oui/Non et icône de question
+            ) == wx.YES:
+                # Suppression de la zone exacte du bloc, en une seule opération
+                if self._removeBlock(edit, document, snapshot, block, KIND_CLASS):
+                    log.debug(f"Classe supprimée avec succès. Nombre de lignes supprimées : {lineCount}")
+                    speech.speakMessage(f"Classe supprimée. {lineCount} lignes supprimées.")
+            else:
+                log.debug("Suppression annulée par l'utilisateur.")
+                speech.speakMessage("Suppression annulée.")
+
+        except Exception as e:
+            log.error(f"Erreur lors de la suppression de la classe : {e}")
+            speech.speakMessage("Erreur lors de la suppression de la classe.")
+
+
+    def script_deleteCurrentClass(self, gesture):
+        """
+        Supprime la classe entière sur laquelle le curseur est positionné après confirmation.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        # Envoyer un message dans le journal de NVDA
+        log.debug("Raccourci DETECTE (Ctrl+Shift+Delete)")
+
+        # Vérifier si l'objet d'édition est disponible
+        if self.edit:
+            self._deleteClass()
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script_deleteCurrentClass.__doc__ = _("Supprime la classe entière sur laquelle le curseur est positionné après confirmation.")
+    script_deleteCurrentClass.category = "Notepad++"
+
+
+    def _deleteFunction(self):
+        """
+        Supprime la fonction entière qui contient le curseur après confirmation.
+        """
+        try:
+            resolved = self._resolveBlock((KIND_FUNCTION,))
+            if resolved is None:
+                log.debug("Aucune déclaration de fonction trouvée.")
+                speech.speakMessage("Aucune déclaration de fonction trouvée.")
+                return
+
+            snapshot, block = resolved
+            lineCount = block.endLine - block.startLine + 1
+            speech.speakMessage(f"êtes vous sûr de vouloir supprimer la fonction?")
+            # Notepad++ perd le focus pendant la confirmation : objet d'édition et document retenus avant
+            edit, document = self.edit, self._documentPath()
+
+            # Demander confirmation avant suppression
+            if gui.messageBox(
+                "Voulez-vous vraiment supprimer cette fonction ?",
+                "Confirmation de suppression",
+                wx.YES_NO | wx.ICON_QUESTION
+            ) == wx.YES:
+                # Suppression de la zone exacte du bloc, en une seule opération
+                if self._removeBlock(edit, document, snapshot, block, KIND_FUNCTION):
+                    log.debug(f"Fonction supprimée avec succès. Nombre de lignes supprimées : {lineCount}")
+                    speech.speakMessage(f"Fonction supprimée. {lineCount} lignes supprimées.")
+            else:
+                log.debug("Suppression annulée par l'utilisateur.")
+                speech.speakMessage("Suppression annulée.")
+
+
+        except Exception as e:
+            log.error(f"Erreur lors de la suppression de la fonction : {e}")
+            speech.speakMessage("Erreur lors de la suppression de la fonction.")
 
-###
 
-    def script_selectCurrentClass(self, gesture):
+    def script_deleteCurrentFunction(self, gesture):
         """
-        Sélectionne la classe entière à partir de la position du curseur en fonction de l'indentation.
+        Supprime la fonction entière sur laquelle le curseur est positionné après confirmation.
 
         Parameters
         ----------
@@ -413,651 +1445,478 @@ class AppModule(appModuleHandler.AppModule):
             L'événement de raccourci clavier déclenchant cette action.
         """
         # Envoyer un message dans le journal de NVDA
-        log.debug("Raccourci DETECTE (Shift+F8)")
+        log.debug("Raccourci DETECTE (Ctrl+Delete)")
 
         # Vérifier si l'objet d'édition est disponible
         if self.edit:
-            try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLineText = caretInfo.text.strip()  # Obtenir le texte de la ligne actuelle
-
-                # Vérifier si la ligne actuelle contient une déclaration de classe
-                if currentLineText.startswith("class "):
-                    # Si c'est le cas, on commence la sélection à partir de cette ligne
-                    startInfo = caretInfo.copy()
-                    startIndentation = self._getIndentationLevel(currentLineText)
-                else:
-                    # Sinon, on cherche la déclaration de classe précédente
-                    while True:
-                        caretInfo.move(textInfos.UNIT_LINE, -1)
-                        caretInfo.expand(textInfos.UNIT_LINE)
-                        lineText = caretInfo.text.strip()
-
-                        if lineText.startswith("class "):
-                            startInfo = caretInfo.copy()
-                            startIndentation = self._getIndentationLevel(lineText)
-                            break
-
-                        # Si on atteint le début du document, on arrête la recherche
-                        if caretInfo.bookmark.startOffset <= 0:
-                            log.debug("Aucune déclaration de classe trouvée.")
-                            speech.speakMessage("Aucune déclaration de classe trouvée.")
-                            return
-
-                # Trouver la fin de la classe en parcourant les lignes suivantes
-                endInfo = startInfo.copy()
-                endInfo.expand(textInfos.UNIT_LINE)
-                endInfo.collapse(end=True)
-
-                lineCounter = 0  # Compteur de lignes
-
-                while True:
-                    endInfo.move(textInfos.UNIT_LINE, 1)
-                    endInfo.expand(textInfos.UNIT_LINE)
-                    lineText = endInfo.text
-                    currentIndentation = self._getIndentationLevel(lineText)
-
-                    # Si l'indentation est inférieure ou égale à celle de la déclaration
-                    if currentIndentation <= startIndentation:
-                        # Si la ligne contient du texte, on s'arrête
-                        if lineText.strip():
-                            # Revenir en arrière d'une ligne
-                            endInfo.move(textInfos.UNIT_LINE, -1)
-                            endInfo.expand(textInfos.UNIT_LINE)
-                            break
-
-                    lineCounter += 1
-
-                # Appliquer la sélection
-                selectionInfo = self.edit.makeTextInfo(startInfo)
-                selectionInfo.setEndPoint(endInfo, "endToEnd")
-                self.edit.selection = selectionInfo
-
-                log.debug(f"Classe sélectionnée avec succès. Nombre de lignes sélectionnées : {lineCounter}")
-                speech.speakMessage(f"Classe sélectionnée. {lineCounter} lignes sélectionnées.")
-
-            except Exception as e:
-                log.error(f"Erreur lors de la sélection de la classe : {e}")
-                speech.speakMessage("Erreur lors de la sélection de la classe.")
+            self._deleteFunction()
         else:
             log.debug("Aucun objet d'édition trouvé.")
 
-    script_selectCurrentClass.__doc__ = _("Sélectionne la classe entière à partir de la position du curseur en fonction de l'indentation.")
-    script_selectCurrentClass.category = "Notepad++"
+    script_deleteCurrentFunction.__doc__ = _("Supprime la fonction entière sur laquelle le curseur est positionné après confirmation.")
+    script_deleteCurrentFunction.category = "Notepad++"
 
 
-    def script_selectClass(self, gesture):
+    def script_restoreDeletedBlock(self, gesture):
         """
-        Sélectionne la classe entière à partir de la première ligne.
+        Remet en place la dernière classe ou fonction supprimée du document,
+        si le document n'a pas changé depuis sa suppression (même longueur et
+        même texte autour de la position du bloc).
 
         Parameters
         ----------
         gesture : object
             L'événement de raccourci clavier déclenchant cette action.
         """
-        log.debug("Raccourci détecté (Ctrl+Shift+R)")
-
+        log.debug("Raccourci détecté (Control+Shift+Insert)")
 
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                lineText = caretInfo.text.strip()
-
-
-                # Vérifier si la ligne commence par "class " (déclaration de classe Python)
-                if lineText.startswith("class "):
-                    self._selectClass(caretInfo)
-                    log.debug("Classe sélectionnée avec succès.")
-                    speech.speakMessage("Classe sélectionnée.")
-                else:
-                    log.debug("Le curseur n'est pas sur une déclaration de classe.")
-                    speech.speakMessage("Le curseur n'est pas sur une déclaration de classe.")
-
-
+                document = self._documentPath()
+                deleted = self._deletedBlocks.peek(document)
+                if deleted is None:
+                    speech.speakMessage("Aucun bloc supprimé à restaurer.")
+                    return
+                length = winUser.sendMessage(self.edit.windowHandle, SCI_GETTEXTLENGTH, 0, 0)
+                countRoundTrip()
+                # Une modification qui garde la longueur déplace ou change le texte autour de la position
+                if (
+                    length != deleted.lengthAfter
+                    or contextDigest(self._readRange(*contextRange(deleted.offset, length))) != deleted.context
+                ):
+                    speech.speakMessage("Le document a changé depuis la suppression : utilisez l'annulation de Notepad++.")
+                    return
+                self._insertData(deleted.offset, deleted.data)
+                lengthAfter = winUser.sendMessage(self.edit.windowHandle, SCI_GETTEXTLENGTH, 0, 0)
+                countRoundTrip()
+                if lengthAfter != length + len(deleted.data):
+                    log.error(f"Restauration incomplète : {length} puis {lengthAfter} au lieu de {length + len(deleted.data)}.")
+                    speech.speakMessage("Restauration incomplète, vérifiez le document.")
+                    return
+                self._deletedBlocks.pop(document)
+                self._moveCaretToOffset(deleted.offset)
+                label = "Classe restaurée" if deleted.kind == KIND_CLASS else "Fonction restaurée"
+                speech.speakMessage(f"{label}. {deleted.lineCount} lignes.")
             except Exception as e:
-                log.error(f"Erreur lors de la sélection de la classe : {e}")
+                log.error(f"Erreur lors de la restauration du bloc supprimé : {e}")
         else:
             log.debug("Aucun objet d'édition trouvé.")
 
-    script_selectClass.__doc__ = _("Sélectionne la classe entière")
-    script_selectClass.category = "Notepad++"
+    script_restoreDeletedBlock.__doc__ = _("Restaure la dernière classe ou fonction supprimée du document, si celui-ci n'a pas changé depuis.")
+    script_restoreDeletedBlock.category = "Notepad++"
 
 
-    def script_selectCurrentFunction(self, gesture):
+    def _configureExecution(self):
         """
-        Sélectionne la fonction entière à partir de la position du curseur en fonction de l'indentation.
-
-        Parameters
-        ----------
-        gesture : object
-            L'événement de raccourci clavier déclenchant cette action.
+        Applique au moteur d'exécution les options du pool d'interpréteurs préchargés.
         """
-        # Envoyer un message dans le journal de NVDA
-        log.debug("Raccourci DETECTE (Shift+F3)")
+        try:
+            options = config.conf["notepadPlusPlus"]
+            self._executionEngine.configurePool(
+                options["interpreterPoolSize"], options["interpreterPreload"], options["interpreterMaxRuns"],
+            )
+        except Exception as e:
+            log.error(f"Impossible de lancer les interpréteurs préchargés : {e}")
 
-        # Vérifier si l'objet d'édition est disponible
-        if self.edit:
-            try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLineText = caretInfo.text.strip()  # Obtenir le texte de la ligne actuelle
-
-                # Vérifier si la ligne actuelle contient une déclaration de fonction
-                # FLB 2025-06-07 
-                # if currentLineText.startswith("def "):
-                if re.match(r"^\s*(async\s+)?def\s+", currentLineText):
-                    # Si c'est le cas, on commence la sélection à partir de cette ligne
-                    startInfo = caretInfo.copy()
-                    startIndentation = self._getIndentationLevel(currentLineText)
-                else:
-                    # Sinon, on cherche la déclaration de fonction précédente
-                    while True:
-                        caretInfo.move(textInfos.UNIT_LINE, -1)
-                        caretInfo.expand(textInfos.UNIT_LINE)
-                        lineText = caretInfo.text.strip()
-
-                        # FLB 2025-06-07
-                        # if lineText.startswith("def "):
-                        if re.match(r"^\s*(async\s+)?def\s+", lineText):
-                            startInfo = caretInfo.copy()
-                            startIndentation = self._getIndentationLevel(lineText)
-                            break
-
-                        # Si on atteint le début du document, on arrête la recherche
-                        if caretInfo.bookmark.startOffset <= 0:
-                            log.debug("Aucune déclaration de fonction trouvée.")
-                            speech.speakMessage("Aucune déclaration de fonction trouvée.")
-                            return
-
-                # Trouver la fin de la fonction en parcourant les lignes suivantes
-                endInfo = startInfo.copy()
-                endInfo.expand(textInfos.UNIT_LINE)
-                endInfo.collapse(end=True)
-
-                lineCounter = 0  # Compteur de lignes
-
-                while True:
-                    endInfo.move(textInfos.UNIT_LINE, 1)
-                    endInfo.expand(textInfos.UNIT_LINE)
-                    lineText = endInfo.text
-                    currentIndentation = self._getIndentationLevel(lineText)
-
-                    # Si l'indentation est inférieure ou égale à celle de la déclaration
-                    if currentIndentation <= startIndentation:
-                        # Si la ligne contient du texte, on s'arrête
-                        if lineText.strip():
-                            # Revenir en arrière d'une ligne
-                            endInfo.move(textInfos.UNIT_LINE, -1)
-                            endInfo.expand(textInfos.UNIT_LINE)
-                            break
-
-                    lineCounter += 1
-
-                # Appliquer la sélection
-                selectionInfo = self.edit.makeTextInfo(startInfo)
-                selectionInfo.setEndPoint(endInfo, "endToEnd")
-                self.edit.selection = selectionInfo
-
-                log.debug(f"Fonction sélectionnée avec succès. Nombre de lignes sélectionnées : {lineCounter}")
-                speech.speakMessage(f"Fonction sélectionnée. {lineCounter} lignes sélectionnées.")
 
-            except Exception as e:
-                log.error(f"Erreur lors de la sélection de la fonction : {e}")
-                speech.speakMessage("Erreur lors de la sélection de la fonction.")
+    def _executePythonCode(self):
+        """Exécute le code Python en arrière-plan, sortie capturée."""
+        if self._executionEngine.running:
+            speech.speakMessage("Une exécution est déjà en cours.")
+            return
+        options = config.conf["notepadPlusPlus"]
+
+        session = cwd = None
+        if options["sessionMode"]:
+            # Une session par document, dans le répertoire du fichier s'il est enregistré
+            session = self._documentPath()
+            directory = os.path.dirname(session)
+            cwd = directory if os.path.isdir(directory) else None
         else:
-            log.debug("Aucun objet d'édition trouvé.")
+            self._configureExecution()
+
+        onFinished = lambda result: wx.CallAfter(self._reportExecution, result)
+        message = "Exécution lancée." if session is None else "Exécution dans la session."
+
+        # Obtenir le texte sélectionné ou le fichier entier ; firstLine est la
+        # ligne du document où commence le code, pour les traces d'appels
+        selection = self.edit.selection
+        code = selection.text
+        firstLine = 0
+        if code:
+            log.debug("Exécution du code sélectionné.")
+            snapshot = self._getSnapshot()[0]
+            firstLine = snapshot.lineAt(snapshot.offsetToIndex(selection.bookmark.startOffset))
+        else:
+            # Si rien n'est sélectionné, exécuter tout le fichier (texte du snapshot)
+            snapshot = self._getSnapshot()[0]
+            code = snapshot.text
+            log.debug("Exécution du fichier entier.")
+            if session is not None and CELL_LANDMARK in PATTERNS.landmarkKinds:
+                cells = splitCells(snapshot.text, snapshot.lineStarts, snapshot.outline.kindLines(CELL_LANDMARK))
+                if len(cells) > 1:
+                    # Script découpé en cellules : seules les cellules modifiées et les suivantes sont exécutées
+                    state = self._executionEngine.sessionState(session) or {}
+                    executed = state.get("cells", [])
+                    first = firstChangedCell(cells, executed)
+                    if first == len(cells):
+                        speech.speakMessage("Aucune cellule modifiée.")
+                        return
+                    code = snapshot.text[cells[first].startIndex:]
+                    firstLine = cells[first].line
+                    kept = executed[:first]
+                    digests = [cell.digest for cell in cells]
+                    onFinished = lambda result: (
+                        self._recordCells(session, digests if result.returnCode == 0 else kept),
+                        wx.CallAfter(self._reportExecution, result),
+                    )
+                    if first + 1 == len(cells):
+                        message = f"Exécution de la cellule {first + 1}."
+                    else:
+                        message = f"Exécution des cellules {first + 1} à {len(cells)}."
+                    log.debug(f"Cellules {first + 1} à {len(cells)} exécutées, {first} déjà à jour.")
 
-    script_selectCurrentFunction.__doc__ = _("Sélectionne la fonction entière à partir de la position du curseur en fonction de l'indentation.")
-    script_selectCurrentFunction.category = "Notepad++"
+        self._executionEngine.output.size = options["outputLines"]
+        if options["speakOutput"]:
+            self._outputSpeaker.reset()
+        else:
+            self._outputSpeaker.silence()
+        path = self._executionEngine.run(code, onFinished, options["executionTimeout"], session, cwd)
+        # Origine du code exécuté, conservée pour les appels vers les exécutions précédentes d'une session
+        self._runOrigins[path] = (self._documentPath(), firstLine)
+        while len(self._runOrigins) > RUN_ORIGINS:
+            self._runOrigins.popitem(last=False)
+        speech.speakMessage(message)
 
 
-    def script_selectFunction(self, gesture):
+    def _streamOutputLine(self, line):
         """
-        Sélectionne la fonction entière à partir de la première ligne.
+        Transmet une ligne de sortie à la lecture au fil de l'eau (appelée
+        depuis les threads de lecture du moteur d'exécution).
 
         Parameters
         ----------
-        gesture : object
-            L'événement de raccourci clavier déclenchant cette action.
+        line : OutputLine
+            La ligne reçue.
         """
-        log.debug("Raccourci détecté (Ctrl+R)")
-
+        self._outputSpeaker.feed(f"Erreur : {line.text}" if line.stream == STREAM_STDERR else line.text)
 
-        if self.edit:
-            try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                lineText = caretInfo.text.strip()
 
+    def _recordCells(self, session, digests):
+        """
+        Note dans la session les empreintes des cellules exécutées avec succès.
 
-                # Vérifier si la ligne commence par "def " (déclaration de fonction Python)
-                # FLB 2025-06-07 
-                # if lineText.startswith("def "):
-                if re.match(r"^\s*(async\s+)?def\s+", lineText):
-                    self._selectFunction(caretInfo)
-                    log.debug("Fonction sélectionnée avec succès.")
-                    speech.speakMessage("Fonction sélectionnée.")
-                else:
-                    log.debug("Le curseur n'est pas sur une déclaration de fonction.")
-                    speech.speakMessage("Le curseur n'est pas sur une déclaration de fonction.")
+        Parameters
+        ----------
+        session : str
+            La session (le document).
+        digests : list of str
+            Les empreintes des cellules à jour dans l'espace de noms, dans l'ordre.
+        """
+        state = self._executionEngine.sessionState(session)
+        if state is not None:
+            state["cells"] = digests
 
 
-            except Exception as e:
-                log.error(f"Erreur lors de la sélection de la fonction : {e}")
-        else:
-            log.debug("Aucun objet d'édition trouvé.")
+    def _documentPath(self):
+        """
+        Retourne le chemin du document affiché (son nom s'il n'a jamais été
+        enregistré), lu dans le titre de la fenêtre de Notepad++.
+        """
+        title = api.getForegroundObject().name or ""
+        return title.rsplit(" - Notepad++", 1)[0].lstrip("*")
 
-    script_selectFunction.__doc__ = _("Sélectionne la fonction entière")
-    script_selectFunction.category = "Notepad++"
-    
 
-    def _deleteClass(self, caretInfo):
+    def _reportExecution(self, result):
         """
-        Supprime la classe entière à partir de la position du curseur après confirmation.
+        Annonce la fin d'une exécution : code de sortie et ligne de l'exception.
 
         Parameters
         ----------
-        caretInfo : object
-            L'objet contenant les informations de texte et la position du curseur.
+        result : ExecutionResult
+            Le résultat transmis par le moteur d'exécution.
         """
-        try:
-            # Trouver le début de la classe (ligne contenant "class")
-            startInfo = caretInfo.copy()
-            startInfo.expand(textInfos.UNIT_LINE)
-            startInfo.collapse()
-
-            # Obtenir le texte de la ligne de déclaration de la classe
-            startLineText = startInfo.text
-            startIndentation = self._getIndentationLevel(startLineText)
-
-            # Trouver la fin de la classe en parcourir les lignes suivantes
-            endInfo = startInfo.copy()
-            endInfo.expand(textInfos.UNIT_LINE)
-            endInfo.collapse(end=True)
-
-            lineCounter = 0  # Compteur de lignes
-
-            while True:
-                endInfo.move(textInfos.UNIT_LINE, 1)
-                endInfo.expand(textInfos.UNIT_LINE)
-                lineText = endInfo.text
-                currentIndentation = self._getIndentationLevel(lineText)
-
-                # Si l'indentation est inférieure ou égale à celle de la déclaration
-                if currentIndentation <= startIndentation:
-                    # Si la ligne contient du texte, on s'arrête
-                    if lineText.strip():
-                        # Revenir en arrière d'une ligne
-                        endInfo.move(textInfos.UNIT_LINE, -1)
-                        endInfo.expand(textInfos.UNIT_LINE)
-                        break
-
-                lineCounter += 1
-
-            # Appliquer la sélection
-            selectionInfo = self.edit.makeTextInfo(startInfo)
-            selectionInfo.setEndPoint(endInfo, "endToEnd")
-            self.edit.selection = selectionInfo
-            speech.speakMessage(f"êtes vous sûr de vouloir supprimer la classe?")
-            # Demander confirmation avant suppression avec un message personnalisé
-            if gui.messageBox(
-                "Voulez-vous vraiment supprimer cette classe ?",  # Message personnalisé
-                "Confirmation de suppression",  # Titre de la boîte de dialogue
-                wx.YES_NO | wx.ICON_QUESTION  # Boutons Oui/Non et icône de question
-            ) == wx.YES:
-                # Simuler l'appui sur la touche Suppr pour supprimer la sélection
-                keyboardHandler.KeyboardInputGesture.fromName("delete").send()
-                log.debug(f"Classe supprimée avec succès. Nombre de lignes supprimées : {lineCounter}")
-                speech.speakMessage(f"Classe supprimée. {lineCounter} lignes supprimées.")
-            else:
-                log.debug("Suppression annulée par l'utilisateur.")
-                speech.speakMessage("Suppression annulée.")
-
-        except Exception as e:
-            log.error(f"Erreur lors de la suppression de la classe : {e}")
-            speech.speakMessage("Erreur lors de la suppression de la classe.")
+        # Les dernières lignes reçues sont lues avant le résultat
+        self._outputSpeaker.flush()
+        # Appels de la trace d'appels, du plus interne au plus externe ; le
+        # premier appui va au plus interne des appels situés dans le code exécuté
+        self._errorFrames = result.frames[::-1]
+        ownFrames = [index for index, frame in enumerate(self._errorFrames) if frame.path in self._runOrigins]
+        self._errorFrameIndex = ownFrames[0] - 1 if ownFrames else -1
+        if result.timedOut:
+            speech.speakMessage(f"Exécution interrompue après {result.seconds:.0f} secondes, {result.lineCount} lignes de sortie.")
+        elif result.returnCode == 0 and result.value:
+            speech.speakMessage(f"Résultat : {result.value}")
+        elif result.returnCode == 0:
+            speech.speakMessage(f"Exécution terminée en {result.seconds:.1f} secondes, {result.lineCount} lignes de sortie.")
+        else:
+            speech.speakMessage(f"Échec, code de sortie {result.returnCode}. {result.errorLine}")
 
 
-    def script_deleteCurrentClass(self, gesture):
+    def script_executePythonCode(self, gesture):
         """
-        Supprime la classe entière sur laquelle le curseur est positionné après confirmation.
+        Exécute le code en cours en arrière-plan et annonce son résultat.
 
         Parameters
         ----------
         gesture : object
             L'événement de raccourci clavier déclenchant cette action.
         """
-        # Envoyer un message dans le journal de NVDA
-        log.debug("Raccourci DETECTE (Ctrl+Shift+Delete)")
+        log.debug("Raccourci détecté (F5)")
+
 
-        # Vérifier si l'objet d'édition est disponible
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLineText = caretInfo.text.strip()  # Obtenir le texte de la ligne actuelle
-
-                # Vérifier si la ligne actuelle contient une déclaration de classe
-                if currentLineText.startswith("class "):
-                    # Si c'est le cas, on commence la suppression à partir de cette ligne
-                    startInfo = caretInfo.copy()
-                    startIndentation = self._getIndentationLevel(currentLineText)
-                else:
-                    # Sinon, on cherche la déclaration de classe précédente
-                    while True:
-                        caretInfo.move(textInfos.UNIT_LINE, -1)
-                        caretInfo.expand(textInfos.UNIT_LINE)
-                        lineText = caretInfo.text.strip()
-
-                        if lineText.startswith("class "):
-                            startInfo = caretInfo.copy()
-                            startIndentation = self._getIndentationLevel(lineText)
-                            break
-
-                        # Si on atteint le début du document, on arrête la recherche
-                        if caretInfo.bookmark.startOffset <= 0:
-                            log.debug("Aucune déclaration de classe trouvée.")
-                            speech.speakMessage("Aucune déclaration de classe trouvée.")
-                            return
-
-                # Trouver la fin de la classe en parcourant les lignes suivantes
-                endInfo = startInfo.copy()
-                endInfo.expand(textInfos.UNIT_LINE)
-                endInfo.collapse(end=True)
-
-                lineCounter = 0  # Compteur de lignes
-
-                while True:
-                    endInfo.move(textInfos.UNIT_LINE, 1)
-                    endInfo.expand(textInfos.UNIT_LINE)
-                    lineText = endInfo.text
-                    currentIndentation = self._getIndentationLevel(lineText)
-
-                    # Si l'indentation est inférieure ou égale à celle de la déclaration
-                    if currentIndentation <= startIndentation:
-                        # Si la ligne contient du texte, on s'arrête
-                        if lineText.strip():
-                            # Revenir en arrière d'une ligne
-                            endInfo.move(textInfos.UNIT_LINE, -1)
-                            endInfo.expand(textInfos.UNIT_LINE)
-                            break
-
-                    lineCounter += 1
-
-                # Appliquer la sélection
-                selectionInfo = self.edit.makeTextInfo(startInfo)
-                selectionInfo.setEndPoint(endInfo, "endToEnd")
-                self.edit.selection = selectionInfo
-
-                # Demander confirmation avant suppression avec un message personnalisé
-                speech.speakMessage(f"êtes vous sûr de vouloir supprimer la classe?")
-                if gui.messageBox(
-                    "Voulez-vous vraiment supprimer cette classe ?",  # Message personnalisé
-                    "Confirmation de suppression",  # Titre de la boîte de dialogue
-                    wx.YES_NO | wx.ICON_QUESTION  # Boutons Oui/Non et icône de question
-                ) == wx.YES:
-                    # Simuler l'appui sur la touche Suppr pour supprimer la sélection
-                    keyboardHandler.KeyboardInputGesture.fromName("delete").send()
-                    log.debug(f"Classe supprimée avec succès. Nombre de lignes supprimées : {lineCounter}")
-                    speech.speakMessage(f"Classe supprimée. {lineCounter} lignes supprimées.")
-                else:
-                    log.debug("Suppression annulée par l'utilisateur.")
-                    speech.speakMessage("Suppression annulée.")
-
+                self._executePythonCode()
             except Exception as e:
-                log.error(f"Erreur lors de la suppression de la classe : {e}")
-                speech.speakMessage("Erreur lors de la suppression de la classe.")
+                log.error(f"Erreur lors de l'exécution du code : {e}")
+                speech.speakMessage("Erreur lors de l'exécution du code.")
         else:
             log.debug("Aucun objet d'édition trouvé.")
 
-    script_deleteCurrentClass.__doc__ = _("Supprime la classe entière sur laquelle le curseur est positionné après confirmation.")
-    script_deleteCurrentClass.category = "Notepad++"
+    script_executePythonCode.__doc__ = _("Exécute le code Python en arrière-plan et annonce le résultat.")
+    script_executePythonCode.category = "Notepad++"
+
+
+    def script_stopExecution(self, gesture):
+        """
+        Arrête l'exécution en cours ; dans une session, l'interrompt sans
+        perdre l'espace de noms.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Control+Shift+F5)")
+
+        if not self._executionEngine.running:
+            speech.speakMessage("Aucune exécution en cours.")
+        elif self._executionEngine.interrupt():
+            speech.speakMessage("Interruption demandée.")
+        else:
+            self._executionEngine.stop()
+
+    script_stopExecution.__doc__ = _("Arrête l'exécution du code Python en cours, ou l'interrompt dans une session.")
+    script_stopExecution.category = "Notepad++"
 
 
-    def _deleteFunction(self, caretInfo):
+    def script_restartSession(self, gesture):
         """
-        Supprime la fonction entière à partir de la position du curseur après confirmation.
+        Redémarre la session du document : l'espace de noms est vidé.
 
         Parameters
         ----------
-        caretInfo : object
-            L'objet contenant les informations de texte et la position du curseur.
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
         """
+        log.debug("Raccourci détecté (Control+Alt+F5)")
+
         try:
-            # Trouver le début de la fonction (ligne contenant "def")
-            startInfo = caretInfo.copy()
-            startInfo.expand(textInfos.UNIT_LINE)
-            startInfo.collapse()
+            if self._executionEngine.restartSession(self._documentPath()):
+                speech.speakMessage("Session redémarrée.")
+            else:
+                speech.speakMessage("Aucune session pour ce document.")
+        except Exception as e:
+            log.error(f"Erreur lors du redémarrage de la session : {e}")
 
+    script_restartSession.__doc__ = _("Redémarre la session python du document.")
+    script_restartSession.category = "Notepad++"
 
-            # Obtenir le texte de la ligne de déclaration de la fonction
-            startLineText = startInfo.text
-            startIndentation = self._getIndentationLevel(startLineText)
 
+    def script_toggleSessionMode(self, gesture):
+        """
+        Active ou désactive le mode session de Control+F5.
 
-            # Trouver la fin de la fonction en parcourir les lignes suivantes
-            endInfo = startInfo.copy()
-            endInfo.expand(textInfos.UNIT_LINE)
-            endInfo.collapse(end=True)
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Control+Alt+Shift+F5)")
 
+        options = config.conf["notepadPlusPlus"]
+        options["sessionMode"] = not options["sessionMode"]
+        speech.speakMessage("Mode session activé." if options["sessionMode"] else "Mode session désactivé.")
 
-            lineCounter = 0  # Compteur de lignes
+    script_toggleSessionMode.__doc__ = _("Active ou désactive l'exécution dans une session python persistante par document.")
+    script_toggleSessionMode.category = "Notepad++"
 
 
-            while True:
-                endInfo.move(textInfos.UNIT_LINE, 1)
-                endInfo.expand(textInfos.UNIT_LINE)
-                lineText = endInfo.text
-                currentIndentation = self._getIndentationLevel(lineText)
+    def _readOutputLine(self, direction):
+        """
+        Lit la ligne suivante ou précédente de la sortie de la dernière exécution.
 
+        Parameters
+        ----------
+        direction : int
+            1 pour la ligne suivante, -1 pour la ligne précédente.
+        """
+        output = self._executionEngine.output
+        if not len(output):
+            speech.speakMessage("Aucune sortie.")
+            return
+        line = output.move(direction)
+        if line is None:
+            speech.speakMessage("Fin de la sortie." if direction > 0 else "Début de la sortie.")
+        elif line.stream == STREAM_STDERR:
+            speech.speakMessage(f"Erreur : {line.text}")
+        else:
+            speech.speakMessage(line.text or "vide")
 
-                # Si l'indentation est inférieure ou égale à celle de la déclaration
-                if currentIndentation <= startIndentation:
-                    # Si la ligne contient du texte, on s'arrête
-                    if lineText.strip():
-                        # Revenir en arrière d'une ligne
-                        endInfo.move(textInfos.UNIT_LINE, -1)
-                        endInfo.expand(textInfos.UNIT_LINE)
-                        break
 
+    def script_readLatestError(self, gesture):
+        """
+        Va à la dernière ligne de la sortie d'erreur et la lit.
 
-                lineCounter += 1
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Control+Alt+F6)")
 
+        line = self._executionEngine.output.moveToLast(STREAM_STDERR)
+        if line is None:
+            speech.speakMessage("Aucune erreur.")
+        else:
+            speech.speakMessage(f"Erreur : {line.text}")
 
-            # Appliquer la sélection
-            selectionInfo = self.edit.makeTextInfo(startInfo)
-            selectionInfo.setEndPoint(endInfo, "endToEnd")
-            self.edit.selection = selectionInfo
+    script_readLatestError.__doc__ = _("Lit la dernière erreur de la sortie de la dernière exécution.")
+    script_readLatestError.category = "Notepad++"
 
-            speech.speakMessage(f"êtes vous sûr de vouloir supprimer la fonction?")
 
-            # Demander confirmation avant suppression
-            if gui.messageBox(
-                "Voulez-vous vraiment supprimer cette fonction ?",
-                "Confirmation de suppression",
-                wx.YES_NO | wx.ICON_QUESTION
-            ) == wx.YES:
-                # Simuler l'appui sur la touche Suppr pour supprimer la sélection
-                keyboardHandler.KeyboardInputGesture.fromName("delete").send()
-                log.debug(f"Fonction supprimée avec succès. Nombre de lignes supprimées : {lineCounter}")
-                speech.speakMessage(f"Fonction supprimée. {lineCounter} lignes supprimées.")
-            else:
-                log.debug("Suppression annulée par l'utilisateur.")
-                speech.speakMessage("Suppression annulée.")
+    def script_silenceOutput(self, gesture):
+        """
+        Interrompt la lecture au fil de l'eau de la sortie, jusqu'à la prochaine exécution.
 
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Alt+Shift+F6)")
 
-        except Exception as e:
-            log.error(f"Erreur lors de la suppression de la fonction : {e}")
-            speech.speakMessage("Erreur lors de la suppression de la fonction.")
+        self._outputSpeaker.silence()
+        speech.cancelSpeech()
+        speech.speakMessage("Sortie silencieuse.")
 
+    script_silenceOutput.__doc__ = _("Interrompt la lecture de la sortie de l'exécution en cours.")
+    script_silenceOutput.category = "Notepad++"
 
-    def script_deleteCurrentFunction(self, gesture):
+
+    def script_reportSyntaxError(self, gesture):
         """
-        Supprime la fonction entière sur laquelle le curseur est positionné après confirmation.
+        Annonce la première erreur de syntaxe du document et y place le curseur.
+
+        La vérification a généralement déjà été faite en arrière-plan pour
+        le snapshot courant ; sinon elle est faite maintenant.
 
         Parameters
         ----------
         gesture : object
             L'événement de raccourci clavier déclenchant cette action.
         """
-        # Envoyer un message dans le journal de NVDA
-        log.debug("Raccourci DETECTE (Ctrl+Shift+Delete)")
+        log.debug("Raccourci détecté (Control+Shift+F6)")
 
-        # Vérifier si l'objet d'édition est disponible
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLineText = caretInfo.text.strip()  # Obtenir le texte de la ligne actuelle
-
-                # Vérifier si la ligne actuelle contient une déclaration de fonction
-                # FLB 2025-06-07
-                # if currentLineText.startswith("def "):
-                if re.match(r"^\s*(async\s+)?def\s+", currentLineText):
-                    # Si c'est le cas, on commence la suppression à partir de cette ligne
-                    startInfo = caretInfo.copy()
-                    startIndentation = self._getIndentationLevel(currentLineText)
-                else:
-                    # Sinon, on cherche la déclaration de fonction précédente
-                    while True:
-                        caretInfo.move(textInfos.UNIT_LINE, -1)
-                        caretInfo.expand(textInfos.UNIT_LINE)
-                        lineText = caretInfo.text.strip()
-
-                        # FLB 2025-06-07
-                        # if lineText.startswith("def "):
-                        if re.match(r"^\s*(async\s+)?def\s+", lineText):
-                            startInfo = caretInfo.copy()
-                            startIndentation = self._getIndentationLevel(lineText)
-                            break
-
-                        # Si on atteint le début du document, on arrête la recherche
-                        if caretInfo.bookmark.startOffset <= 0:
-                            log.debug("Aucune déclaration de fonction trouvée.")
-                            speech.speakMessage("Aucune déclaration de fonction trouvée.")
-                            return
-
-                # Trouver la fin de la fonction en parcourant les lignes suivantes
-                endInfo = startInfo.copy()
-                endInfo.expand(textInfos.UNIT_LINE)
-                endInfo.collapse(end=True)
-
-                lineCounter = 0  # Compteur de lignes
-
-                while True:
-                    endInfo.move(textInfos.UNIT_LINE, 1)
-                    endInfo.expand(textInfos.UNIT_LINE)
-                    lineText = endInfo.text
-                    currentIndentation = self._getIndentationLevel(lineText)
-
-                    # Si l'indentation est inférieure ou égale à celle de la déclaration
-                    if currentIndentation <= startIndentation:
-                        # Si la ligne contient du texte, on s'arrête
-                        if lineText.strip():
-                            # Revenir en arrière d'une ligne
-                            endInfo.move(textInfos.UNIT_LINE, -1)
-                            endInfo.expand(textInfos.UNIT_LINE)
-                            break
-
-                    lineCounter += 1
-
-                # Appliquer la sélection
-                selectionInfo = self.edit.makeTextInfo(startInfo)
-                selectionInfo.setEndPoint(endInfo, "endToEnd")
-                self.edit.selection = selectionInfo
-
-                # Demander confirmation avant suppression avec un message personnalisé
-                speech.speakMessage(f"êtes vous sûr de vouloir supprimer la fonction?")
-                if gui.messageBox(
-                    "Voulez-vous vraiment supprimer cette fonction ?",  # Message personnalisé
-                    "Confirmation de suppression",  # Titre de la boîte de dialogue
-                    wx.YES_NO | wx.ICON_QUESTION  # Boutons Oui/Non et icône de question
-                ) == wx.YES:
-                    # Simuler l'appui sur la touche Suppr pour supprimer la sélection
-                    keyboardHandler.KeyboardInputGesture.fromName("delete").send()
-                    log.debug(f"Fonction supprimée avec succès. Nombre de lignes supprimées : {lineCounter}")
-                    speech.speakMessage(f"Fonction supprimée. {lineCounter} lignes supprimées.")
+                snapshot, caretLine = self._getSnapshot()
+                if not snapshot.backend.checksSyntax:
+                    speech.speakMessage("Vérification de la syntaxe disponible pour python seulement.")
+                    return
+                if not snapshot.syntaxChecked:
+                    log.debug("Syntaxe pas encore vérifiée : vérification sur le thread principal.")
+                issue = snapshot.syntaxIssue
+                if issue is None:
+                    speech.speakMessage("Aucune erreur de syntaxe.")
                 else:
-                    log.debug("Suppression annulée par l'utilisateur.")
-                    speech.speakMessage("Suppression annulée.")
-
+                    # Un seul déplacement, directement sur la colonne de l'erreur
+                    lineStart = snapshot.lineStarts[min(issue.line, snapshot.lineCount - 1)]
+                    lineEnd = snapshot.text.find("\n", lineStart)
+                    lineEnd = len(snapshot.text) if lineEnd == -1 else lineEnd
+                    self._moveCaretToOffset(snapshot.indexToOffset(min(lineStart + issue.column, lineEnd)))
+                    speech.speakMessage(f"Ligne {issue.line + 1}, colonne {issue.column + 1} : {issue.message}")
             except Exception as e:
-                log.error(f"Erreur lors de la suppression de la fonction : {e}")
-                speech.speakMessage("Erreur lors de la suppression de la fonction.")
+                log.error(f"Erreur lors de la vérification de la syntaxe : {e}")
         else:
             log.debug("Aucun objet d'édition trouvé.")
 
-    script_deleteCurrentFunction.__doc__ = _("Supprime la fonction entière sur laquelle le curseur est positionné après confirmation.")
-    script_deleteCurrentFunction.category = "Notepad++" 
+    script_reportSyntaxError.__doc__ = _("Annonce la première erreur de syntaxe du document et y place le curseur.")
+    script_reportSyntaxError.category = "Notepad++"
 
 
-    def _executePythonCode(self):
-        """Exécute le code Python dans un terminal."""
+    def script_moveToErrorLine(self, gesture):
+        """
+        Place le curseur sur la ligne d'un appel de la dernière trace
+        d'appels ; chaque appui passe à l'appel suivant, du plus interne au
+        plus externe.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Control+F6)")
+
+        if not self._errorFrames:
+            speech.speakMessage("Aucune trace d'appels.")
+            return
+        self._errorFrameIndex = (self._errorFrameIndex + 1) % len(self._errorFrames)
+        frame = self._errorFrames[self._errorFrameIndex]
+        function = frame.function or "erreur de syntaxe"
+        origin = self._runOrigins.get(frame.path)
+        if origin is None or not self.edit or origin[0] != self._documentPath():
+            # Appel dans un autre fichier (bibliothèque) ou dans un autre document
+            speech.speakMessage(f"{os.path.basename(frame.path)}, ligne {frame.line}, {function}")
+            return
         try:
-            # Obtenir le texte sélectionné ou le fichier entier
-            if self.edit.selection.text:
-                code = self.edit.selection.text
-                log.debug("Exécution du code sélectionné.")
-            else:
-                # Si rien n'est sélectionné, exécuter tout le fichier
-                code = self.edit.makeTextInfo(textInfos.POSITION_ALL).text
-                log.debug("Exécution du fichier entier.")
+            snapshot = self._getSnapshot()[0]
+            line = documentLine(frame, origin[1])
+            if line >= snapshot.lineCount:
+                speech.speakMessage(f"Ligne {line + 1} absente du document.")
+                return
+            # Un seul déplacement, directement au début de la ligne
+            self._moveCaretToOffset(snapshot.indexToOffset(snapshot.lineStarts[line]))
+            lineText = snapshot.text[snapshot.lineStarts[line]:snapshot.lineEndIndex(line)].strip()
+            speech.speakMessage(f"Ligne {line + 1}, {function} : {lineText}")
+        except Exception as e:
+            log.error(f"Erreur lors du déplacement vers la ligne de l'erreur : {e}")
 
+    script_moveToErrorLine.__doc__ = _("Place le curseur sur la ligne de l'erreur de la dernière exécution ; appuyer de nouveau passe à l'appel suivant de la trace.")
+    script_moveToErrorLine.category = "Notepad++"
 
-            # Créer un fichier temporaire dans le répertoire TEMP de l'utilisateur
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False, encoding="utf-8") as temp_file:
-                temp_file.write(code)
-                temp_file_path = temp_file.name
 
+    def script_readNextOutputLine(self, gesture):
+        """
+        Lit la ligne suivante de la sortie de la dernière exécution.
 
-            # Ouvrir un terminal et exécuter le script temporaire
-            systeme = os.name
-            if systeme == "nt":  # Windows
-                subprocess.Popen(["cmd", "/k", f"python {temp_file_path}"], creationflags=subprocess.CREATE_NEW_CONSOLE)
-            else:  # Linux et macOS
-                subprocess.Popen(["x-terminal-emulator", "-e", f"python3 {temp_file_path}"], close_fds=True)
-               
-            log.debug(f"Terminal ouvert et code exécuté. Fichier temporaire : {temp_file_path}")
-            speech.speakMessage("Code exécuté dans un terminal.")
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Alt+F9)")
+        self._readOutputLine(1)
 
+    script_readNextOutputLine.__doc__ = _("Lit la ligne suivante de la sortie de la dernière exécution.")
+    script_readNextOutputLine.category = "Notepad++"
 
-        except Exception as e:
-            log.error(f"Erreur lors de l'exécution du code : {e}")
-            speech.speakMessage("Erreur lors de l'exécution du code.")
-  
 
-    def script_executePythonCode(self, gesture):
+    def script_readPreviousOutputLine(self, gesture):
         """
-        Lance un terminal et exécute le code en cours.
+        Lit la ligne précédente de la sortie de la dernière exécution.
 
         Parameters
         ----------
         gesture : object
             L'événement de raccourci clavier déclenchant cette action.
         """
-        log.debug("Raccourci détecté (F5)")
-
-
-        if self.edit:
-            try:
-                self._executePythonCode()
-                log.debug("Code exécuté avec succès.")
-                speech.speakMessage("Code exécuté.")
-            except Exception as e:
-                log.error(f"Erreur lors de l'exécution du code : {e}")
-        else:
-            log.debug("Aucun objet d'édition trouvé.")
+        log.debug("Raccourci détecté (Alt+Shift+F9)")
+        self._readOutputLine(-1)
 
-    script_executePythonCode.__doc__ = ("Exécute le code Python dans un terminal")
-    script_executePythonCode.category = "Notepad++"
+    script_readPreviousOutputLine.__doc__ = _("Lit la ligne précédente de la sortie de la dernière exécution.")
+    script_readPreviousOutputLine.category = "Notepad++"
 
 
     def script_moveToNextIndentLevel(self, gesture):
@@ -1075,64 +1934,19 @@ class AppModule(appModuleHandler.AppModule):
         # Vérifier si l'objet d'édition est disponible
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLineText = caretInfo.text
-
-                # Calculer l'indentation actuelle en tenant compte des tabulations
-                currentIndent = 0
-                for char in currentLineText:
-                    if char == '\t':
-                        currentIndent += 4  # Une tabulation = 4 espaces (ajuste selon ton éditeur)
-                    elif char == ' ':
-                        currentIndent += 1
-                    else:
-                        break
-
-                # Initialiser la position de la ligne actuelle
-                currentLine = caretInfo.bookmark.startOffset
-
-                # Parcourir les lignes suivantes pour trouver un niveau d'indentation différent
-                while True:
-                    # Déplacer le curseur à la ligne suivante
-                    caretInfo.move(textInfos.UNIT_LINE, 1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text
-
-                    # Calculer l'indentation de la ligne suivante
-                    lineIndent = 0
-                    for char in lineText:
-                        if char == '\t':
-                            lineIndent += 4  # Une tabulation = 4 espaces (ajuste selon ton éditeur)
-                        elif char == ' ':
-                            lineIndent += 1
-                        else:
-                            break
-
-                    # Vérifier si l'indentation est différente de l'actuelle
-                    if lineIndent != currentIndent:
-                        # Déplacer le curseur au début de la ligne
-                        # FLB indent 1 
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' ')) 
-                        # move caret close to start text line   
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret()
-                        
-                        log.debug(f"Niveau d'indentation suivant trouvé : {lineText.strip()}")
-
-                        # Annoncer le niveau d'indentation actuel de la nouvelle ligne
-                        speech.speakMessage(f"Indentation : {lineIndent}")
-                        break
-
-                    # Si on atteint la fin du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset <= currentLine:
-                        log.debug("Aucun niveau d'indentation suivant trouvé.")
-                        speech.speakMessage("Fin du document atteinte.")
-                        break
-
-                    # Mettre à jour la position actuelle pour éviter les boucles infinies
-                    currentLine = caretInfo.bookmark.startOffset
+                snapshot, profile, caretLine = self._getIndentationContext()
+
+                # Ligne suivante (hors lignes vides et commentaires) d'indentation différente
+                targetLine = profile.nextDifferent[caretLine]
+                if targetLine != NO_LINE:
+                    self._moveCaretToLineStart(snapshot, profile, targetLine)
+                    log.debug(f"Niveau d'indentation suivant trouvé : {profile.lineText(targetLine).strip()}")
+
+                    # Annoncer le niveau d'indentation actuel de la nouvelle ligne
+                    speech.speakMessage(f"Indentation : {profile.widths[targetLine]}")
+                else:
+                    log.debug("Aucun niveau d'indentation suivant trouvé.")
+                    speech.speakMessage("Fin du document atteinte.")
 
             except Exception as e:
                 log.error(f"Erreur lors de la recherche du niveau d'indentation suivant : {e}")
@@ -1156,45 +1970,20 @@ class AppModule(appModuleHandler.AppModule):
 
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)
-                currentLineText = caretInfo.text
-                currentIndent = len(currentLineText) - len(currentLineText.lstrip())  # Calculer l'indentation actuelle
-                currentLine = caretInfo.bookmark.startOffset  # Initialiser la position de la ligne actuelle
+                snapshot, profile, caretLine = self._getIndentationContext()
 
                 # Annoncer le niveau d'indentation actuel
-                speech.speakMessage(f"Indentation : {currentIndent}")
-
-                # Parcourir les lignes précédentes pour trouver un niveau d'indentation différent
-                while True:
-                    # Déplacer le curseur à la ligne précédente
-                    caretInfo.move(textInfos.UNIT_LINE, -1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text
-                    lineIndent = len(lineText) - len(lineText.lstrip())  # Calculer l'indentation de la ligne
-
-                    # Vérifier si l'indentation est différente de l'actuelle
-                    if lineIndent != currentIndent:
-                        # Déplacer le curseur au début de la ligne
-                        # FLB indent 2 
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' ')) 
-                        # move caret close to def  
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret()                        
-                        
-                        log.debug(f"Niveau d'indentation précédent trouvé : {lineText.strip()}")
-                        speech.speakMessage(f"Indentation trouvé : {lineIndent}")
-                        break
-
-                    # Si on atteint le début du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset >= currentLine:
-                        log.debug("Aucun niveau d'indentation précédent trouvé.")
-                        speech.speakMessage("Aucun niveau d'indentation précédent trouvé.")
-                        break
-
-                    # Mettre à jour la position actuelle pour éviter les boucles infinies
-                    currentLine = caretInfo.bookmark.startOffset
+                speech.speakMessage(f"Indentation : {profile.widths[caretLine]}")
+
+                # Ligne précédente (hors lignes vides et commentaires) d'indentation différente
+                targetLine = profile.previousDifferent[caretLine]
+                if targetLine != NO_LINE:
+                    self._moveCaretToLineStart(snapshot, profile, targetLine)
+                    log.debug(f"Niveau d'indentation précédent trouvé : {profile.lineText(targetLine).strip()}")
+                    speech.speakMessage(f"Indentation trouvé : {profile.widths[targetLine]}")
+                else:
+                    log.debug("Aucun niveau d'indentation précédent trouvé.")
+                    speech.speakMessage("Aucun niveau d'indentation précédent trouvé.")
 
             except Exception as e:
                 log.error(f"Erreur lors de la recherche du niveau d'indentation précédent : {e}")
@@ -1218,66 +2007,20 @@ class AppModule(appModuleHandler.AppModule):
 
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLineText = caretInfo.text
-
-                # Calculer l'indentation actuelle en tenant compte des tabulations
-                currentIndent = 0
-                for char in currentLineText:
-                    if char == '\t':
-                        currentIndent += 4  # Une tabulation = 4 espaces (ajuste selon ton éditeur)
-                    elif char == ' ':
-                        currentIndent += 1
-                    else:
-                        break
+                snapshot, profile, caretLine = self._getIndentationContext()
 
-                # FLB : moveToNextIndentedLine 
-                caretInfo.move(textInfos.UNIT_CHARACTER, currentIndent)
-                caretInfo.updateCaret()
-                
                 # Annoncer le niveau d'indentation actuel
-                speech.speakMessage(f"Indentation actuel : {currentIndent}")
-
-                # Initialiser la position de la ligne actuelle
-                currentLine = caretInfo.bookmark.startOffset
-
-                # Parcourir les lignes suivantes pour trouver une ligne avec le même niveau d'indentation
-                while True:
-                    # Déplacer le curseur à la ligne suivante
-                    caretInfo.move(textInfos.UNIT_LINE, 1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text
-
-                    # Calculer l'indentation de la ligne suivante
-                    lineIndent = 0
-                    for char in lineText:
-                        if char == '\t':
-                            lineIndent += 4  # Une tabulation = 4 espaces (ajuste selon ton éditeur)
-                        elif char == ' ':
-                            lineIndent += 1
-                        else:
-                            break
-
-                    # Vérifier si l'indentation est égale à l'actuelle
-                    if lineIndent == currentIndent:
-                        # Déplacer le curseur au début de la ligne
-                        # FLB : moveToNextIndentedLine 
-                        caretInfo.move(textInfos.UNIT_CHARACTER, currentIndent)
-                        caretInfo.updateCaret()
-                        log.debug(f"Ligne suivante avec le même niveau d'indentation trouvée : {lineText.strip()}")
-                        speech.speakMessage(f"Ligne suivante avec le même niveau d'indentation trouvée : {lineText.strip()}")
-                        break
-
-                    # Si on atteint la fin du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset <= currentLine:
-                        log.debug("Aucune ligne suivante avec le même niveau d'indentation trouvée.")
-                        speech.speakMessage("Fin du document.")
-                        break
-
-                    # Mettre à jour la position actuelle pour éviter les boucles infinies
-                    currentLine = caretInfo.bookmark.startOffset
+                speech.speakMessage(f"Indentation actuel : {profile.widths[caretLine]}")
+
+                targetLine = profile.nextSame[caretLine]
+                if targetLine != NO_LINE:
+                    self._moveCaretToLineStart(snapshot, profile, targetLine)
+                    lineText = profile.lineText(targetLine).strip()
+                    log.debug(f"Ligne suivante avec le même niveau d'indentation trouvée : {lineText}")
+                    speech.speakMessage(f"Ligne suivante avec le même niveau d'indentation trouvée : {lineText}")
+                else:
+                    log.debug("Aucune ligne suivante avec le même niveau d'indentation trouvée.")
+                    speech.speakMessage("Fin du document.")
 
             except Exception as e:
                 log.error(f"Erreur lors de la recherche de la ligne suivante avec le même niveau d'indentation : {e}")
@@ -1301,62 +2044,20 @@ class AppModule(appModuleHandler.AppModule):
 
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)  # Étendre à la ligne entière
-                currentLineText = caretInfo.text
-
-                # Calculer l'indentation actuelle en tenant compte des tabulations
-                currentIndent = 0
-                for char in currentLineText:
-                    if char == '\t':
-                        currentIndent += 4  # Une tabulation = 4 espaces (ajuste selon ton éditeur)
-                    elif char == ' ':
-                        currentIndent += 1
-                    else:
-                        break
+                snapshot, profile, caretLine = self._getIndentationContext()
 
                 # Annoncer le niveau d'indentation actuel
-                speech.speakMessage(f"Indentation actuel : {currentIndent}")
-
-                # Initialiser la position de la ligne actuelle
-                currentLine = caretInfo.bookmark.startOffset
-
-                # Parcourir les lignes précédentes pour trouver une ligne avec le même niveau d'indentation
-                while True:
-                    # Déplacer le curseur à la ligne précédente
-                    caretInfo.move(textInfos.UNIT_LINE, -1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text
-
-                    # Calculer l'indentation de la ligne précédente
-                    lineIndent = 0
-                    for char in lineText:
-                        if char == '\t':
-                            lineIndent += 4  # Une tabulation = 4 espaces (ajuste selon ton éditeur)
-                        elif char == ' ':
-                            lineIndent += 1
-                        else:
-                            break
-
-                    # Vérifier si l'indentation est égale à l'actuelle
-                    if lineIndent == currentIndent:
-                        # Déplacer le curseur au début de la ligne
-                        # FLB : moveToNextIndentedLine 
-                        caretInfo.move(textInfos.UNIT_CHARACTER, currentIndent)
-                        caretInfo.updateCaret()
-                        log.debug(f"Ligne précédente avec le même niveau d'indentation trouvée : {lineText.strip()}")
-                        speech.speakMessage(f"Même niveau d'indentation : {lineText.strip()}")
-                        break
-
-                    # Si on atteint le début du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset >= currentLine:
-                        log.debug("Aucune ligne précédente avec le même niveau d'indentation trouvée.")
-                        speech.speakMessage("Début du document.")
-                        break
-
-                    # Mettre à jour la position actuelle pour éviter les boucles infinies
-                    currentLine = caretInfo.bookmark.startOffset
+                speech.speakMessage(f"Indentation actuel : {profile.widths[caretLine]}")
+
+                targetLine = profile.previousSame[caretLine]
+                if targetLine != NO_LINE:
+                    self._moveCaretToLineStart(snapshot, profile, targetLine)
+                    lineText = profile.lineText(targetLine).strip()
+                    log.debug(f"Ligne précédente avec le même niveau d'indentation trouvée : {lineText}")
+                    speech.speakMessage(f"Même niveau d'indentation : {lineText}")
+                else:
+                    log.debug("Aucune ligne précédente avec le même niveau d'indentation trouvée.")
+                    speech.speakMessage("Début du document.")
 
             except Exception as e:
                 log.error(f"Erreur lors de la recherche de la ligne précédente avec le même niveau d'indentation : {e}")
@@ -1381,47 +2082,29 @@ class AppModule(appModuleHandler.AppModule):
 
         if self.edit:
             try:
-                # Obtenir la position actuelle du curseur
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)
-                currentLineText = caretInfo.text
-                currentIndent = len(currentLineText) - len(currentLineText.lstrip())  # Calculer l'indentation actuelle
-                startPosition = caretInfo.bookmark.startOffset  # Position de départ de la ligne actuelle
-
-                # Créer un objet TextInfo pour la sélection
-                selectionInfo = self.edit.makeTextInfo(textInfos.POSITION_SELECTION)
-                selectionInfo.setEndPoint(caretInfo, "endToEnd")  # Définir le point de départ de la sélection
-
-                # Parcourir les lignes précédentes pour trouver un niveau d'indentation différent
-                while True:
-                    # Déplacer le curseur à la ligne précédente
-                    caretInfo.move(textInfos.UNIT_LINE, -1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text
-                    lineIndent = len(lineText) - len(lineText.lstrip())  # Calculer l'indentation de la ligne
-
-                    # Vérifier si l'indentation est différente de l'actuelle
-                    if lineIndent != currentIndent:
-                        # Sélectionner depuis la ligne actuelle jusqu'à cette ligne
-                        selectionInfo.setEndPoint(caretInfo, "startToStart")  # Définir le point de fin de la sélection
-                        selectionInfo.updateSelection()
-                        log.debug(f"Sélection jusqu'au niveau d'indentation précédent : {lineText.strip()}")
-                        speech.speakMessage(f"Sélection jusqu'au niveau d'indentation précédent : {lineText.strip()}")
-
-                        # Déplacer le curseur au début de la sélection
-                        startSelection = selectionInfo.copy()
-                        startSelection.collapse(start=True)  # Déplacer le curseur au début de la sélection
-                        startSelection.updateCaret()
-
-                        log.debug("Curseur déplacé au début de la sélection.")
-                        speech.speakMessage("Curseur déplacé au début de la sélection.")
-                        break
-
-                    # Si on atteint le début du document, arrêter la recherche
-                    if caretInfo.bookmark.startOffset >= startPosition:
-                        log.debug("Aucun niveau d'indentation précédent trouvé.")
-                        speech.speakMessage("Aucun niveau d'indentation précédent trouvé.")
-                        break
+                snapshot, profile, caretLine = self._getIndentationContext()
+
+                targetLine = profile.previousDifferent[caretLine]
+                if targetLine != NO_LINE:
+                    # Sélectionner depuis la ligne trouvée jusqu'à la fin de la ligne actuelle
+                    start = snapshot.indexToOffset(profile.lineStarts[targetLine])
+                    end = snapshot.indexToOffset(profile.lineEndIndex(caretLine))
+                    selectionInfo = self.edit.makeTextInfo(textInfos.offsets.Offsets(start, end))
+                    selectionInfo.updateSelection()
+                    lineText = profile.lineText(targetLine).strip()
+                    log.debug(f"Sélection jusqu'au niveau d'indentation précédent : {lineText}")
+                    speech.speakMessage(f"Sélection jusqu'au niveau d'indentation précédent : {lineText}")
+
+                    # Déplacer le curseur au début de la sélection
+                    startSelection = selectionInfo.copy()
+                    startSelection.collapse()
+                    startSelection.updateCaret()
+
+                    log.debug("Curseur déplacé au début de la sélection.")
+                    speech.speakMessage("Curseur déplacé au début de la sélection.")
+                else:
+                    log.debug("Aucun niveau d'indentation précédent trouvé.")
+                    speech.speakMessage("Aucun niveau d'indentation précédent trouvé.")
 
             except Exception as e:
                 log.error(f"Erreur lors de la sélection jusqu'au niveau d'indentation précédent : {e}")
@@ -1445,31 +2128,21 @@ class AppModule(appModuleHandler.AppModule):
 
         if self.edit:
             try:
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)
-                currentLineText = caretInfo.text
-                currentIndent = len(currentLineText) - len(currentLineText.lstrip())
-                startPosition = caretInfo.bookmark.startOffset
-
-                while True:
-                    caretInfo.move(textInfos.UNIT_LINE, 1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text
-                    lineIndent = len(lineText) - len(lineText.lstrip())
-
-                    if lineIndent != currentIndent:
-                        # Sélectionner jusqu'à cette ligne
-                        selectionInfo = self.edit.makeTextInfo(textInfos.POSITION_SELECTION)
-                        selectionInfo.setEndPoint(caretInfo, "endToEnd")
-                        selectionInfo.updateSelection()
-                        log.debug(f"Sélection jusqu'au niveau d'indentation suivant : {lineText.strip()}")
-                        speech.speakMessage(f"Sélection jusqu'au niveau d'indentation suivant : {lineText.strip()}")
-                        break
-
-                    if caretInfo.bookmark.startOffset <= startPosition:
-                        log.debug("Aucun niveau d'indentation suivant trouvé.")
-                        speech.speakMessage("Aucun niveau d'indentation suivant trouvé.")
-                        break
+                snapshot, profile, caretLine = self._getIndentationContext()
+
+                targetLine = profile.nextDifferent[caretLine]
+                if targetLine != NO_LINE:
+                    # Étendre la sélection actuelle jusqu'à la fin de la ligne trouvée
+                    start = self.edit.makeTextInfo(textInfos.POSITION_SELECTION).bookmark.startOffset
+                    end = snapshot.indexToOffset(profile.lineEndIndex(targetLine))
+                    selectionInfo = self.edit.makeTextInfo(textInfos.offsets.Offsets(start, end))
+                    selectionInfo.updateSelection()
+                    lineText = profile.lineText(targetLine).strip()
+                    log.debug(f"Sélection jusqu'au niveau d'indentation suivant : {lineText}")
+                    speech.speakMessage(f"Sélection jusqu'au niveau d'indentation suivant : {lineText}")
+                else:
+                    log.debug("Aucun niveau d'indentation suivant trouvé.")
+                    speech.speakMessage("Aucun niveau d'indentation suivant trouvé.")
 
             except Exception as e:
                 log.error(f"Erreur lors de la sélection jusqu'au niveau d'indentation suivant : {e}")
@@ -1493,36 +2166,17 @@ class AppModule(appModuleHandler.AppModule):
 
         if self.edit:
             try:
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)
-                currentLineText = caretInfo.text
-                currentIndent = len(currentLineText) - len(currentLineText.lstrip())
-                currentLine = caretInfo.bookmark.startOffset
-
-                while True:
-                    caretInfo.move(textInfos.UNIT_LINE, -1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text
-                    lineIndent = len(lineText) - len(lineText.lstrip())
-
-                    if lineIndent != currentIndent:
-                        # Revenir à la ligne précédente (la première du niveau actuel)
-                        caretInfo.move(textInfos.UNIT_LINE, 1)
-                        # FLB indent 3 
-                        # FLB 2 : deplacement du curseur vers le haut 
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' ')) 
-                        # move caret close to def  
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret()                        
-
-                        log.debug(f"Première ligne du niveau d'indentation actuel trouvée : {caretInfo.text.strip()}")
-                        speech.speakMessage(f"Première ligne du niveau d'indentation : {caretInfo.text.strip()}")
-                        break
-
-                    if caretInfo.bookmark.startOffset >= currentLine:
-                        log.debug("Début du fichier atteint.")
-                        speech.speakMessage("Début du fichier atteint.")
-                        break
+                snapshot, profile, caretLine = self._getIndentationContext()
+
+                if profile.previousDifferent[caretLine] != NO_LINE:
+                    targetLine = profile.firstLineOfLevel(caretLine)
+                    self._moveCaretToLineStart(snapshot, profile, targetLine)
+                    lineText = profile.lineText(targetLine).strip()
+                    log.debug(f"Première ligne du niveau d'indentation actuel trouvée : {lineText}")
+                    speech.speakMessage(f"Première ligne du niveau d'indentation : {lineText}")
+                else:
+                    log.debug("Début du fichier atteint.")
+                    speech.speakMessage("Début du fichier atteint.")
 
             except Exception as e:
                 log.error(f"Erreur lors de la recherche de la première ligne du niveau d'indentation actuel : {e}")
@@ -1546,36 +2200,17 @@ class AppModule(appModuleHandler.AppModule):
 
         if self.edit:
             try:
-                caretInfo = self.edit.makeTextInfo(textInfos.POSITION_CARET)
-                caretInfo.expand(textInfos.UNIT_LINE)
-                currentLineText = caretInfo.text
-                currentIndent = len(currentLineText) - len(currentLineText.lstrip())
-                currentLine = caretInfo.bookmark.startOffset
-
-                while True:
-                    caretInfo.move(textInfos.UNIT_LINE, 1)
-                    caretInfo.expand(textInfos.UNIT_LINE)
-                    lineText = caretInfo.text
-                    lineIndent = len(lineText) - len(lineText.lstrip())
-
-                    if lineIndent != currentIndent:
-                        # Revenir à la ligne précédente (la dernière du niveau actuel)
-                        caretInfo.move(textInfos.UNIT_LINE, -1)
-                        # FLB indent 3
-                        # FLB 2 : deplacement du curseur vers le haut 
-                        caretOffset = len(caretInfo.text) - len(caretInfo.text.lstrip(' ')) 
-                        # move caret close to def  
-                        caretInfo.move(textInfos.UNIT_CHARACTER, caretOffset)
-                        caretInfo.updateCaret() 
-                        
-                        log.debug(f"Dernière ligne du niveau d'indentation actuel trouvée : {caretInfo.text.strip()}")
-                        speech.speakMessage(f"Dernière ligne du niveau d'indentation : {caretInfo.text.strip()}")
-                        break
-
-                    if caretInfo.bookmark.startOffset <= currentLine:
-                        log.debug("Fin du fichier atteinte.")
-                        speech.speakMessage("Fin du fichier atteinte.")
-                        break
+                snapshot, profile, caretLine = self._getIndentationContext()
+
+                if profile.nextDifferent[caretLine] != NO_LINE:
+                    targetLine = profile.lastLineOfLevel(caretLine)
+                    self._moveCaretToLineStart(snapshot, profile, targetLine)
+                    lineText = profile.lineText(targetLine).strip()
+                    log.debug(f"Dernière ligne du niveau d'indentation actuel trouvée : {lineText}")
+                    speech.speakMessage(f"Dernière ligne du niveau d'indentation : {lineText}")
+                else:
+                    log.debug("Fin du fichier atteinte.")
+                    speech.speakMessage("Fin du fichier atteinte.")
 
             except Exception as e:
                 log.error(f"Erreur lors de la recherche de la dernière ligne du niveau d'indentation actuel : {e}")
@@ -1586,17 +2221,75 @@ class AppModule(appModuleHandler.AppModule):
     script_moveToLastLineInIndentation.category = "Notepad++"
 
 
+    def script_reportScriptMetrics(self, gesture):
+        """
+        Annonce les commandes les plus lentes ; un double appui enregistre
+        toutes les mesures dans un fichier.
+
+        Parameters
+        ----------
+        gesture : object
+            L'événement de raccourci clavier déclenchant cette action.
+        """
+        log.debug("Raccourci détecté (Ctrl+Shift+F12)")
+
+        try:
+            if scriptHandler.getLastScriptRepeatCount() > 0:
+                # Double appui : écrire toutes les mesures dans le répertoire temporaire
+                dumpPath = os.path.join(tempfile.gettempdir(), "nppScriptMetrics.tsv")
+                self._metrics.dump(dumpPath)
+                log.debug(f"Mesures enregistrées dans {dumpPath}")
+                speech.speakMessage(f"Mesures enregistrées dans {dumpPath}")
+                return
+
+            summaries = self._metrics.summary()
+            if not summaries:
+                speech.speakMessage("Aucune mesure disponible.")
+                return
+            # Les trois commandes les plus lentes (95e centile)
+            for summary in summaries[:3]:
+                speech.speakMessage(
+                    f"{summary.name} : médiane {summary.p50:.0f} ms, 95 pour cent {summary.p95:.0f} ms, "
+                    f"maximum {summary.max:.0f} ms, {summary.roundTrips} allers-retours, {summary.lines} lignes"
+                )
+
+        except Exception as e:
+            log.error(f"Erreur lors de l'annonce des mesures : {e}")
+
+    script_reportScriptMetrics.__doc__ = _("Annonce les commandes les plus lentes. Appuyer deux fois pour enregistrer toutes les mesures dans un fichier.")
+    script_reportScriptMetrics.category = "Notepad++"
+
+
     __gestures = {
     "kb:F2": "moveToNextFunction",      
     "kb:Shift+F2": "moveToPreviousFunction",
     "kb:F7": "moveToNextClass",
     "kb:Shift+F7": "moveToPreviousClass",
     "kb:F8": "jumpToMain",
+    "kb:alt+F7": "showQuickOutline",
+    "kb:NVDA+shift+F7": "goToProjectSymbol",
+    "kb:control+F7": "reportCurrentScope",
+    "kb:control+shift+F7": "toggleScopeAnnouncement",
+    "kb:NVDA+alt+downArrow": "moveToNextSibling",
+    "kb:NVDA+alt+upArrow": "moveToPreviousSibling",
+    "kb:NVDA+alt+leftArrow": "moveToParentScope",
+    "kb:NVDA+alt+rightArrow": "moveToFirstChildScope",
+    "kb:NVDA+alt+shift+rightArrow": "moveToLastChildScope",
     "kb:control+shift+r": "selectCurrentClass",
     "kb:control+r": "selectCurrentFunction",
     "kb:control+shift+delete": "deleteCurrentClass",
     "kb:control+delete": "deleteCurrentFunction",
+    "kb:control+shift+insert": "restoreDeletedBlock",
     "kb:control+F5": "executePythonCode",
+    "kb:control+shift+F5": "stopExecution",
+    "kb:control+alt+F5": "restartSession",
+    "kb:control+alt+shift+F5": "toggleSessionMode",
+    "kb:alt+F9": "readNextOutputLine",
+    "kb:alt+shift+F9": "readPreviousOutputLine",
+    "kb:control+alt+F6": "readLatestError",
+    "kb:control+F6": "moveToErrorLine",
+    "kb:control+shift+F6": "reportSyntaxError",
+    "kb:alt+shift+F6": "silenceOutput",
     "kb:alt+downArrow": "moveToNextIndentLevel",
     "kb:alt+upArrow": "moveToPreviousIndentLevel",      
     "kb:control+alt+downArrow": "moveToNextIndentedLine",
@@ -1605,4 +2298,99 @@ class AppModule(appModuleHandler.AppModule):
     "kb:shift+alt+upArrow": "selectToPreviousIndentLevel",
     "kb:alt+!": "moveToFirstLineInIndentation",
     "kb:alt+:": "moveToLastLineInIndentation",
+    "kb:control+shift+F12": "reportScriptMetrics",
 }
+
+
+def _landmarkScriptName(landmark, forward):
+    # Nom (sans le préfixe script_) de la commande générée pour un repère
+    return f"moveTo{'Next' if forward else 'Previous'}Landmark_{landmark.name}"
+
+
+def _landmarkScript(landmark, forward):
+    """
+    Crée la commande qui déplace le curseur vers le repère suivant ou précédent.
+
+    Parameters
+    ----------
+    landmark : Landmark
+        Le repère configuré.
+    forward : bool
+        True pour le repère suivant, False pour le repère précédent.
+
+    Returns
+    -------
+    function
+        La méthode script_* de la commande.
+    """
+    direction = "suivant" if forward else "précédent"
+
+    def script(self, gesture):
+        log.debug(f"Raccourci détecté (repère {landmark.name} {direction})")
+
+        if self.edit:
+            try:
+                entry = self._moveToOutlineEntry((landmark.name,), forward)
+                if entry:
+                    log.debug(f"Repère {landmark.name} {direction} trouvé : {entry.text}")
+                    speech.speakMessage(f"{entry.text}")
+                else:
+                    log.debug(f"Aucun repère {landmark.name} {direction} trouvé.")
+                    speech.speakMessage(f"Aucun repère {landmark.name} {direction} trouvé.")
+
+            except Exception as e:
+                log.error(f"Erreur lors de la recherche du repère {landmark.name} {direction} : {e}")
+        else:
+            log.debug("Aucun objet d'édition trouvé.")
+
+    script.__name__ = "script_" + _landmarkScriptName(landmark, forward)
+    script.__doc__ = _("Déplace le curseur vers le repère {name} {direction}.").format(name=landmark.name, direction=direction)
+    script.category = "Notepad++"
+    return script
+
+
+# Une commande "suivant" et une commande "précédent" par repère configuré
+for _landmark in LANDMARKS:
+    for _forward in (True, False):
+        setattr(AppModule, "script_" + _landmarkScriptName(_landmark, _forward), _landmarkScript(_landmark, _forward))
+
+
+def _instrumented(script):
+    """
+    Enveloppe une commande pour mesurer chacune de ses exécutions : temps
+    écoulé, allers-retours vers Notepad++ et lignes analysées.
+
+    Parameters
+    ----------
+    script : function
+        La méthode script_* à mesurer.
+
+    Returns
+    -------
+    function
+        La méthode enveloppée (mêmes nom, docstring et catégorie).
+    """
+    name = script.__name__[len("script_"):]
+
+    @functools.wraps(script)
+    def instrumentedScript(self, gesture):
+        edit = self.edit
+        if edit is not None:
+            # Les TextInfo créés pendant la commande sont comptés
+            self.edit = CountingEditProxy(edit)
+        probe = self._metrics.start()
+        try:
+            return script(self, gesture)
+        finally:
+            sample = self._metrics.stop(name, probe)
+            if isinstance(self.edit, CountingEditProxy):
+                self.edit = edit
+            log.debug(f"{name} : {sample.milliseconds:.1f} ms sur le thread principal, {sample.roundTrips} allers-retours, {sample.lines} lignes analysées")
+
+    return instrumentedScript
+
+
+# Toutes les commandes du module sont mesurées
+for _name, _script in list(vars(AppModule).items()):
+    if _name.startswith("script_") and callable(_script):
+        setattr(AppModule, _name, _instrumented(_script))
@@ -0,0 +1,2 @@
+# Outils de l'appModule Notepad++ pour le développement python
+# Modules en python pur (sans dépendance à NVDA) utilisés par notepadPlusPlus.py
@@ -0,0 +1,192 @@
+# Moteurs de structure par langage, choisis selon l'extension du document
+
+"""
+Un moteur de structure (StructureBackend) construit l'arbre des portées
+d'un document ; l'outline (navigation F2 / F7, liste des symboles) et les
+commandes de sélection, de suppression et de navigation structurelle
+l'utilisent sans connaître le langage.
+
+Le moteur python (PythonBackend) garde l'outline par motifs, mis à jour de
+façon incrémentale et enregistré dans le cache sur disque, et les blocs
+délimités par l'indentation. Les moteurs des langages à accolades
+(BraceBackend, voir nppTools.braces) déduisent l'outline de l'arbre des
+portées et délimitent les blocs par leurs accolades.
+
+Le moteur d'un document est choisi selon l'extension de son fichier
+(backendForPath) ; un document sans extension connue, ou jamais enregistré,
+est traité comme du python.
+"""
+
+import os
+
+from .braces import C_FAMILY, JAVASCRIPT, buildBraceScopeTree
+from .outline import Outline, buildOutline
+from .structure import buildScopeTree
+from .syntax import checkSyntax
+
+# Premiers caractères d'une ligne qui ne commence pas une instruction de premier
+# niveau : ligne vide, indentée ou fermant des parenthèses
+_NOT_TOP_LEVEL = frozenset(("", " ", "\t", "\r", "\n", ")", "]", "}"))
+
+
+class StructureBackend:
+    """
+    Interface d'un moteur de structure.
+
+    Attributes
+    ----------
+    name : str
+        Le nom du langage.
+    extensions : tuple of str
+        Les extensions (en minuscules, avec le point) des fichiers du langage.
+    incremental : bool
+        True si l'outline est construit par motifs (PatternRegistry) : mise
+        à jour incrémentale, recherche bornée (scanNearby) et cache sur
+        disque. False s'il est déduit de l'arbre des portées.
+    indentedBlocks : bool
+        True si les blocs sont délimités par l'indentation (nppTools.blocks),
+        False s'ils le sont par les lignes de début et de fin des portées.
+    checksSyntax : bool
+        True si la syntaxe du document est vérifiée (voir checkSyntax).
+    """
+
+    name = ""
+    extensions = ()
+    incremental = False
+    indentedBlocks = False
+    checksSyntax = False
+
+    def buildScopeTree(self, text):
+        """
+        Construit l'arbre des portées (ScopeTree) d'un document.
+        """
+        raise NotImplementedError
+
+    def buildOutline(self, text, patterns):
+        """
+        Construit l'outline d'un document par motifs (moteurs incrémentaux seulement).
+        """
+        raise NotImplementedError
+
+    def checkSyntax(self, text):
+        """
+        Retourne la première erreur de syntaxe (SyntaxIssue) du document, ou
+        None si elle n'est pas vérifiée pour ce langage.
+        """
+        return None
+
+    def startsTopLevel(self, lineText):
+        """
+        Indique si une ligne commence probablement une instruction de premier
+        niveau : une fenêtre du document délimitée par de telles lignes
+        contient des portées complètes (voir DocumentSnapshot.window).
+        """
+        return lineText[:1] not in _NOT_TOP_LEVEL
+
+
+class PythonBackend(StructureBackend):
+    """
+    Moteur des documents python : ast, analyseur tolérant et motifs.
+    """
+
+    name = "python"
+    extensions = (".py", ".pyw")
+    incremental = True
+    indentedBlocks = True
+    checksSyntax = True
+
+    def buildScopeTree(self, text):
+        return buildScopeTree(text)
+
+    def buildOutline(self, text, patterns):
+        return buildOutline(text, patterns)
+
+    def checkSyntax(self, text):
+        return checkSyntax(text)
+
+    def startsTopLevel(self, lineText):
+        # Un commentaire en colonne 0 peut se trouver dans le corps d'une fonction
+        return lineText[:1] not in _NOT_TOP_LEVEL and lineText[0] != "#"
+
+
+class BraceBackend(StructureBackend):
+    """
+    Moteur d'un langage à accolades.
+
+    Parameters
+    ----------
+    name : str
+        Le nom du langage.
+    language : BraceLanguage
+        Les règles du langage (voir nppTools.braces).
+    extensions : tuple of str
+        Les extensions des fichiers du langage.
+    """
+
+    def __init__(self, name, language, extensions):
+        self.name = name
+        self.language = language
+        self.extensions = extensions
+
+    def buildScopeTree(self, text):
+        return buildBraceScopeTree(text, self.language)
+
+    def startsTopLevel(self, lineText):
+        # Ni accolade (style Allman), ni préprocesseur, ni commentaire
+        return lineText[:1] not in _NOT_TOP_LEVEL and lineText[0] not in "{#/*"
+
+
+def outlineFromScopes(tree, patterns):
+    """
+    Déduit l'outline d'un document de son arbre des portées.
+
+    Parameters
+    ----------
+    tree : ScopeTree
+        L'arbre des portées du document.
+    patterns : PatternRegistry
+        Les motifs du snapshot, retenus par l'outline.
+
+    Returns
+    -------
+    Outline
+        Une déclaration par portée, à la ligne de son nom.
+    """
+    kinds = {}
+    for scope in tree:
+        lineText = tree.lineText(scope.line)
+        column = len(lineText) - len(lineText.lstrip())
+        lines, offsets, columns, texts = kinds.setdefault(scope.kind, ([], [], [], []))
+        lines.append(scope.line)
+        offsets.append(tree.lineStarts[scope.line] + column)
+        columns.append(column)
+        texts.append(lineText.strip())
+    return Outline.restore(tree.text, patterns, [None] * tree.lineCount, kinds)
+
+
+PYTHON_BACKEND = PythonBackend()
+
+BACKENDS = (
+    PYTHON_BACKEND,
+    BraceBackend("c", C_FAMILY, (".c", ".h", ".cpp", ".cc", ".cxx", ".hpp", ".hh", ".hxx", ".java", ".cs")),
+    BraceBackend("javascript", JAVASCRIPT, (".js", ".mjs", ".cjs", ".jsx")),
+)
+
+_BY_EXTENSION = {extension: backend for backend in BACKENDS for extension in backend.extensions}
+
+
+def backendForPath(path):
+    """
+    Retourne le moteur de structure d'un document selon l'extension de son fichier.
+
+    Parameters
+    ----------
+    path : str
+        Le chemin (ou le nom) du document.
+
+    Returns
+    -------
+    StructureBackend
+        Le moteur du langage, PYTHON_BACKEND si l'extension est inconnue.
+    """
+    return _BY_EXTENSION.get(os.path.splitext(path)[1].lower(), PYTHON_BACKEND)
@@ -0,0 +1,102 @@
+# Construction des outlines sur un thread de travail dédié
+
+"""
+L'analyse complète d'un gros fichier ne doit pas retarder la parole ni
+l'écho clavier de NVDA : elle est confiée à un thread de travail unique,
+qui construit l'outline de chaque nouveau snapshot, puis l'arbre des
+portées, son index et la table des blocs (sélection, suppression,
+navigation structurelle et annonce de la portée du curseur), puis vérifie
+sa syntaxe. Une fois le
+document stable (aucune version plus récente en attente), ses structures
+sont enregistrées dans le cache sur disque, s'il est activé.
+
+Le thread construit l'outline d'un snapshot (voir nppTools.snapshot) puis le
+publie en une seule affectation. Les lecteurs voient donc soit l'index
+précédent, complet et inchangé, soit le nouvel index complet, jamais un
+index en cours de construction.
+"""
+
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class OutlineBuilder:
+    """
+    Thread de travail qui construit l'outline des snapshots demandés.
+
+    Une seule demande est conservée par fenêtre d'édition : si le document
+    change avant que le thread ne s'en occupe, seule la version la plus
+    récente est analysée.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="nppOutlineBuilder", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, snapshot, tabWidth=4):
+        """
+        Demande l'analyse d'un snapshot : construction de l'outline et de
+        l'arbre des portées et de la table des blocs, vérification de la
+        syntaxe et enregistrement dans le cache sur disque.
+
+        Parameters
+        ----------
+        key : int
+            La fenêtre d'édition (windowHandle) du document.
+        snapshot : DocumentSnapshot
+            Le snapshot à analyser.
+        tabWidth : int
+            La largeur de tabulation de la table des blocs et du profil
+            d'indentation enregistré dans le cache.
+        """
+        if (
+            snapshot.readyOutline is not None and snapshot.readyScopeTree is not None
+            and snapshot.hasBlockExtents(tabWidth)
+            and snapshot.syntaxChecked and not snapshot.needsCaching
+        ):
+            return
+        with self._condition:
+            self._pending[key] = (snapshot, tabWidth)
+            self._condition.notify()
+
+    def stop(self):
+        """
+        Arrête le thread de travail ; les demandes en attente sont abandonnées.
+        """
+        with self._condition:
+            self._running = False
+            self._pending.clear()
+            self._condition.notify()
+        self._thread.join(1)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                key = next(iter(self._pending))
+                snapshot, tabWidth = self._pending.pop(key)
+            try:
+                # Construit et publie l'outline (protégé par le verrou du snapshot)
+                snapshot.outline
+                # Arbre des portées et son index : les commandes ne les construisent pas au premier appui
+                snapshot.scopeTree.index
+                # Table des blocs : sélection et suppression sans calcul sur le thread principal
+                if snapshot.backend.indentedBlocks:
+                    snapshot.blockExtents(tabWidth)
+                # Vérifie la syntaxe ; le résultat est mis en cache selon le texte
+                snapshot.syntaxIssue
+                with self._condition:
+                    # Une version plus récente du document rendrait l'enregistrement inutile
+                    stable = key not in self._pending
+                if stable:
+                    snapshot.saveToCache(tabWidth)
+            except Exception as e:
+                log.error(f"Erreur lors de l'analyse du document en arrière-plan : {e}")
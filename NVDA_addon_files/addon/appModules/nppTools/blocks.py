@@ -0,0 +1,167 @@
+# Étendue des blocs : table des fins de bloc calculée une fois par version du document
+
+"""
+Pour chaque ligne qui commence une ligne logique, calcule la dernière ligne
+du bloc qu'elle introduit (les lignes suivantes plus indentées), à la
+manière d'une table de parenthèses correspondantes : une seule passe avec
+une pile monotone sur les largeurs d'indentation.
+
+Les lignes vides, les commentaires et les lignes qui prolongent une ligne
+logique (chaîne multiligne, parenthèses ouvertes, antislash) ne ferment
+jamais un bloc. Les décorateurs sont rattachés à la déclaration qui les suit.
+
+Une fois la table construite, l'étendue d'un bloc s'obtient en O(1) :
+sélection, suppression et navigation structurelle la partagent.
+"""
+
+from array import array
+from collections import namedtuple
+
+from .indentation import NO_LINE
+from .instrumentation import countLines
+
+BlockRange = namedtuple("BlockRange", ("line", "startLine", "endLine", "startIndex", "endIndex"))
+BlockRange.__doc__ = """
+L'étendue résolue d'un bloc.
+
+line : ligne qui introduit le bloc (la déclaration)
+startLine : première ligne du bloc, décorateurs compris
+endLine : dernière ligne du bloc
+startIndex : indice du début de `startLine` dans le texte
+endIndex : indice de fin de `endLine` dans le texte, saut de ligne compris
+"""
+
+
+class BlockExtents:
+    """
+    Table des étendues de blocs d'un document.
+
+    Parameters
+    ----------
+    profile : IndentationProfile
+        Le profil d'indentation du document.
+    lineStates : sequence, optional
+        L'état lexical au début de chaque ligne (voir structure.lexLine) ;
+        une ligne dont l'état n'est pas None prolonge la ligne logique
+        précédente. Sans cette information, toutes les lignes non vides
+        sont considérées comme des débuts de ligne logique.
+    """
+
+    def __init__(self, profile, lineStates=None):
+        self.profile = profile
+        lineCount = profile.lineCount
+        countLines(lineCount)
+        widths = profile.widths
+        text = profile.text
+        self._blockEnds = array("i", range(lineCount))
+        self._blockStarts = array("i", range(lineCount))
+
+        stack = []
+        previousLogical = NO_LINE
+        for line in range(lineCount):
+            if profile.isSkipped(line) or (lineStates is not None and lineStates[line] is not None):
+                continue
+            width = widths[line]
+            # Pile monotone : cette ligne ferme tous les blocs au moins aussi indentés
+            while stack and widths[stack[-1]] >= width:
+                opened = stack.pop()
+                self._blockEnds[opened] = profile.previousCode(line - 1)
+            stack.append(line)
+            # Décorateurs : une suite de "@" de même indentation juste au-dessus
+            if (
+                previousLogical != NO_LINE
+                and widths[previousLogical] == width
+                and text.startswith("@", profile.firstCharIndex(previousLogical))
+            ):
+                self._blockStarts[line] = self._blockStarts[previousLogical]
+            previousLogical = line
+        lastLine = profile.previousCode(lineCount - 1)
+        for opened in stack:
+            self._blockEnds[opened] = lastLine
+
+    @classmethod
+    def restore(cls, profile, blockEnds, blockStarts):
+        """
+        Recrée une table à partir de ses tableaux, sans analyser le texte
+        (voir nppTools.outlineCache).
+
+        Parameters
+        ----------
+        profile : IndentationProfile
+            Le profil d'indentation du document.
+        blockEnds, blockStarts : array
+            Les tableaux `tables` d'une table calculée sur le même texte.
+
+        Returns
+        -------
+        BlockExtents
+            La table, identique à celle calculée à partir du profil.
+        """
+        blocks = cls.__new__(cls)
+        blocks.profile = profile
+        blocks._blockEnds = blockEnds
+        blocks._blockStarts = blockStarts
+        return blocks
+
+    @property
+    def tables(self):
+        """
+        Les tableaux de fin et de début de bloc de chaque ligne, pour l'enregistrement de la table.
+        """
+        return self._blockEnds, self._blockStarts
+
+    def blockEnd(self, line):
+        """
+        Retourne la dernière ligne du bloc introduit par `line`.
+
+        Parameters
+        ----------
+        line : int
+            Une ligne qui commence une ligne logique.
+
+        Returns
+        -------
+        int
+            La dernière ligne du bloc (`line` elle-même si le bloc est vide).
+        """
+        return self._blockEnds[line]
+
+    def blockStart(self, line):
+        """
+        Retourne la première ligne du bloc, décorateurs compris.
+        """
+        return self._blockStarts[line]
+
+    def extent(self, line):
+        """
+        Retourne l'étendue complète du bloc introduit par `line`.
+
+        Parameters
+        ----------
+        line : int
+            Une ligne qui commence une ligne logique (une déclaration par exemple).
+
+        Returns
+        -------
+        tuple of (int, int)
+            La première ligne (décorateurs compris) et la dernière ligne du bloc.
+        """
+        return self._blockStarts[line], self._blockEnds[line]
+
+    def resolve(self, line):
+        """
+        Résout l'étendue du bloc introduit par `line`, en lignes et en indices
+        du texte.
+
+        Parameters
+        ----------
+        line : int
+            Une ligne qui commence une ligne logique (une déclaration par exemple).
+
+        Returns
+        -------
+        BlockRange
+            L'étendue du bloc.
+        """
+        startLine, endLine = self._blockStarts[line], self._blockEnds[line]
+        return BlockRange(line, startLine, endLine, self.profile.lineStarts[startLine], self.profile.lineEndIndex(endLine))
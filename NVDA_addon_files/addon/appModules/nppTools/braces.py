@@ -0,0 +1,349 @@
+# Moteur de structure des langages à accolades : C, C++, Java, C#, JavaScript
+
+"""
+Construit l'arbre des portées (voir nppTools.structure) d'un document écrit
+dans un langage à accolades, en une seule passe linéaire sur le texte.
+
+Un analyseur lexical réduit le texte à ses seuls jetons utiles (accolades,
+parenthèses, points-virgules) en sautant commentaires, chaînes, lignes du
+préprocesseur et, en JavaScript, expressions régulières littérales : une
+accolade écrite dans une chaîne ou un commentaire ne compte jamais. Les
+accolades sont appariées avec une pile.
+
+L'en-tête d'une accolade ouvrante est le texte qui la précède depuis la
+dernière accolade ou le dernier point-virgule. Il est reconnu par les règles
+du langage : classe, structure, interface, espace de noms... (KIND_CLASS)
+ou fonction, méthode, fonction fléchée nommée (KIND_FUNCTION). Les autres
+accolades (if, boucles, initialiseurs, objets littéraux, fonctions
+anonymes) imbriquent le code sans créer de portée. Chaque caractère
+appartient à un seul en-tête : l'analyse reste linéaire.
+"""
+
+import re
+from collections import namedtuple
+
+from .document import computeLineStarts
+from .instrumentation import countLines
+from .patterns import KIND_MODULE, KIND_FUNCTION, KIND_CLASS
+from .structure import Scope, ScopeTree
+
+BraceLanguage = namedtuple("BraceLanguage", ("name", "tokens", "classify", "regexLiterals"))
+BraceLanguage.__doc__ = """
+Les règles d'un langage à accolades.
+
+name : nom du langage
+tokens : expression régulière des jetons (commentaires, chaînes, "{", "}", "(", ")", ";")
+classify : fonction (en-tête, dans des parenthèses) -> (type, nom, indice du début de la
+    déclaration, indice du nom) ou None (voir _classifyC et _classifyJavaScript)
+regexLiterals : True si "/" peut ouvrir une expression régulière littérale (JavaScript)
+"""
+
+# Mots-clés suivis de parenthèses qui ne déclarent pas une fonction
+_KEYWORDS = frozenset((
+    "if", "else", "for", "foreach", "while", "do", "switch", "case", "catch", "try", "finally",
+    "return", "throw", "new", "delete", "sizeof", "alignof", "decltype", "typeof", "instanceof",
+    "using", "lock", "fixed", "checked", "unchecked", "synchronized", "with", "await", "yield",
+    "function", "static_assert", "defined", "void",
+))
+
+# Nombre maximal d'appels examinés dans un en-tête : l'analyse reste linéaire
+_MAX_CANDIDATES = 8
+
+_BLOCK_COMMENT = r"/\*(?:[\s\S]*?\*/|[\s\S]*)"
+_DOUBLE_QUOTED = r'"(?:\\[\s\S]|[^"\\\n])*"?'
+_SINGLE_QUOTED = r"'(?:\\[\s\S]|[^'\\\n])*'?"
+
+_C_TOKENS = re.compile(
+    r"//[^\n]*|" + _BLOCK_COMMENT
+    # Lignes du préprocesseur (continuées par un antislash)
+    + r"|(?m:^[ \t]*#(?:\\[\s\S]|[^\\\n])*)"
+    # Blocs de texte Java et chaînes brutes C#
+    + r'|"""[\s\S]*?(?:"""|\Z)'
+    + "|" + _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED
+    + r"|[{}();]"
+)
+
+_JS_TOKENS = re.compile(
+    r"//[^\n]*|" + _BLOCK_COMMENT
+    + "|" + _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED
+    + r"|`(?:\\[\s\S]|[^`\\])*`?"
+    + r"|[{}();/]"
+)
+_JS_REGEX = re.compile(r"/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[A-Za-z]*")
+# Caractères et mots après lesquels "/" ouvre une expression régulière plutôt qu'une division
+_REGEX_PRECEDERS = frozenset("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = frozenset(("return", "typeof", "case", "do", "else", "in", "of", "void", "yield", "await", "delete", "throw"))
+
+_NON_SPACE = re.compile(r"\S")
+_INDENT = re.compile(r"[ \t]*")
+
+# Étiquettes d'accès C++ (public:) et de cas (case X:) en tête de déclaration
+_C_LABELS = re.compile(r"\s*(?:(?:public|private|protected|signals|slots|default|case\b[^:\n]*)\s*:(?!:)\s*)+")
+_C_CLASS = re.compile(
+    r"\b(?:class|struct|interface|enum|union|namespace|record)\s+(?:(?:class|struct)\s+)?"
+    r"(?:\[\[[^\]]*\]\]\s*)?(?P<name>[A-Za-z_]\w*(?:(?:::|\.)[A-Za-z_]\w*)*)"
+)
+_C_CALL = re.compile(r"(?P<name>operator\s*(?:\(\)|[^\s(]+)|~?[A-Za-z_]\w*(?:\s*::\s*~?[A-Za-z_]\w*)*)\s*\(")
+# Fin de la liste des paramètres (un niveau de parenthèses imbriquées, pour les valeurs par défaut)
+_C_PARAMETERS = re.compile(r"[^()]*(?:\([^()]*\)[^()]*)*\)")
+# Ce qui peut suivre la liste des paramètres d'une fonction avant son accolade
+_C_TRAILER = re.compile(
+    r"\s*(?:(?:(?:const|override|final|noexcept|mutable|volatile|try)\b|&&?|noexcept\s*\([^()]*\)"
+    r"|throws\s+[\w.,\s<>]+|->[^;]*|:(?!:)[^;]*|where\s[^;]*)\s*)*"
+)
+# Parenthèses (arguments d'annotations) et chevrons (paramètres de template) d'un préfixe
+_GROUPED = re.compile(r"\([^()]*\)|<[^<>]*>")
+_C_NEW = re.compile(r"\bnew\s*\(\s*\)")
+
+_JS_NAME = r"[A-Za-z_$][\w$]*"
+_JS_CLASS = re.compile(rf"\bclass\s+(?P<name>{_JS_NAME})(?:\s+extends\b[^{{]*)?\s*\Z")
+_JS_CLASS_EXPRESSION = re.compile(rf"(?P<name>{_JS_NAME})\s*[:=]\s*class\b(?:\s+{_JS_NAME})?(?:\s+extends\b[^{{]*)?\s*\Z")
+_JS_FUNCTION = re.compile(rf"\bfunction\s*\*?\s*(?P<name>{_JS_NAME})\s*\(")
+_JS_ASSIGNED = re.compile(rf"(?P<name>{_JS_NAME})\s*(?<![=!<>])[:=]\s*(?:async\s*)?\Z")
+# Nom juste avant une position (paramètre d'une flèche, nom d'une fonction ou d'une méthode)
+_JS_ARROW_PARAMETER = re.compile(rf"{_JS_NAME}(?=\s*\Z)")
+_JS_MODIFIERS = re.compile(r"\s*(?:(?:static|async|get|set|public|private|protected|readonly|override)\s+|\*\s*)*\Z")
+# Longueur de la fin d'en-tête examinée par les motifs ancrés en fin d'en-tête
+_TAIL_LENGTH = 512
+
+
+def _matchingOpen(header, close):
+    # Indice de la parenthèse ouvrante qui correspond à header[close] == ")", ou -1
+    depth = 0
+    for index in range(close, -1, -1):
+        char = header[index]
+        if char == ")":
+            depth += 1
+        elif char == "(":
+            depth -= 1
+            if depth == 0:
+                return index
+    return -1
+
+
+def _classifyC(header, nested):
+    """
+    Reconnaît un en-tête C, C++, Java ou C#.
+
+    Parameters
+    ----------
+    header : str
+        Le texte qui précède l'accolade ouvrante.
+    nested : bool
+        True si l'accolade est dans des parenthèses (lambda passée en argument).
+
+    Returns
+    -------
+    tuple of (str, str, int, int) or None
+        Le type, le nom, l'indice du début de la déclaration et celui du nom
+        dans l'en-tête, ou None si l'accolade n'ouvre pas de portée nommée.
+    """
+    if nested:
+        return None
+    labels = _C_LABELS.match(header)
+    start = labels.end() if labels is not None else 0
+    declaration = None
+    for declaration in _C_CLASS.finditer(header, start):
+        pass
+    if declaration is not None:
+        remainder = _C_NEW.sub("", header[declaration.end():])
+        if "=" not in remainder and ("(" not in remainder or header.startswith("record", declaration.start())):
+            return KIND_CLASS, declaration.group("name"), start, declaration.start("name")
+    for number, call in enumerate(_C_CALL.finditer(header, start)):
+        if number == _MAX_CANDIDATES:
+            break
+        name = call.group("name")
+        if name in _KEYWORDS or header[call.start() - 1:call.start()] in ("@", ".", ">"):
+            continue
+        prefix = header[start:call.start()]
+        if prefix.rstrip().endswith("new") or "=" in _GROUPED.sub("", prefix):
+            continue
+        parameters = _C_PARAMETERS.match(header, call.end())
+        if parameters is not None and _C_TRAILER.fullmatch(header, parameters.end()) is not None:
+            return KIND_FUNCTION, re.sub(r"\s+", "", name), start, call.start("name")
+    return None
+
+
+def _classifyJavaScript(header, nested):
+    """
+    Reconnaît un en-tête JavaScript : classe, fonction, méthode, fonction
+    affectée à un nom (function ou flèche).
+
+    Voir _classifyC pour les paramètres et la valeur retournée.
+    """
+    offset = max(0, len(header) - _TAIL_LENGTH)
+    tail = header[offset:].rstrip()
+    if nested:
+        # Seule une fonction nommée passée en argument a un nom
+        declaration = None
+        for declaration in _JS_FUNCTION.finditer(tail):
+            pass
+        if declaration is None:
+            return None
+        return KIND_FUNCTION, declaration.group("name"), offset + declaration.start(), offset + declaration.start("name")
+    for pattern in (_JS_CLASS, _JS_CLASS_EXPRESSION):
+        declaration = pattern.search(tail)
+        if declaration is not None:
+            return KIND_CLASS, declaration.group("name"), offset + declaration.start(), offset + declaration.start("name")
+    if tail.endswith("=>"):
+        # Fonction fléchée : (paramètres) => ou paramètre =>
+        parameters = tail[:-2].rstrip()
+        if parameters.endswith(")"):
+            opening = _matchingOpen(parameters, len(parameters) - 1)
+            if opening == -1:
+                return None
+            before = parameters[:opening]
+        else:
+            parameter = _JS_ARROW_PARAMETER.search(parameters)
+            if parameter is None:
+                return None
+            before = parameters[:parameter.start()]
+        declaration = _JS_ASSIGNED.search(before)
+        if declaration is None:
+            return None
+        return KIND_FUNCTION, declaration.group("name"), offset + declaration.start(), offset + declaration.start("name")
+    if not tail.endswith(")"):
+        return None
+    opening = _matchingOpen(tail, len(tail) - 1)
+    if opening == -1:
+        return None
+    name = _JS_ARROW_PARAMETER.search(tail, 0, opening)
+    if name is None:
+        return None
+    before = tail[:name.start()]
+    if name.group() == "function":
+        # Fonction anonyme affectée à un nom : nom = function (...) {
+        declaration = _JS_ASSIGNED.search(before)
+        if declaration is None:
+            return None
+        return KIND_FUNCTION, declaration.group("name"), offset + declaration.start(), offset + declaration.start("name")
+    function = re.search(r"\bfunction\s*\*?\s*\Z", before)
+    if function is not None:
+        return KIND_FUNCTION, name.group(), offset + function.start(), offset + name.start()
+    if name.group() in _KEYWORDS:
+        return None
+    # Méthode d'une classe ou d'un objet littéral : seulement des modificateurs avant le nom
+    lead = max(before.rfind("\n"), before.rfind(","))
+    if _JS_MODIFIERS.match(before, lead + 1) is None:
+        return None
+    start = len(before) - len(before[lead + 1:].lstrip())
+    return KIND_FUNCTION, name.group(), offset + start, offset + name.start()
+
+
+C_FAMILY = BraceLanguage("c", _C_TOKENS, _classifyC, False)
+JAVASCRIPT = BraceLanguage("javascript", _JS_TOKENS, _classifyJavaScript, True)
+
+
+def _opensRegex(text, position):
+    # "/" ouvre une expression régulière s'il suit un opérateur, une ouverture ou certains mots-clés
+    index = position - 1
+    while index >= 0 and text[index] in " \t\r\n":
+        index -= 1
+    if index < 0 or text[index] in _REGEX_PRECEDERS:
+        return True
+    end = index + 1
+    while index >= 0 and (text[index].isalnum() or text[index] in "_$"):
+        index -= 1
+    return text[index + 1:end] in _REGEX_KEYWORDS
+
+
+def buildBraceScopeTree(text, language):
+    """
+    Construit l'arbre des portées d'un document écrit dans un langage à accolades.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+    language : BraceLanguage
+        Les règles du langage (C_FAMILY ou JAVASCRIPT).
+
+    Returns
+    -------
+    ScopeTree
+        L'arbre des portées du document (jamais issu de `ast` : parsed est False).
+    """
+    lines = text.split("\n")
+    countLines(len(lines))
+    lineStarts = computeLineStarts(lines)
+    root = Scope(KIND_MODULE, "", 0, 0, len(lines) - 1, -1)
+    classify = language.classify
+    search = language.tokens.search
+
+    # Numéro de ligne d'un indice, compté depuis le dernier indice demandé (toujours croissant)
+    counted = [0, 0]
+
+    def lineAt(index):
+        counted[1] += text.count("\n", counted[0], index)
+        counted[0] = index
+        return counted[1]
+
+    # Accolades ouvertes : (portée ou None, profondeur de parenthèses à l'ouverture)
+    stack = []
+    parent = root
+    parenDepth = braceParenDepth = 0
+    headerStart = 0
+    # True tant que l'en-tête ne contient que des blancs et des commentaires
+    headerBlank = True
+    position = 0
+    while True:
+        match = search(text, position)
+        if match is None:
+            break
+        token = match.group()
+        tokenStart = match.start()
+        if headerBlank and _NON_SPACE.search(text, position, tokenStart) is not None:
+            headerBlank = False
+        position = match.end()
+        char = token[0]
+        if char == "{":
+            scope = None
+            declaration = classify(text[headerStart:tokenStart], parenDepth > braceParenDepth)
+            if declaration is not None:
+                kind, name, declarationStart, nameStart = declaration
+                firstChar = _NON_SPACE.search(text, headerStart + declarationStart, tokenStart)
+                startLine = lineAt(firstChar.start() if firstChar is not None else headerStart + declarationStart)
+                line = lineAt(headerStart + nameStart)
+                column = _INDENT.match(text, lineStarts[line]).end() - lineStarts[line]
+                scope = Scope(kind, name, startLine, line, line, column, (), parent)
+                parent.children.append(scope)
+                parent = scope
+            stack.append((scope, braceParenDepth))
+            braceParenDepth = parenDepth
+            headerStart, headerBlank = position, True
+        elif char == "}":
+            if stack:
+                # Les parenthèses restées ouvertes dans le bloc sont oubliées
+                parenDepth = braceParenDepth
+                scope, braceParenDepth = stack.pop()
+                if scope is not None:
+                    scope.endLine = lineAt(tokenStart)
+                    parent = scope.parent
+            headerStart, headerBlank = position, True
+        elif char == "(":
+            parenDepth += 1
+            headerBlank = False
+        elif char == ")":
+            parenDepth = max(braceParenDepth, parenDepth - 1)
+        elif char == ";":
+            if parenDepth <= braceParenDepth:
+                headerStart, headerBlank = position, True
+        elif char == "/" and len(token) == 1:
+            # Expression régulière littérale (JavaScript) : son contenu est sauté
+            if language.regexLiterals and _opensRegex(text, tokenStart):
+                regex = _JS_REGEX.match(text, tokenStart)
+                if regex is not None:
+                    position = regex.end()
+            headerBlank = False
+        elif token.startswith(("//", "/*", "#")):
+            # Commentaire (ou ligne du préprocesseur) avant la déclaration : hors de l'en-tête
+            if headerBlank:
+                headerStart = position
+        else:
+            headerBlank = False
+    lastLine = len(lines) - 1
+    while stack:
+        scope = stack.pop()[0]
+        if scope is not None:
+            scope.endLine = lastLine
+    return ScopeTree(text, root, lineStarts, False)
@@ -0,0 +1,68 @@
+# Fil d'Ariane de la portée du curseur : "classe Parser > méthode parse_line"
+
+"""
+Décrit le chemin des portées (classes, fonctions, bloc __main__) qui
+contiennent une ligne, de la plus externe à la plus interne.
+
+La portée la plus interne est trouvée dans l'index des portées du snapshot
+(ScopeTree.scopeAt, voir nppTools.scopeIndex) ; le chemin est ensuite la
+simple remontée de ses parents.
+"""
+
+from .patterns import KIND_CLASS, KIND_FUNCTION, KIND_MAIN
+from .scopeIndex import scopeChain
+
+MODULE_LEVEL = "niveau du module"
+
+
+def scopeLabel(scope):
+    """
+    Retourne le libellé d'une portée, par exemple "méthode parse_line".
+    """
+    if scope.kind == KIND_CLASS:
+        return f"classe {scope.name}"
+    if scope.kind == KIND_FUNCTION:
+        parent = scope.parent
+        return f"{'méthode' if parent is not None and parent.kind == KIND_CLASS else 'fonction'} {scope.name}"
+    if scope.kind == KIND_MAIN:
+        return "bloc principal"
+    return scope.name
+
+
+def scopeBreadcrumb(scope):
+    """
+    Retourne le fil d'Ariane d'une portée.
+
+    Parameters
+    ----------
+    scope : Scope or None
+        La portée la plus interne, ou None au niveau du module.
+
+    Returns
+    -------
+    str
+        Les libellés des portées englobantes séparés par " > ", par exemple
+        "classe Parser > méthode parse_line", ou "niveau du module".
+    """
+    return " > ".join(scopeLabel(ancestor) for ancestor in scopeChain(scope)) or MODULE_LEVEL
+
+
+def whereAmI(scope, line, lineCount):
+    """
+    Retourne l'annonce complète de la position du curseur.
+
+    Parameters
+    ----------
+    scope : Scope or None
+        La portée la plus interne contenant le curseur.
+    line : int
+        La ligne du curseur (à partir de 0).
+    lineCount : int
+        Le nombre de lignes du document.
+
+    Returns
+    -------
+    str
+        Par exemple "classe Parser > méthode parse_line, ligne 412 sur 9000".
+    """
+    return f"{scopeBreadcrumb(scope)}, ligne {line + 1} sur {lineCount}"
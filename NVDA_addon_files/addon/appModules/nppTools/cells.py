@@ -0,0 +1,84 @@
+# Cellules "# %%" d'un script : découpage et détection des cellules modifiées
+
+"""
+Un script découpé en cellules par des lignes de repère ("# %%") est
+exécuté comme un notebook : chaque cellule dépend de celles qui la
+précèdent. Après une modification, il suffit donc de ré-exécuter, dans la
+même session, la première cellule modifiée et toutes les suivantes.
+
+Chaque cellule est identifiée par l'empreinte de son texte, sans les blancs
+de fin de ligne ni les lignes vides qui l'entourent : ajouter une ligne vide
+ou passer de CRLF à LF ne force pas sa ré-exécution.
+"""
+
+import hashlib
+from collections import namedtuple
+
+Cell = namedtuple("Cell", ("line", "startIndex", "endIndex", "digest"))
+Cell.__doc__ = """
+Une cellule du script.
+
+line : numéro (à partir de 0) de sa première ligne
+startIndex, endIndex : indices de début et de fin de la cellule dans le texte
+digest : empreinte de son texte
+"""
+
+
+def _digest(source):
+    normalized = "\n".join(lineText.rstrip() for lineText in source.splitlines()).strip("\n")
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def splitCells(text, lineStarts, markerLines):
+    """
+    Découpe un texte en cellules, avant chaque ligne de repère.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+    lineStarts : sequence of int
+        L'indice de début de chaque ligne.
+    markerLines : iterable of int
+        Les numéros des lignes de repère, triés.
+
+    Returns
+    -------
+    list of Cell
+        Les cellules dans l'ordre du texte. Le texte placé avant le premier
+        repère forme une première cellule, sauf s'il est vide.
+    """
+    starts = [0] + [line for line in markerLines if line > 0]
+    cells = []
+    for number, line in enumerate(starts):
+        startIndex = lineStarts[line]
+        endIndex = lineStarts[starts[number + 1]] if number + 1 < len(starts) else len(text)
+        source = text[startIndex:endIndex]
+        if number == 0 and not source.strip():
+            continue
+        cells.append(Cell(line, startIndex, endIndex, _digest(source)))
+    return cells
+
+
+def firstChangedCell(cells, executedDigests):
+    """
+    Retourne le numéro de la première cellule à ré-exécuter.
+
+    Parameters
+    ----------
+    cells : list of Cell
+        Les cellules actuelles du script.
+    executedDigests : list of str
+        Les empreintes des cellules déjà exécutées dans la session, dans
+        l'ordre.
+
+    Returns
+    -------
+    int
+        Le numéro de la première cellule modifiée ou pas encore exécutée,
+        ou len(cells) si toutes sont à jour.
+    """
+    for number, cell in enumerate(cells):
+        if number >= len(executedDigests) or executedDigests[number] != cell.digest:
+            return number
+    return len(cells)
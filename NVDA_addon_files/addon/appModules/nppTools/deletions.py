@@ -0,0 +1,109 @@
+# Pile des blocs supprimés de chaque document, pour les restaurer sans ré-analyse
+
+"""
+Une suppression de classe ou de fonction retient le texte exact retiré
+(dans l'encodage du document), sa position, la longueur du document juste
+après la suppression et l'empreinte du texte qui entoure cette position.
+Tant que la longueur et cette empreinte n'ont pas changé, le bloc peut être
+remis en place d'un seul coup, à la même position, sans relire ni
+ré-analyser le document.
+"""
+
+import hashlib
+from collections import OrderedDict, namedtuple
+
+# Blocs conservés par document
+MAX_BLOCKS = 20
+
+# Documents dont les blocs sont conservés
+MAX_DOCUMENTS = 32
+
+# Offsets de contexte retenus de part et d'autre de la position d'un bloc supprimé
+CONTEXT_LENGTH = 2048
+
+DeletedBlock = namedtuple("DeletedBlock", ("kind", "offset", "data", "lineCount", "lengthAfter", "context"))
+DeletedBlock.__doc__ = """
+Un bloc supprimé.
+
+kind : type de la portée supprimée (KIND_CLASS ou KIND_FUNCTION)
+offset : offset du début du bloc dans le document
+data : texte du bloc, encodé comme le document (sa longueur est celle de la zone supprimée)
+lineCount : nombre de lignes du bloc
+lengthAfter : longueur du document juste après la suppression
+context : empreinte du texte autour de offset juste après la suppression (voir contextRange)
+"""
+
+
+def contextRange(offset, length):
+    """
+    Retourne la zone du document, entre deux offsets, dont l'empreinte
+    garantit qu'un bloc peut être remis à `offset`.
+
+    Parameters
+    ----------
+    offset : int
+        La position du bloc supprimé.
+    length : int
+        La longueur du document sans le bloc.
+
+    Returns
+    -------
+    tuple of (int, int)
+        Le début et la fin de la zone.
+    """
+    return max(0, offset - CONTEXT_LENGTH), min(length, offset + CONTEXT_LENGTH)
+
+
+def contextDigest(text):
+    """
+    Retourne l'empreinte du texte d'une zone de contexte.
+    """
+    return hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class DeletionStacks:
+    """
+    Les piles de blocs supprimés, une par document, de taille bornée.
+    """
+
+    def __init__(self, maxBlocks=MAX_BLOCKS, maxDocuments=MAX_DOCUMENTS):
+        self.maxBlocks = maxBlocks
+        self.maxDocuments = maxDocuments
+        self._stacks = OrderedDict()
+
+    def push(self, document, block):
+        """
+        Empile un bloc supprimé ; les plus anciens sont oubliés au-delà de la limite.
+
+        Parameters
+        ----------
+        document : str
+            Le document (son chemin ou son nom).
+        block : DeletedBlock
+            Le bloc supprimé.
+        """
+        stack = self._stacks.pop(document, [])
+        stack.append(block)
+        del stack[:-self.maxBlocks]
+        self._stacks[document] = stack
+        while len(self._stacks) > self.maxDocuments:
+            self._stacks.popitem(last=False)
+
+    def peek(self, document):
+        """
+        Retourne le dernier bloc supprimé d'un document, ou None.
+        """
+        stack = self._stacks.get(document)
+        return stack[-1] if stack else None
+
+    def pop(self, document):
+        """
+        Retire et retourne le dernier bloc supprimé d'un document, ou None.
+        """
+        stack = self._stacks.get(document)
+        if not stack:
+            return None
+        block = stack.pop()
+        if not stack:
+            del self._stacks[document]
+        return block
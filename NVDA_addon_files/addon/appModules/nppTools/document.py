@@ -0,0 +1,31 @@
+# Table des débuts de ligne d'un document
+
+"""
+Les structures du document (snapshot, profil d'indentation, arbre des
+portées) repèrent chaque ligne par l'indice de son début dans le texte.
+Appliquée aux lignes encodées en UTF-8, la même table donne l'offset en
+octets (position Scintilla) du début de chaque ligne.
+"""
+
+from array import array
+from itertools import accumulate
+
+
+def computeLineStarts(lines):
+    """
+    Calcule l'indice du début de chaque ligne.
+
+    Parameters
+    ----------
+    lines : list of str
+        Les lignes du document, découpées sur "\\n" et sans le saut de ligne.
+
+    Returns
+    -------
+    array of int
+        Tableau compact (array('I')) des indices de début de ligne.
+    """
+    # Sommes cumulées des longueurs de ligne (+1 pour le saut de ligne), calculées en C
+    starts = array("I", accumulate(map((1).__add__, map(len, lines)), initial=0))
+    starts.pop()
+    return starts
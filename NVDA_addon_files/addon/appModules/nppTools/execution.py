@@ -0,0 +1,679 @@
+# Exécution du code python dans un sous-processus, sortie capturée
+
+"""
+Le code est écrit dans un fichier temporaire puis exécuté par un
+interpréteur python lancé sans fenêtre, sorties standard et d'erreur
+redirigées vers des tubes.
+
+Deux threads lisent les tubes au fil de l'eau et ajoutent chaque ligne au
+tampon circulaire de sortie (OutputBuffer), que l'utilisateur parcourt ligne
+par ligne sans quitter Notepad++ ; chaque ligne est aussi transmise à
+`onOutput` (lecture vocale au fil de l'eau). Lignes et tampon sont de
+taille bornée. Un troisième thread surveille le processus : il
+l'arrête lorsque le délai maximal est dépassé, supprime le fichier
+temporaire et transmet le résultat (ExecutionResult) au module.
+
+Sur option, des interpréteurs sont lancés à l'avance avec les modules
+demandés déjà importés (InterpreterPool) : le code leur est transmis par
+leur entrée standard et ne paie plus le démarrage de python ni ces imports.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+
+from .tracebacks import parseTraceback
+
+log = logging.getLogger(__name__)
+
+STREAM_STDOUT = "stdout"
+STREAM_STDERR = "stderr"
+
+# Aucune console ne s'ouvre pour l'interpréteur (Windows uniquement)
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# Script des interpréteurs préchargés
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+
+# Marqueurs de fin d'exécution et de valeur d'une expression (voir nppTools.worker)
+END_MARKER = "\x00nppEnd"
+VALUE_MARKER = "\x00nppValue"
+
+# Clé de l'heure de la première ligne de sortie dans les marqueurs d'une exécution
+_FIRST_OUTPUT = "firstOutput"
+
+ExecutionResult = namedtuple(
+    "ExecutionResult", ("returnCode", "timedOut", "seconds", "lineCount", "errorLine", "value", "path", "frames"),
+)
+ExecutionResult.__doc__ = """
+Résultat d'une exécution.
+
+returnCode : code de sortie du processus
+timedOut : True si le processus a été arrêté faute d'avoir terminé à temps
+seconds : durée de l'exécution
+lineCount : nombre de lignes de sortie (standard et erreur, y compris celles que le tampon a oubliées)
+errorLine : ligne décrivant l'exception (voir firstErrorLine), ou chaîne vide
+value : première ligne de la valeur de l'expression finale (session), ou chaîne vide
+path : chemin du fichier temporaire du code exécuté (supprimé à la fin de l'exécution)
+frames : appels de la dernière trace d'appels de la sortie d'erreur (voir nppTools.tracebacks)
+"""
+
+OutputLine = namedtuple("OutputLine", ("stream", "text"))
+
+# Nombre de lignes de sortie conservées par défaut
+OUTPUT_LINES = 10000
+
+# Longueur maximale d'une ligne de sortie : la suite d'une ligne plus longue est ignorée
+MAX_LINE_LENGTH = 4096
+
+
+def defaultInterpreter():
+    """
+    Retourne l'interpréteur python à utiliser : "python" sous Windows,
+    "python3" ailleurs (chemin complet s'il est trouvé dans le PATH).
+    """
+    name = "python" if os.name == "nt" else "python3"
+    return shutil.which(name) or name
+
+
+def _environment():
+    # Sortie non tamponnée et en UTF-8 : les lignes arrivent au fil de l'eau
+    return dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+
+
+def firstErrorLine(lines):
+    """
+    Retourne la ligne qui décrit l'exception de la première trace d'appels.
+
+    Parameters
+    ----------
+    lines : list of str
+        Les lignes de la sortie d'erreur.
+
+    Returns
+    -------
+    str
+        La première ligne non indentée qui suit "Traceback (most recent call
+        last):", par exemple "ZeroDivisionError: division by zero" ; à défaut
+        (erreur de syntaxe, message écrit directement) la dernière ligne non
+        indentée, la première ligne non vide, ou une chaîne vide.
+    """
+    inTraceback = False
+    for text in lines:
+        if text.startswith("Traceback "):
+            inTraceback = True
+        elif inTraceback and text and not text[0].isspace():
+            return text.strip()
+    # Erreur de syntaxe (sans trace d'appels) ou message écrit directement sur la sortie d'erreur
+    unindented = [text for text in lines if text.strip() and not text[0].isspace()]
+    if unindented:
+        return unindented[-1].strip()
+    return next((text.strip() for text in lines if text.strip()), "")
+
+
+class OutputBuffer:
+    """
+    Sortie de la dernière exécution, parcourue ligne par ligne.
+
+    Tampon circulaire : seules les `size` dernières lignes sont conservées,
+    la mémoire reste bornée quelle que soit la quantité de sortie. Les
+    lignes sont numérotées depuis le début de l'exécution (lignes oubliées
+    comprises) ; elles sont ajoutées par les threads de lecture pendant que
+    l'utilisateur les parcourt depuis le thread principal.
+
+    Parameters
+    ----------
+    size : int
+        Le nombre de lignes conservées.
+    """
+
+    def __init__(self, size=OUTPUT_LINES):
+        self._lock = threading.Lock()
+        self.size = size
+        self._lines = deque(maxlen=size)
+        self.total = 0
+        self.position = -1
+
+    def __len__(self):
+        return len(self._lines)
+
+    def clear(self):
+        """
+        Vide le tampon (à la taille `size` actuelle) et revient avant la première ligne.
+        """
+        with self._lock:
+            self._lines = deque(maxlen=self.size)
+            self.total = 0
+            self.position = -1
+
+    def append(self, stream, text):
+        """
+        Ajoute une ligne de sortie, en oubliant la plus ancienne si le tampon est plein.
+
+        Parameters
+        ----------
+        stream : str
+            STREAM_STDOUT ou STREAM_STDERR.
+        text : str
+            Le texte de la ligne, sans le saut de ligne final.
+
+        Returns
+        -------
+        OutputLine
+            La ligne ajoutée.
+        """
+        line = OutputLine(stream, text)
+        with self._lock:
+            self._lines.append(line)
+            self.total += 1
+        return line
+
+    def lines(self, stream=None):
+        """
+        Retourne une copie des lignes conservées, éventuellement d'un seul flux.
+        """
+        with self._lock:
+            return [line.text for line in self._lines if stream is None or line.stream == stream]
+
+    def move(self, direction):
+        """
+        Avance ou recule d'une ligne.
+
+        Parameters
+        ----------
+        direction : int
+            1 pour la ligne suivante, -1 pour la ligne précédente.
+
+        Returns
+        -------
+        OutputLine or None
+            La nouvelle ligne courante, ou None au-delà de la première ou de
+            la dernière ligne conservée (la position ne change pas).
+        """
+        with self._lock:
+            first = self.total - len(self._lines)
+            position = max(self.position, first - 1) + direction
+            if not first <= position < self.total:
+                return None
+            self.position = position
+            return self._lines[position - first]
+
+    def moveToLast(self, stream):
+        """
+        Va à la dernière ligne conservée d'un flux.
+
+        Returns
+        -------
+        OutputLine or None
+            La ligne atteinte, ou None si le flux n'a aucune ligne conservée.
+        """
+        with self._lock:
+            for index in range(len(self._lines) - 1, -1, -1):
+                if self._lines[index].stream == stream:
+                    self.position = self.total - len(self._lines) + index
+                    return self._lines[index]
+        return None
+
+
+class _Worker:
+    """
+    Un interpréteur préchargé (voir nppTools.worker), en attente de code.
+    """
+
+    def __init__(self, interpreter, preload, maxRuns):
+        self.runs = 0
+        self.maxRuns = maxRuns
+        self.process = self._start(interpreter, [str(maxRuns)] + list(preload))
+
+    @staticmethod
+    def _start(interpreter, arguments, cwd=None):
+        return subprocess.Popen(
+            [interpreter, _WORKER_SCRIPT] + arguments,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            cwd=cwd, env=_environment(), creationflags=_CREATION_FLAGS,
+            encoding="utf-8", errors="replace",
+        )
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def submit(self, path):
+        """
+        Demande l'exécution d'un fichier.
+        """
+        self.runs += 1
+        self.process.stdin.write(path + "\n")
+        self.process.stdin.flush()
+
+
+class _Session(_Worker):
+    """
+    L'interpréteur d'une session : un seul espace de noms pour toutes les
+    exécutions d'un document (voir nppTools.worker).
+    """
+
+    def __init__(self, interpreter, cwd=None):
+        self.runs = 0
+        self.maxRuns = None
+        self.state = {}
+        self.process = self._start(interpreter, ["--session"], cwd)
+
+    def submit(self, path):
+        self.runs += 1
+        self._send("run " + path)
+
+    def interrupt(self):
+        """
+        Interrompt le code en cours (KeyboardInterrupt), sans perdre l'espace de noms.
+        """
+        self._send("interrupt")
+
+    def _send(self, command):
+        self.process.stdin.write(command + "\n")
+        self.process.stdin.flush()
+
+
+class InterpreterPool:
+    """
+    Interpréteurs lancés à l'avance, modules déjà importés.
+
+    Chaque interpréteur est remplacé après `maxRuns` exécutions ; un
+    remplaçant est lancé dès qu'un interpréteur sort du pool, depuis le
+    thread qui a terminé l'exécution. Les premiers interpréteurs sont lancés
+    par un thread dédié : la création du pool rend la main immédiatement.
+
+    Parameters
+    ----------
+    interpreter : str
+        L'interpréteur à lancer.
+    size : int
+        Le nombre d'interpréteurs en attente.
+    preload : iterable of str
+        Les modules importés au lancement de chaque interpréteur.
+    maxRuns : int
+        Le nombre d'exécutions avant le remplacement d'un interpréteur.
+    """
+
+    def __init__(self, interpreter, size, preload=(), maxRuns=1):
+        self.interpreter = interpreter
+        self.size = size
+        self.preload = tuple(preload)
+        self.maxRuns = maxRuns
+        self._lock = threading.Lock()
+        self._idle = deque()
+        self._stopped = False
+        threading.Thread(target=self.refill, name="nppInterpreterPool", daemon=True).start()
+
+    def settings(self):
+        """
+        Les paramètres du pool, pour savoir s'il doit être recréé.
+        """
+        return self.interpreter, self.size, self.preload, self.maxRuns
+
+    def refill(self):
+        """
+        Lance des interpréteurs jusqu'à en avoir `size` en attente.
+        """
+        with self._lock:
+            # Les interpréteurs morts entre-temps (erreur au lancement) sont oubliés
+            self._idle = deque(worker for worker in self._idle if worker.alive)
+            missing = 0 if self._stopped else self.size - len(self._idle)
+        for _ in range(missing):
+            worker = _Worker(self.interpreter, self.preload, self.maxRuns)
+            with self._lock:
+                if self._stopped:
+                    worker.process.kill()
+                    return
+                self._idle.append(worker)
+
+    def acquire(self):
+        """
+        Retire un interpréteur en attente du pool.
+
+        Returns
+        -------
+        _Worker or None
+            L'interpréteur, ou None si aucun n'est prêt.
+        """
+        with self._lock:
+            while self._idle:
+                worker = self._idle.popleft()
+                if worker.alive:
+                    return worker
+        return None
+
+    def release(self, worker):
+        """
+        Rend un interpréteur au pool après une exécution, ou l'oublie s'il
+        a atteint son nombre d'exécutions (il se termine alors de lui-même),
+        puis complète le pool.
+        """
+        reusable = worker.runs < worker.maxRuns and worker.alive
+        with self._lock:
+            kept = reusable and not self._stopped
+            if kept:
+                self._idle.appendleft(worker)
+        if reusable and not kept:
+            worker.process.kill()
+        self.refill()
+
+    def stop(self):
+        """
+        Arrête tous les interpréteurs en attente ; un interpréteur en cours
+        d'exécution est arrêté à son retour dans le pool.
+        """
+        with self._lock:
+            self._stopped = True
+            idle, self._idle = self._idle, deque()
+        for worker in idle:
+            worker.process.kill()
+
+
+class ExecutionEngine:
+    """
+    Lance le code python dans un sous-processus et capture sa sortie.
+
+    Une seule exécution à la fois ; sa sortie remplace celle de la
+    précédente dans `output`. Si un pool d'interpréteurs est configuré
+    (configurePool), le code est confié à un interpréteur préchargé ; s'il
+    est exécuté dans une session, à l'interpréteur de cette session.
+
+    Parameters
+    ----------
+    interpreter : str, optional
+        L'interpréteur à lancer (voir defaultInterpreter).
+    """
+
+    def __init__(self, interpreter=None):
+        self.interpreter = interpreter or defaultInterpreter()
+        self.output = OutputBuffer()
+        self._lock = threading.Lock()
+        self._process = None
+        self._worker = None
+        self._pool = None
+        self._sessions = {}
+        # Appelée avec chaque OutputLine, depuis les threads de lecture
+        self.onOutput = None
+
+    @property
+    def running(self):
+        """
+        Indique si une exécution est en cours.
+        """
+        with self._lock:
+            return self._process is not None
+
+    def configurePool(self, size, preload=(), maxRuns=1):
+        """
+        Active, modifie ou désactive le pool d'interpréteurs préchargés.
+
+        Le pool n'est recréé que si ses paramètres changent.
+
+        Parameters
+        ----------
+        size : int
+            Le nombre d'interpréteurs en attente (0 : pas de pool).
+        preload : iterable of str
+            Les modules importés à l'avance.
+        maxRuns : int
+            Le nombre d'exécutions avant le remplacement d'un interpréteur.
+        """
+        settings = (self.interpreter, size, tuple(preload), maxRuns)
+        with self._lock:
+            pool = self._pool
+            if pool is not None and pool.settings() == settings:
+                return
+            self._pool = None
+        if pool is not None:
+            pool.stop()
+        if size > 0:
+            pool = InterpreterPool(self.interpreter, size, preload, maxRuns)
+            with self._lock:
+                self._pool = pool
+
+    def run(self, code, onFinished, timeout=0, session=None, cwd=None):
+        """
+        Lance l'exécution d'un code python et rend la main immédiatement.
+
+        Dans une session, le code s'exécute dans l'espace de noms laissé par
+        les exécutions précédentes de la même session ; la session est créée
+        à sa première exécution.
+
+        Parameters
+        ----------
+        code : str
+            Le code à exécuter.
+        onFinished : callable
+            Appelée avec l'ExecutionResult, depuis le thread de surveillance,
+            à la fin de l'exécution.
+        timeout : float
+            Le délai maximal en secondes (0 : aucun). Une session qui le
+            dépasse est arrêtée, son espace de noms est perdu.
+        session : hashable, optional
+            La session (par exemple le document) dans laquelle exécuter le
+            code, ou None pour un nouvel interpréteur.
+        cwd : str, optional
+            Le répertoire de travail d'une nouvelle session.
+
+        Returns
+        -------
+        str
+            Le chemin du fichier temporaire qui contient le code, tel qu'il
+            apparaîtra dans les traces d'appels.
+
+        Raises
+        ------
+        RuntimeError
+            Si une exécution est déjà en cours.
+        """
+        # Écrit hors du verrou : running et les threads de surveillance n'attendent pas le disque
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False, encoding="utf-8", newline="") as tempFile:
+            tempFile.write(code)
+            path = tempFile.name
+        with self._lock:
+            if self._process is not None:
+                os.remove(path)
+                raise RuntimeError("une exécution est déjà en cours")
+            started = time.perf_counter()
+            pool = self._pool if session is None else None
+            worker = pool.acquire() if pool is not None else None
+            try:
+                if session is not None:
+                    worker = self._sessions.get(session)
+                    if worker is None or not worker.alive:
+                        worker = self._sessions[session] = _Session(self.interpreter, cwd)
+                        log.debug(f"Nouvelle session pour {session}.")
+                if worker is not None:
+                    process = worker.process
+                    worker.submit(path)
+                else:
+                    process = subprocess.Popen(
+                        [self.interpreter, path],
+                        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                        env=_environment(), creationflags=_CREATION_FLAGS,
+                        encoding="utf-8", errors="replace",
+                    )
+            except Exception:
+                os.remove(path)
+                raise
+            self._process = process
+            self._worker = worker
+            if pool is not None and worker is None:
+                log.debug("Aucun interpréteur préchargé prêt.")
+            self.output.clear()
+        log.debug(f"Exécution de {path} par {self.interpreter} (processus {process.pid}).")
+        threading.Thread(
+            target=self._watch, args=(process, pool, worker, path, onFinished, timeout, started),
+            name="nppExecution", daemon=True,
+        ).start()
+        return path
+
+    def stop(self):
+        """
+        Arrête l'exécution en cours, s'il y en a une.
+
+        Returns
+        -------
+        bool
+            True si un processus a été arrêté.
+        """
+        with self._lock:
+            process = self._process
+        if process is None:
+            return False
+        process.kill()
+        return True
+
+    def interrupt(self):
+        """
+        Interrompt le code en cours dans une session, sans arrêter la session.
+
+        Returns
+        -------
+        bool
+            True si une exécution de session a été interrompue.
+        """
+        with self._lock:
+            worker = self._worker
+        if not isinstance(worker, _Session):
+            return False
+        worker.interrupt()
+        return True
+
+    def sessionState(self, session):
+        """
+        Retourne le dictionnaire libre attaché à l'interpréteur d'une session,
+        pour y noter ce qui a été exécuté dans son espace de noms.
+
+        Returns
+        -------
+        dict or None
+            Le dictionnaire, vide pour une session neuve, ou None si la
+            session n'existe pas ou si son interpréteur s'est arrêté.
+        """
+        with self._lock:
+            worker = self._sessions.get(session)
+        if worker is None or not worker.alive:
+            return None
+        return worker.state
+
+    def restartSession(self, session):
+        """
+        Arrête l'interpréteur d'une session ; la prochaine exécution de la
+        session repartira d'un espace de noms vide.
+
+        Returns
+        -------
+        bool
+            True si la session existait.
+        """
+        with self._lock:
+            worker = self._sessions.pop(session, None)
+        if worker is None:
+            return False
+        worker.process.kill()
+        return True
+
+    def terminate(self):
+        """
+        Arrête l'exécution en cours, les interpréteurs préchargés et les sessions.
+        """
+        self.stop()
+        self.configurePool(0)
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            self.restartSession(session)
+
+    def _read(self, pipe, stream, markers):
+        # Recopie un tube dans le tampon de sortie, ligne par ligne, jusqu'à
+        # la fin du fichier ou jusqu'au marqueur de fin d'un interpréteur
+        # préchargé. Les lignes sont lues par morceaux de taille bornée.
+        truncated = False
+        for text in iter(lambda: pipe.readline(MAX_LINE_LENGTH), ""):
+            if text.startswith(VALUE_MARKER):
+                markers[VALUE_MARKER] = text[len(VALUE_MARKER):].strip()
+                continue
+            index = text.find(END_MARKER)
+            if index != -1:
+                if index:
+                    self._append(stream, text[:index], markers)
+                markers[stream] = int(text[index + len(END_MARKER):])
+                return
+            complete = text.endswith("\n")
+            if truncated:
+                # Suite d'une ligne trop longue
+                truncated = not complete
+                continue
+            if not complete and len(text) >= MAX_LINE_LENGTH:
+                truncated = True
+                text += "…"
+            self._append(stream, text.rstrip("\r\n"), markers)
+
+    def _append(self, stream, text, markers):
+        # L'heure de la première sortie est notée dans les marqueurs de l'exécution
+        if _FIRST_OUTPUT not in markers:
+            markers.setdefault(_FIRST_OUTPUT, time.perf_counter())
+        line = self.output.append(stream, text)
+        if self.onOutput is not None:
+            self.onOutput(line)
+
+    def _watch(self, process, pool, worker, path, onFinished, timeout, started):
+        markers = {}
+        readers = [
+            threading.Thread(target=self._read, args=(pipe, stream, markers), daemon=True)
+            for pipe, stream in ((process.stdout, STREAM_STDOUT), (process.stderr, STREAM_STDERR))
+        ]
+        for reader in readers:
+            reader.start()
+        timedOut = False
+        for reader in readers:
+            reader.join(max(0, started + timeout - time.perf_counter()) if timeout else None)
+            if reader.is_alive():
+                timedOut = True
+                process.kill()
+        for reader in readers:
+            reader.join()
+        if STREAM_STDOUT in markers:
+            returnCode = markers[STREAM_STDOUT]
+        else:
+            # Fin des tubes : le processus se termine (ou a été arrêté)
+            try:
+                returnCode = process.wait(max(0, started + timeout - time.perf_counter()) if timeout else None)
+            except subprocess.TimeoutExpired:
+                timedOut = True
+                process.kill()
+                returnCode = process.wait()
+        seconds = time.perf_counter() - started
+        try:
+            os.remove(path)
+        except OSError as e:
+            log.error(f"Impossible de supprimer le fichier temporaire {path} : {e}")
+        if _FIRST_OUTPUT in markers:
+            if isinstance(worker, _Session):
+                origin = "session"
+            else:
+                origin = "interpréteur préchargé" if worker is not None else "nouvel interpréteur"
+            log.debug(f"Première sortie après {(markers[_FIRST_OUTPUT] - started) * 1000:.0f} ms ({origin}).")
+        with self._lock:
+            self._process = None
+            self._worker = None
+        if pool is not None and worker is not None:
+            # Rendu au pool d'où il vient : arrêté si ce pool a été remplacé entre-temps
+            pool.release(worker)
+        errorLines = self.output.lines(STREAM_STDERR)
+        result = ExecutionResult(
+            returnCode, timedOut, seconds, self.output.total, firstErrorLine(errorLines),
+            markers.get(VALUE_MARKER, ""), path, parseTraceback(errorLines),
+        )
+        log.debug(f"Fin de l'exécution : {result}")
+        try:
+            onFinished(result)
+        except Exception as e:
+            log.error(f"Erreur lors du traitement du résultat de l'exécution : {e}")
@@ -0,0 +1,232 @@
+# Profil d'indentation d'un document : largeurs visuelles et tables de saut
+
+"""
+Calcule en une seule passe la largeur visuelle de l'indentation de chaque
+ligne (tableau compact array('H'), tabulations alignées sur `tabWidth`) et
+un bitmap des lignes vides ou de commentaire, ignorées par les sauts.
+
+Les tables "niveau différent suivant / précédent" et "même niveau suivant /
+précédent" sont précalculées : chaque commande d'indentation devient une
+simple lecture de tableau.
+"""
+
+from array import array
+
+from .document import computeLineStarts
+from .instrumentation import countLines
+
+# Valeur des tables lorsqu'aucune ligne ne convient
+NO_LINE = -1
+
+_MAX_WIDTH = 0xFFFF
+
+
+def _visualWidth(indent, tabWidth):
+    # Largeur d'une indentation mêlant espaces et tabulations
+    width = 0
+    for char in indent:
+        if char == "\t":
+            width = (width // tabWidth + 1) * tabWidth
+        else:
+            width += 1
+    return width
+
+
+class IndentationProfile:
+    """
+    Profil d'indentation d'un document.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+    tabWidth : int
+        La largeur d'une tabulation, en colonnes.
+    """
+
+    def __init__(self, text, tabWidth=4):
+        self.text = text
+        self.tabWidth = tabWidth
+        lines = text.split("\n")
+        lineCount = len(lines)
+        countLines(lineCount)
+        self.lineStarts = computeLineStarts(lines)
+        # Largeur visuelle et nombre de caractères d'indentation de chaque ligne
+        self.widths = array("H", bytes(2 * lineCount))
+        self.indentLengths = array("H", bytes(2 * lineCount))
+        # Bit à 1 pour une ligne vide ou ne contenant qu'un commentaire
+        self.skipped = bytearray((lineCount + 7) // 8)
+
+        widths = self.widths
+        indentLengths = self.indentLengths
+        skipped = self.skipped
+        for number, lineText in enumerate(lines):
+            content = lineText.lstrip(" \t")
+            indentLength = len(lineText) - len(content)
+            if not content.rstrip() or content[0] == "#":
+                skipped[number >> 3] |= 1 << (number & 7)
+            indent = lineText[:indentLength]
+            width = _visualWidth(indent, tabWidth) if "\t" in indent else indentLength
+            widths[number] = min(width, _MAX_WIDTH)
+            indentLengths[number] = min(indentLength, _MAX_WIDTH)
+
+        self._buildTables(lineCount)
+
+    @classmethod
+    def restore(cls, text, tabWidth, lineStarts, widths, indentLengths, skipped, tables):
+        """
+        Recrée un profil à partir de ses tableaux, sans analyser le texte
+        (voir nppTools.outlineCache).
+
+        Parameters
+        ----------
+        text : str
+            Le texte complet du document.
+        tabWidth : int
+            La largeur de tabulation avec laquelle les tableaux ont été calculés.
+        lineStarts : sequence of int
+            L'indice de début de chaque ligne.
+        widths, indentLengths : array
+            Largeur visuelle et nombre de caractères d'indentation de chaque ligne.
+        skipped : bytearray
+            Bitmap des lignes vides ou de commentaire.
+        tables : tuple of array
+            Les tables de saut, dans l'ordre de `tables`.
+
+        Returns
+        -------
+        IndentationProfile
+            Le profil, identique à celui calculé à partir du texte.
+        """
+        profile = cls.__new__(cls)
+        profile.text = text
+        profile.tabWidth = tabWidth
+        profile.lineStarts = lineStarts
+        profile.widths = widths
+        profile.indentLengths = indentLengths
+        profile.skipped = skipped
+        (
+            profile.nextDifferent, profile.nextSame, profile.previousDifferent, profile.previousSame,
+            profile._nextCode, profile._previousCode,
+        ) = tables
+        return profile
+
+    @property
+    def tables(self):
+        """
+        Les tables de saut (suivante et précédente de niveau différent, de
+        même niveau, lignes de code), pour l'enregistrement du profil.
+        """
+        return (
+            self.nextDifferent, self.nextSame, self.previousDifferent, self.previousSame,
+            self._nextCode, self._previousCode,
+        )
+
+    def _buildTables(self, lineCount):
+        # Tables de saut, calculées par deux passes linéaires
+        widths = self.widths
+        isSkipped = self.isSkipped
+        nextDifferent = array("i", [NO_LINE]) * lineCount
+        nextSame = array("i", [NO_LINE]) * lineCount
+        previousDifferent = array("i", [NO_LINE]) * lineCount
+        previousSame = array("i", [NO_LINE]) * lineCount
+        nextCode = array("i", [NO_LINE]) * (lineCount + 1)
+        previousCode = array("i", [NO_LINE]) * lineCount
+
+        # Passe arrière : lignes suivantes
+        following = NO_LINE
+        lastByWidth = {}
+        for number in range(lineCount - 1, -1, -1):
+            width = widths[number]
+            if following != NO_LINE:
+                nextDifferent[number] = following if widths[following] != width else nextDifferent[following]
+            nextSame[number] = lastByWidth.get(width, NO_LINE)
+            if not isSkipped(number):
+                following = number
+                lastByWidth[width] = number
+            nextCode[number] = following
+
+        # Passe avant : lignes précédentes
+        preceding = NO_LINE
+        lastByWidth = {}
+        for number in range(lineCount):
+            width = widths[number]
+            if preceding != NO_LINE:
+                previousDifferent[number] = preceding if widths[preceding] != width else previousDifferent[preceding]
+            previousSame[number] = lastByWidth.get(width, NO_LINE)
+            if not isSkipped(number):
+                preceding = number
+                lastByWidth[width] = number
+            previousCode[number] = preceding
+
+        self.nextDifferent = nextDifferent
+        self.nextSame = nextSame
+        self.previousDifferent = previousDifferent
+        self.previousSame = previousSame
+        self._nextCode = nextCode
+        self._previousCode = previousCode
+
+    @property
+    def lineCount(self):
+        return len(self.widths)
+
+    def isSkipped(self, line):
+        """
+        Indique si une ligne est vide ou ne contient qu'un commentaire.
+        """
+        return bool(self.skipped[line >> 3] & (1 << (line & 7)))
+
+    def lineText(self, line):
+        """
+        Retourne le texte d'une ligne, sans le saut de ligne final.
+        """
+        start = self.lineStarts[line]
+        end = self.text.find("\n", start)
+        return self.text[start:] if end == -1 else self.text[start:end]
+
+    def firstCharIndex(self, line):
+        """
+        Indice, dans le texte, du premier caractère non blanc d'une ligne.
+        """
+        return self.lineStarts[line] + self.indentLengths[line]
+
+    def lineEndIndex(self, line):
+        """
+        Indice de fin d'une ligne, saut de ligne compris.
+        """
+        if line + 1 < len(self.lineStarts):
+            return self.lineStarts[line + 1]
+        return len(self.text)
+
+    def previousCode(self, line):
+        """
+        Dernière ligne ni vide ni de commentaire jusqu'à `line` incluse, ou NO_LINE.
+        """
+        return self._previousCode[line]
+
+    def firstLineOfLevel(self, line):
+        """
+        Première ligne de la suite de lignes de même indentation contenant `line`.
+
+        Returns
+        -------
+        int
+            Le numéro de ligne, ou NO_LINE si le document ne contient que des
+            lignes vides ou de commentaire.
+        """
+        return self._nextCode[self.previousDifferent[line] + 1]
+
+    def lastLineOfLevel(self, line):
+        """
+        Dernière ligne de la suite de lignes de même indentation contenant `line`.
+
+        Returns
+        -------
+        int
+            Le numéro de ligne, ou NO_LINE si le document ne contient que des
+            lignes vides ou de commentaire.
+        """
+        following = self.nextDifferent[line]
+        if following == NO_LINE:
+            return self._previousCode[-1]
+        return self._previousCode[following - 1]
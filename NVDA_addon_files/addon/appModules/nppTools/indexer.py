@@ -0,0 +1,92 @@
+# Indexeur de projet : lit les déclarations des fichiers reçus sur son entrée standard
+
+"""
+Lancé par nppTools.projectIndex avec l'interpréteur python de l'utilisateur
+(et non celui de NVDA) :
+
+    python indexer.py <nombre de processus>
+
+Chaque ligne reçue sur l'entrée standard est le chemin d'un fichier python.
+Pour chaque fichier, une ligne JSON est écrite sur la sortie standard :
+
+    [chemin, mtime, taille, [[nom, type, ligne, colonne, parent], ...]]
+
+type vaut "class", "function" ou "method" ; ligne et colonne commencent à
+0 ; parent est le nom qualifié de la classe ou de la fonction englobante,
+ou une chaîne vide. Un fichier illisible ou dont la syntaxe est invalide
+n'a aucune déclaration.
+
+Les fichiers sont analysés (module ast) par un groupe de processus
+lorsqu'ils sont assez nombreux pour amortir leur démarrage.
+
+Ce fichier ne dépend que de la bibliothèque standard.
+"""
+
+import ast
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# En dessous de ce nombre de fichiers, l'analyse se fait dans ce processus
+PARALLEL_THRESHOLD = 32
+
+# Fichiers confiés à la fois à un processus du groupe
+CHUNK_SIZE = 16
+
+
+def _declarations(tree):
+    declarations = []
+    # (nœud, nom qualifié du parent, le parent est une classe)
+    stack = [(child, "", False) for child in reversed(tree.body)]
+    while stack:
+        node, parent, inClass = stack.pop()
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = "method" if inClass else "function"
+        else:
+            # Déclarations placées dans un if, un try, une boucle...
+            for field in ("body", "orelse", "finalbody", "handlers"):
+                stack.extend((child, parent, inClass) for child in reversed(getattr(node, field, ()) or ()))
+            continue
+        declarations.append([node.name, kind, node.lineno - 1, node.col_offset, parent])
+        qualifiedName = f"{parent}.{node.name}" if parent else node.name
+        stack.extend((child, qualifiedName, kind == "class") for child in reversed(node.body))
+    return declarations
+
+
+def indexFile(path):
+    """
+    Retourne la ligne d'index d'un fichier (voir la documentation du module).
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [path, 0, -1, []]
+    try:
+        with open(path, "rb") as sourceFile:
+            tree = ast.parse(sourceFile.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        # Le fichier n'est analysé de nouveau qu'après une modification
+        return [path, stat.st_mtime, stat.st_size, []]
+    return [path, stat.st_mtime, stat.st_size, _declarations(tree)]
+
+
+def main(arguments):
+    workers = int(arguments[0]) if arguments else 0
+    paths = [line.rstrip("\n") for line in sys.stdin if line.strip()]
+    if len(paths) < PARALLEL_THRESHOLD or workers == 1:
+        for result in map(indexFile, paths):
+            print(json.dumps(result), flush=True)
+        return
+    with ProcessPoolExecutor(workers or None) as executor:
+        for result in executor.map(indexFile, paths, chunksize=CHUNK_SIZE):
+            print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    # Ni le répertoire de ce script (nppTools) ni celui du projet ne doivent masquer
+    # les modules de la bibliothèque standard, ici ni dans les processus du groupe
+    del sys.path[0]
+    main(sys.argv[1:])
@@ -0,0 +1,208 @@
+# Mesures des commandes : temps, allers-retours TextInfo et lignes analysées
+
+"""
+Chaque exécution d'une commande (script_*) est mesurée : temps écoulé,
+nombre d'allers-retours vers Notepad++ (TextInfo du curseur, de la sélection
+ou du document, lecture de `.text`, `move`, `expand`, déplacement du curseur
+ou de la sélection) et nombre de lignes analysées sur le thread qui exécute
+la commande.
+
+Les mesures sont conservées par commande dans un tampon circulaire et
+résumées par médiane (p50), 95e centile (p95) et maximum.
+
+Les modules d'analyse signalent les lignes qu'ils parcourent avec
+countLines ; ce comptage est propre au thread courant, le travail du thread
+de construction des outlines n'est donc pas attribué aux commandes.
+"""
+
+import math
+import threading
+import time
+from collections import deque, namedtuple
+
+# Nombre de mesures conservées par commande
+RING_SIZE = 256
+
+# Attributs d'un TextInfo qui provoquent un échange avec Notepad++
+_ROUND_TRIP_ATTRIBUTES = frozenset(("text", "move", "expand", "updateCaret", "updateSelection"))
+
+_local = threading.local()
+
+Sample = namedtuple("Sample", ("milliseconds", "roundTrips", "lines"))
+
+ScriptSummary = namedtuple("ScriptSummary", ("name", "count", "p50", "p95", "max", "roundTrips", "lines"))
+ScriptSummary.__doc__ = """
+Résumé des mesures d'une commande.
+
+name : nom de la commande (sans le préfixe script_)
+count : nombre de mesures conservées
+p50, p95, max : temps en millisecondes
+roundTrips : nombre médian d'allers-retours vers Notepad++
+lines : nombre médian de lignes analysées
+"""
+
+
+def countLines(count):
+    """
+    Ajoute des lignes analysées à la mesure en cours sur ce thread, s'il y en a une.
+    """
+    probe = getattr(_local, "probe", None)
+    if probe is not None:
+        probe[2] += count
+
+
+def countRoundTrip(count=1):
+    """
+    Ajoute des allers-retours à la mesure en cours sur ce thread, s'il y en a une.
+    """
+    probe = getattr(_local, "probe", None)
+    if probe is not None:
+        probe[1] += count
+
+
+def percentile(values, fraction):
+    """
+    Centile (méthode du rang le plus proche) d'une liste de valeurs triées.
+    """
+    if not values:
+        return 0
+    rank = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[rank]
+
+
+class CountingTextInfo:
+    """
+    Enveloppe d'un TextInfo qui compte les allers-retours vers Notepad++.
+    """
+
+    def __init__(self, info):
+        object.__setattr__(self, "_info", info)
+
+    def __getattr__(self, name):
+        value = getattr(self._info, name)
+        if name in _ROUND_TRIP_ATTRIBUTES:
+            countRoundTrip()
+        elif name == "copy":
+            return lambda: CountingTextInfo(value())
+        return value
+
+    def __setattr__(self, name, value):
+        setattr(self._info, name, value)
+
+
+class CountingEditProxy:
+    """
+    Enveloppe de l'objet d'édition : chaque TextInfo créé est compté et enveloppé.
+    """
+
+    def __init__(self, edit):
+        object.__setattr__(self, "_edit", edit)
+
+    def __getattr__(self, name):
+        return getattr(self._edit, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._edit, name, value)
+
+    def __bool__(self):
+        return bool(self._edit)
+
+    def makeTextInfo(self, position):
+        # Un TextInfo créé sur des offsets connus ne demande rien à Notepad++,
+        # contrairement aux positions (curseur, sélection, tout le document)
+        if not hasattr(position, "startOffset"):
+            countRoundTrip()
+        return CountingTextInfo(self._edit.makeTextInfo(position))
+
+    @property
+    def selection(self):
+        countRoundTrip()
+        return CountingTextInfo(self._edit.selection)
+
+
+class ScriptMetrics:
+    """
+    Registre des mesures de toutes les commandes.
+
+    Parameters
+    ----------
+    size : int
+        Le nombre de mesures conservées par commande.
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self._samples = {}
+
+    def start(self):
+        """
+        Commence une mesure sur le thread courant.
+
+        Returns
+        -------
+        list
+            La mesure en cours (à passer à stop).
+        """
+        probe = [time.perf_counter(), 0, 0, getattr(_local, "probe", None)]
+        _local.probe = probe
+        return probe
+
+    def stop(self, name, probe):
+        """
+        Termine une mesure et l'enregistre pour la commande donnée.
+
+        Returns
+        -------
+        Sample
+            La mesure enregistrée.
+        """
+        started, roundTrips, lines, outer = probe
+        _local.probe = outer
+        sample = Sample((time.perf_counter() - started) * 1000, roundTrips, lines)
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.size)
+        samples.append(sample)
+        return sample
+
+    def summary(self):
+        """
+        Résume les mesures de chaque commande, de la plus lente à la plus rapide (p95).
+
+        Returns
+        -------
+        list of ScriptSummary
+        """
+        summaries = []
+        for name, samples in self._samples.items():
+            times = sorted(sample.milliseconds for sample in samples)
+            roundTrips = sorted(sample.roundTrips for sample in samples)
+            lines = sorted(sample.lines for sample in samples)
+            summaries.append(ScriptSummary(
+                name, len(times), percentile(times, 0.5), percentile(times, 0.95), times[-1],
+                percentile(roundTrips, 0.5), percentile(lines, 0.5),
+            ))
+        summaries.sort(key=lambda summary: summary.p95, reverse=True)
+        return summaries
+
+    def dump(self, path):
+        """
+        Écrit le résumé et toutes les mesures conservées dans un fichier texte
+        (valeurs séparées par des tabulations).
+
+        Parameters
+        ----------
+        path : str
+            Le chemin du fichier à écrire.
+        """
+        with open(path, "w", encoding="utf-8") as dumpFile:
+            dumpFile.write("script\tcount\tp50_ms\tp95_ms\tmax_ms\troundTrips\tlines\n")
+            for summary in self.summary():
+                dumpFile.write(
+                    f"{summary.name}\t{summary.count}\t{summary.p50:.3f}\t{summary.p95:.3f}\t"
+                    f"{summary.max:.3f}\t{summary.roundTrips}\t{summary.lines}\n"
+                )
+            dumpFile.write("\nscript\tms\troundTrips\tlines\n")
+            for name, samples in self._samples.items():
+                for sample in samples:
+                    dumpFile.write(f"{name}\t{sample.milliseconds:.3f}\t{sample.roundTrips}\t{sample.lines}\n")
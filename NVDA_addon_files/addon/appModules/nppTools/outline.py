@@ -0,0 +1,503 @@
+# Index de structure (outline) d'un document python
+
+"""
+Construit en une seule passe sur le texte complet un index trié des
+déclarations (fonctions, fonctions async, classes, bloc __main__) et des
+repères configurés (voir nppTools.patterns), puis répond aux recherches
+"suivant" / "précédent" par recherche dichotomique. Tous les types sont
+reconnus par un seul motif combiné, en une seule passe.
+
+Chaque ligne est lue avec l'analyseur lexical du moteur de structure
+(nppTools.structure) : une déclaration écrite dans une docstring ou une
+chaîne multiligne n'est pas retenue. L'état lexical au début de chaque
+ligne est conservé pour la mise à jour incrémentale : seules les lignes
+modifiées entre deux versions du texte sont ré-analysées (et les suivantes
+tant que leur état lexical change), les déclarations situées après la
+modification sont simplement décalées.
+"""
+
+import bisect
+from collections import namedtuple
+
+from .instrumentation import countLines
+from .patterns import KIND_DECORATOR, PYTHON_PATTERNS
+from .structure import lexLine
+
+# Taille des blocs comparés lors de la recherche de la zone modifiée
+_DIFF_BLOCK_SIZE = 16384
+
+OutlineEntry = namedtuple("OutlineEntry", ("line", "offset", "column", "kind", "text"))
+OutlineEntry.__doc__ = """
+Une déclaration de l'outline.
+
+line : numéro de ligne (à partir de 0)
+offset : indice du premier caractère non blanc de la déclaration dans le texte
+column : largeur de l'indentation (en caractères)
+kind : KIND_FUNCTION, KIND_CLASS, KIND_MAIN ou le nom d'un repère
+text : texte de la ligne sans les blancs de début et de fin
+"""
+
+
+class _KindIndex:
+    """
+    Listes parallèles (triées par ligne) des déclarations d'un même type.
+    """
+
+    __slots__ = ("lines", "offsets", "columns", "texts")
+
+    def __init__(self):
+        self.lines = []
+        self.offsets = []
+        self.columns = []
+        self.texts = []
+
+    def entry(self, kind, index):
+        return OutlineEntry(self.lines[index], self.offsets[index], self.columns[index], kind, self.texts[index])
+
+
+class Outline:
+    """
+    Index des déclarations d'un document, trié par position.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+    patterns : PatternRegistry
+        Les motifs reconnus (déclarations python et repères).
+    """
+
+    def __init__(self, text, patterns=PYTHON_PATTERNS):
+        self.text = text
+        self.patterns = patterns
+        self._kinds = {}
+        # État lexical au début de chaque ligne
+        self._states = []
+        found = []
+        _scanLines(text.split("\n"), 0, 0, None, self._states, found, patterns.match)
+        for line, offset, column, kind, lineText in found:
+            index = self._kinds.get(kind)
+            if index is None:
+                index = self._kinds[kind] = _KindIndex()
+            index.lines.append(line)
+            index.offsets.append(offset)
+            index.columns.append(column)
+            index.texts.append(lineText)
+
+    @classmethod
+    def restore(cls, text, patterns, states, kinds):
+        """
+        Recrée un outline à partir de ses tables, sans analyser le texte
+        (voir nppTools.outlineCache).
+
+        Parameters
+        ----------
+        text : str
+            Le texte complet du document.
+        patterns : PatternRegistry
+            Les motifs avec lesquels les tables ont été construites.
+        states : list
+            L'état lexical au début de chaque ligne (voir lineStates).
+        kinds : dict
+            Pour chaque type de déclaration, le tuple (lignes, offsets,
+            colonnes, textes) de ses déclarations triées par ligne.
+
+        Returns
+        -------
+        Outline
+            L'outline, identique à celui construit à partir du texte.
+        """
+        outline = cls.__new__(cls)
+        outline.text = text
+        outline.patterns = patterns
+        outline._states = states
+        outline._kinds = {}
+        for kind, (lines, offsets, columns, texts) in kinds.items():
+            index = outline._kinds[kind] = _KindIndex()
+            index.lines = list(lines)
+            index.offsets = list(offsets)
+            index.columns = list(columns)
+            index.texts = list(texts)
+        return outline
+
+    def __len__(self):
+        return sum(len(index.lines) for index in self._kinds.values())
+
+    def copy(self):
+        """
+        Retourne une copie indépendante de l'outline.
+
+        La copie peut être mise à jour (voir update) sans modifier l'original,
+        qui reste utilisable tel quel par les autres lecteurs.
+        """
+        outline = Outline.__new__(Outline)
+        outline.text = self.text
+        outline.patterns = self.patterns
+        outline._states = list(self._states)
+        outline._kinds = {}
+        for kind, index in self._kinds.items():
+            copied = outline._kinds[kind] = _KindIndex()
+            copied.lines = list(index.lines)
+            copied.offsets = list(index.offsets)
+            copied.columns = list(index.columns)
+            copied.texts = list(index.texts)
+        return outline
+
+    @property
+    def entries(self):
+        """
+        Toutes les déclarations, triées par numéro de ligne.
+        """
+        entries = [
+            index.entry(kind, i)
+            for kind, index in self._kinds.items()
+            for i in range(len(index.lines))
+        ]
+        entries.sort(key=lambda entry: entry.line)
+        return entries
+
+    def kindLines(self, kind):
+        """
+        Les numéros de ligne, triés, des déclarations d'un type.
+        """
+        index = self._kinds.get(kind)
+        return list(index.lines) if index is not None else []
+
+    @property
+    def kindTables(self):
+        """
+        Pour chaque type de déclaration, le tuple (lignes, offsets, colonnes,
+        textes) de ses déclarations triées par ligne (à ne pas modifier).
+        """
+        return {
+            kind: (index.lines, index.offsets, index.columns, index.texts)
+            for kind, index in self._kinds.items()
+        }
+
+    @property
+    def lineStates(self):
+        """
+        L'état lexical au début de chaque ligne (None en début de ligne logique).
+        """
+        return self._states
+
+    def findNext(self, line, kinds):
+        """
+        Retourne la première déclaration située après la ligne donnée.
+
+        Parameters
+        ----------
+        line : int
+            Le numéro de la ligne courante.
+        kinds : iterable of str
+            Les types de déclaration recherchés.
+
+        Returns
+        -------
+        OutlineEntry or None
+            La déclaration trouvée, ou None s'il n'y en a pas.
+        """
+        best = None
+        for kind in kinds:
+            index = self._kinds.get(kind)
+            if not index:
+                continue
+            position = bisect.bisect_right(index.lines, line)
+            if position < len(index.lines):
+                if best is None or index.lines[position] < best.line:
+                    best = index.entry(kind, position)
+        return best
+
+    def findPrevious(self, line, kinds):
+        """
+        Retourne la dernière déclaration située avant la ligne donnée.
+
+        Parameters
+        ----------
+        line : int
+            Le numéro de la ligne courante.
+        kinds : iterable of str
+            Les types de déclaration recherchés.
+
+        Returns
+        -------
+        OutlineEntry or None
+            La déclaration trouvée, ou None s'il n'y en a pas.
+        """
+        best = None
+        for kind in kinds:
+            index = self._kinds.get(kind)
+            if not index:
+                continue
+            position = bisect.bisect_left(index.lines, line) - 1
+            if position >= 0:
+                if best is None or index.lines[position] > best.line:
+                    best = index.entry(kind, position)
+        return best
+
+    def _lineAt(self, textIndex):
+        """
+        Numéro de la ligne contenant l'indice donné du texte courant.
+
+        Le comptage des sauts de ligne part de la déclaration connue la plus
+        proche plutôt que du début du document.
+        """
+        anchorLine, anchorOffset = 0, 0
+        for kindIndex in self._kinds.values():
+            position = bisect.bisect_right(kindIndex.offsets, textIndex) - 1
+            if position >= 0 and kindIndex.offsets[position] > anchorOffset:
+                anchorLine, anchorOffset = kindIndex.lines[position], kindIndex.offsets[position]
+        return anchorLine + self.text.count("\n", anchorOffset, textIndex)
+
+    def update(self, newText):
+        """
+        Met à jour l'index pour une nouvelle version du texte.
+
+        Seules les lignes touchées par la modification sont ré-analysées ;
+        les déclarations situées après sont décalées.
+
+        Parameters
+        ----------
+        newText : str
+            Le nouveau texte complet du document.
+
+        Returns
+        -------
+        tuple of (int, int, int) or None
+            La première ligne modifiée, le nombre de lignes remplacées dans
+            l'ancien texte et le nombre de lignes qui les remplacent, ou None
+            si le texte n'a pas changé.
+        """
+        oldText = self.text
+        if newText == oldText:
+            return None
+        regionStart, oldRegionEnd, newRegionEnd = findChangedRange(oldText, newText)
+        firstLine = self._lineAt(regionStart)
+        oldLineCount = oldText.count("\n", regionStart, oldRegionEnd) + 1
+        lastOldLine = firstLine + oldLineCount - 1
+
+        # Ré-analyse des lignes modifiées
+        states = []
+        found = []
+        match = self.patterns.match
+        state = _scanLines(newText[regionStart:newRegionEnd].split("\n"), firstLine, regionStart, self._states[firstLine], states, found, match)
+        # Puis des lignes suivantes tant que leur état lexical diffère (chaîne triple ouverte ou fermée)
+        regionEnd = newRegionEnd
+        while lastOldLine + 1 < len(self._states) and state != self._states[lastOldLine + 1]:
+            lineStart = regionEnd + 1
+            regionEnd = newText.find("\n", lineStart)
+            if regionEnd == -1:
+                regionEnd = len(newText)
+            state = _scanLines((newText[lineStart:regionEnd],), firstLine + len(states), lineStart, state, states, found, match)
+            lastOldLine += 1
+        self._states[firstLine:lastOldLine + 1] = states
+
+        oldLineCount = lastOldLine - firstLine + 1
+        newLineCount = len(states)
+        lineDelta = newLineCount - oldLineCount
+        offsetDelta = len(newText) - len(oldText)
+
+        # Nouvelles déclarations dans la zone modifiée, regroupées par type
+        inserted = {}
+        for line, offset, column, kind, lineText in found:
+            inserted.setdefault(kind, []).append((line, offset, column, lineText))
+
+        for kind in set(self._kinds) | set(inserted):
+            index = self._kinds.get(kind)
+            if index is None:
+                index = self._kinds[kind] = _KindIndex()
+            start = bisect.bisect_left(index.lines, firstLine)
+            end = bisect.bisect_right(index.lines, lastOldLine)
+            newEntries = inserted.get(kind, ())
+            # Décalage des déclarations situées après la zone modifiée
+            tailLines = index.lines[end:]
+            tailOffsets = index.offsets[end:]
+            if lineDelta:
+                tailLines = [line + lineDelta for line in tailLines]
+            if offsetDelta:
+                tailOffsets = [offset + offsetDelta for offset in tailOffsets]
+            index.lines[start:] = [entry[0] for entry in newEntries] + tailLines
+            index.offsets[start:] = [entry[1] for entry in newEntries] + tailOffsets
+            index.columns[start:end] = [entry[2] for entry in newEntries]
+            index.texts[start:end] = [entry[3] for entry in newEntries]
+
+        self.text = newText
+        return firstLine, oldLineCount, newLineCount
+
+
+def _scanLines(lines, line, offset, state, states, found, match):
+    """
+    Analyse une suite de lignes consécutives du document.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        Les lignes à analyser, sans leur saut de ligne.
+    line : int
+        Le numéro de la première ligne.
+    offset : int
+        L'indice du début de la première ligne dans le texte.
+    state : tuple or None
+        L'état lexical au début de la première ligne.
+    states : list
+        Reçoit l'état lexical au début de chaque ligne analysée.
+    found : list
+        Reçoit un tuple (ligne, offset, colonne, type, texte) par déclaration.
+    match : callable
+        La fonction de reconnaissance (voir PatternRegistry.match).
+
+    Returns
+    -------
+    tuple or None
+        L'état lexical après la dernière ligne.
+    """
+    firstLine = line
+    for lineText in lines:
+        states.append(state)
+        if state is None:
+            header = match(lineText)
+            if header is not None and header[0] != KIND_DECORATOR:
+                kind, _, column = header
+                found.append((line, offset + column, column, kind, lineText.strip()))
+        state = lexLine(lineText, state)
+        offset += len(lineText) + 1
+        line += 1
+    countLines(line - firstLine)
+    return state
+
+
+def _commonPrefixLength(first, second):
+    """
+    Longueur du plus long préfixe commun, comparé par blocs pour rester en C.
+    """
+    limit = min(len(first), len(second))
+    index = 0
+    while index + _DIFF_BLOCK_SIZE <= limit and first[index:index + _DIFF_BLOCK_SIZE] == second[index:index + _DIFF_BLOCK_SIZE]:
+        index += _DIFF_BLOCK_SIZE
+    # Recherche dichotomique à l'intérieur du dernier bloc
+    low, high = index, min(index + _DIFF_BLOCK_SIZE, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[index:middle] == second[index:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _commonSuffixLength(first, second, limit):
+    """
+    Longueur du plus long suffixe commun, sans dépasser `limit`.
+    """
+    firstLength, secondLength = len(first), len(second)
+    length = 0
+    while (
+        length + _DIFF_BLOCK_SIZE <= limit
+        and first[firstLength - length - _DIFF_BLOCK_SIZE:firstLength - length]
+        == second[secondLength - length - _DIFF_BLOCK_SIZE:secondLength - length]
+    ):
+        length += _DIFF_BLOCK_SIZE
+    low, high = length, min(length + _DIFF_BLOCK_SIZE, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[firstLength - middle:firstLength - length] == second[secondLength - middle:secondLength - length]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def findChangedRange(oldText, newText):
+    """
+    Détermine la zone de lignes modifiée entre deux versions d'un texte.
+
+    Parameters
+    ----------
+    oldText : str
+        L'ancienne version du texte.
+    newText : str
+        La nouvelle version du texte.
+
+    Returns
+    -------
+    tuple of (int, int, int)
+        L'indice du début de la première ligne modifiée (identique dans les
+        deux textes), puis l'indice de fin de la dernière ligne modifiée
+        dans l'ancien texte et dans le nouveau texte.
+    """
+    prefix = _commonPrefixLength(oldText, newText)
+    suffix = _commonSuffixLength(oldText, newText, min(len(oldText), len(newText)) - prefix)
+    regionStart = oldText.rfind("\n", 0, prefix) + 1
+    oldChangeEnd = len(oldText) - suffix
+    oldRegionEnd = oldText.find("\n", oldChangeEnd)
+    if oldRegionEnd == -1:
+        oldRegionEnd = len(oldText)
+    newRegionEnd = oldRegionEnd - oldChangeEnd + len(newText) - suffix
+    return regionStart, oldRegionEnd, newRegionEnd
+
+
+def scanNearby(text, lineStarts, line, kinds, forward, limit, patterns=PYTHON_PATTERNS):
+    """
+    Recherche bornée d'une déclaration autour d'une ligne, sans index.
+
+    Sert de solution de repli tant que l'outline complet n'est pas prêt :
+    au plus `limit` lignes sont lues et, faute d'état lexical, une
+    déclaration écrite dans une chaîne multiligne peut être retenue.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+    lineStarts : array of int
+        L'indice du début de chaque ligne dans `text`.
+    line : int
+        Le numéro de la ligne courante.
+    kinds : iterable of str
+        Les types de déclaration recherchés.
+    forward : bool
+        True pour chercher après la ligne, False pour chercher avant.
+    limit : int
+        Le nombre maximal de lignes lues.
+    patterns : PatternRegistry
+        Les motifs reconnus (déclarations python et repères).
+
+    Returns
+    -------
+    OutlineEntry or None
+        La déclaration trouvée, ou None si aucune ne se trouve dans la zone lue.
+    """
+    lineCount = len(lineStarts)
+    if forward:
+        numbers = range(line + 1, min(lineCount, line + 1 + limit))
+    else:
+        numbers = range(line - 1, max(-1, line - 1 - limit), -1)
+    for scanned, number in enumerate(numbers, 1):
+        start = lineStarts[number]
+        end = lineStarts[number + 1] - 1 if number + 1 < lineCount else len(text)
+        lineText = text[start:end]
+        header = patterns.match(lineText)
+        if header is not None and header[0] in kinds:
+            kind, _, column = header
+            countLines(scanned)
+            return OutlineEntry(number, start + column, column, kind, lineText.strip())
+    countLines(len(numbers))
+    return None
+
+
+def buildOutline(text, patterns=PYTHON_PATTERNS):
+    """
+    Construit l'outline d'un document en une seule passe.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+    patterns : PatternRegistry
+        Les motifs reconnus (déclarations python et repères).
+
+    Returns
+    -------
+    Outline
+        L'index des déclarations du document.
+    """
+    return Outline(text, patterns)
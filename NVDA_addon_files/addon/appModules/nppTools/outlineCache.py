@@ -0,0 +1,354 @@
+# Cache sur disque des structures d'un document : outline, profil d'indentation, fins de bloc
+
+"""
+À la réouverture d'un gros fichier inchangé, ses structures sont relues
+telles quelles au lieu d'être recalculées : outline (déclarations et état
+lexical de chaque ligne), profil d'indentation avec ses tables de saut et
+table des étendues de blocs.
+
+Chaque document est enregistré dans un fichier binaire compact, nommé
+d'après l'empreinte (SHA-1) de son texte et des motifs de l'outline : un
+texte modifié, ou des repères configurés autrement, ne retrouvent jamais
+des structures périmées. Les tableaux sont écrits tels quels
+(array.tobytes, en-têtes struct) et relus sans conversion ligne à ligne.
+
+La taille totale du cache est bornée : les fichiers les moins récemment
+utilisés sont supprimés les premiers.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections import OrderedDict, namedtuple
+
+from .blocks import BlockExtents
+from .indentation import IndentationProfile
+from .outline import Outline
+
+log = logging.getLogger(__name__)
+
+# En dessous de ce nombre de lignes, recalculer coûte moins que lire le cache
+MIN_LINES = 1000
+
+_MAGIC = b"NPPO"
+FORMAT_VERSION = 1
+
+# Signature, version, ordre des octets, largeur de tabulation (0 : sans profil), nombre de lignes
+_HEADER = struct.Struct("<4sHBxHI")
+# Code de type et nombre d'éléments d'un tableau
+_ARRAY_HEADER = struct.Struct("<cI")
+
+_BYTE_ORDERS = {"little": 1, "big": 2}
+
+# Guillemet ouvrant de l'état lexical d'une ligne (voir structure.lexLine)
+_QUOTES = (None, '"""', "'''", '"', "'")
+
+CachedStructures = namedtuple("CachedStructures", ("outline", "profile", "blocks"))
+CachedStructures.__doc__ = """
+Les structures d'un document relues dans le cache.
+
+outline : Outline
+profile : IndentationProfile, ou None s'il n'a pas été enregistré
+blocks : BlockExtents, ou None s'il n'a pas été enregistré
+"""
+
+
+def cacheKey(text, patterns):
+    """
+    Retourne la clé d'un document : empreinte de son texte et des motifs de l'outline.
+    """
+    digest = hashlib.sha1(patterns.signature.encode("utf-8"))
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _writeArray(parts, values):
+    parts.append(_ARRAY_HEADER.pack(values.typecode.encode("ascii"), len(values)))
+    parts.append(values.tobytes())
+
+
+def _writeStrings(parts, strings):
+    encoded = [string.encode("utf-8", "surrogatepass") for string in strings]
+    _writeArray(parts, array("I", map(len, encoded)))
+    _writeArray(parts, array("B", b"".join(encoded)))
+
+
+class _Reader:
+    # Lecture séquentielle des tableaux d'un fichier du cache
+
+    def __init__(self, data, position):
+        self.data = data
+        self.position = position
+
+    def array(self, typecode):
+        code, count = _ARRAY_HEADER.unpack_from(self.data, self.position)
+        if code != typecode.encode("ascii"):
+            raise ValueError(f"tableau de type {code!r} au lieu de {typecode!r}")
+        values = array(typecode)
+        start = self.position + _ARRAY_HEADER.size
+        end = start + count * values.itemsize
+        values.frombytes(self.data[start:end])
+        self.position = end
+        return values
+
+    def strings(self):
+        lengths = self.array("I")
+        blob = self.array("B").tobytes()
+        strings = []
+        position = 0
+        for length in lengths:
+            strings.append(blob[position:position + length].decode("utf-8", "surrogatepass"))
+            position += length
+        return strings
+
+
+def encodeStructures(outline, profile=None, blocks=None):
+    """
+    Encode les structures d'un document.
+
+    Parameters
+    ----------
+    outline : Outline
+        L'outline du document.
+    profile : IndentationProfile, optional
+        Son profil d'indentation.
+    blocks : BlockExtents, optional
+        Sa table des étendues de blocs (enregistrée seulement avec le profil).
+
+    Returns
+    -------
+    bytes
+        Le contenu du fichier du cache.
+    """
+    states = outline.lineStates
+    parts = [_HEADER.pack(
+        _MAGIC, FORMAT_VERSION, _BYTE_ORDERS[sys.byteorder], profile.tabWidth if profile is not None else 0, len(states),
+    )]
+
+    # État lexical : seules les lignes qui prolongent une ligne logique sont enregistrées
+    continued = [(line, state) for line, state in enumerate(states) if state is not None]
+    _writeArray(parts, array("I", [line for line, _ in continued]))
+    _writeArray(parts, array("B", [_QUOTES.index(state[0]) for _, state in continued]))
+    _writeArray(parts, array("I", [state[1] for _, state in continued]))
+    _writeArray(parts, array("B", [state[2] for _, state in continued]))
+
+    kindTables = outline.kindTables
+    _writeStrings(parts, list(kindTables))
+    for lines, offsets, columns, texts in kindTables.values():
+        _writeArray(parts, array("I", lines))
+        _writeArray(parts, array("I", offsets))
+        _writeArray(parts, array("I", columns))
+        _writeStrings(parts, texts)
+
+    if profile is not None:
+        _writeArray(parts, profile.widths)
+        _writeArray(parts, profile.indentLengths)
+        _writeArray(parts, array("B", profile.skipped))
+        for table in profile.tables:
+            _writeArray(parts, table)
+        parts.append(b"\x01" if blocks is not None else b"\x00")
+        if blocks is not None:
+            for table in blocks.tables:
+                _writeArray(parts, table)
+    return b"".join(parts)
+
+
+def decodeStructures(data, text, patterns, lineStarts):
+    """
+    Recrée les structures d'un document à partir du contenu d'un fichier du cache.
+
+    Parameters
+    ----------
+    data : bytes
+        Le contenu du fichier (voir encodeStructures).
+    text : str
+        Le texte du document.
+    patterns : PatternRegistry
+        Les motifs de l'outline.
+    lineStarts : sequence of int
+        L'indice de début de chaque ligne du texte.
+
+    Returns
+    -------
+    CachedStructures
+        Les structures relues.
+
+    Raises
+    ------
+    ValueError
+        Si le fichier est tronqué, d'une autre version ou ne correspond pas au texte.
+    """
+    try:
+        magic, version, byteOrder, tabWidth, lineCount = _HEADER.unpack_from(data, 0)
+    except struct.error as e:
+        raise ValueError(f"en-tête illisible : {e}")
+    if magic != _MAGIC or version != FORMAT_VERSION or byteOrder != _BYTE_ORDERS[sys.byteorder]:
+        raise ValueError("format ou version différents")
+    if lineCount != len(lineStarts):
+        raise ValueError("nombre de lignes différent")
+    reader = _Reader(memoryview(data), _HEADER.size)
+    try:
+        states = [None] * lineCount
+        for line, quote, depth, continuation in zip(
+            reader.array("I"), reader.array("B"), reader.array("I"), reader.array("B"),
+        ):
+            states[line] = (_QUOTES[quote], depth, bool(continuation))
+        kinds = {}
+        for kind in reader.strings():
+            kinds[kind] = (reader.array("I"), reader.array("I"), reader.array("I"), reader.strings())
+        outline = Outline.restore(text, patterns, states, kinds)
+
+        profile = blocks = None
+        if tabWidth:
+            widths = reader.array("H")
+            indentLengths = reader.array("H")
+            skipped = bytearray(reader.array("B"))
+            tables = tuple(reader.array("i") for _ in range(6))
+            profile = IndentationProfile.restore(text, tabWidth, lineStarts, widths, indentLengths, skipped, tables)
+            hasBlocks = data[reader.position]
+            reader.position += 1
+            if hasBlocks:
+                blocks = BlockExtents.restore(profile, reader.array("i"), reader.array("i"))
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"fichier tronqué : {e}")
+    return CachedStructures(outline, profile, blocks)
+
+
+class OutlineCache:
+    """
+    Répertoire des structures enregistrées, borné en taille totale.
+
+    Parameters
+    ----------
+    directory : str
+        Le répertoire du cache (créé au premier enregistrement).
+    maxBytes : int
+        La taille totale maximale des fichiers du cache.
+
+    Attributes
+    ----------
+    hits, misses : int
+        Nombre de documents retrouvés et non retrouvés dans le cache.
+    """
+
+    def __init__(self, directory, maxBytes):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Taille de chaque fichier, du moins au plus récemment utilisé (lu au premier accès)
+        self._sizes = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _entries(self):
+        # Appelée verrou pris
+        if self._sizes is None:
+            found = []
+            try:
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".bin"):
+                            stat = entry.stat()
+                            found.append((stat.st_mtime, entry.name[:-len(".bin")], stat.st_size))
+            except OSError:
+                pass
+            found.sort()
+            self._sizes = OrderedDict((key, size) for _, key, size in found)
+        return self._sizes
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries()
+
+    def load(self, key, text, patterns, lineStarts):
+        """
+        Relit les structures d'un document.
+
+        Parameters
+        ----------
+        key : str
+            La clé du document (voir cacheKey).
+        text : str
+            Le texte du document.
+        patterns : PatternRegistry
+            Les motifs de l'outline.
+        lineStarts : sequence of int
+            L'indice de début de chaque ligne du texte.
+
+        Returns
+        -------
+        CachedStructures or None
+            Les structures, ou None si le document n'est pas dans le cache.
+        """
+        with self._lock:
+            sizes = self._entries()
+            if key not in sizes:
+                self.misses += 1
+                return None
+            sizes.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cacheFile:
+                data = cacheFile.read()
+            structures = decodeStructures(data, text, patterns, lineStarts)
+            # La date de modification sert d'ordre d'utilisation à la prochaine session
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            log.debug(f"Fichier du cache ignoré ({path}) : {e}")
+            self._remove(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return structures
+
+    def store(self, key, outline, profile=None, blocks=None):
+        """
+        Enregistre les structures d'un document, puis supprime les fichiers
+        les moins récemment utilisés au-delà de la taille maximale.
+
+        Parameters
+        ----------
+        key : str
+            La clé du document (voir cacheKey).
+        outline, profile, blocks :
+            Les structures à enregistrer (voir encodeStructures).
+        """
+        data = encodeStructures(outline, profile, blocks)
+        if len(data) > self.maxBytes:
+            return
+        path = self._path(key)
+        temporaryPath = f"{path}.tmp"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(temporaryPath, "wb") as cacheFile:
+            cacheFile.write(data)
+        os.replace(temporaryPath, path)
+        with self._lock:
+            sizes = self._entries()
+            sizes[key] = len(data)
+            sizes.move_to_end(key)
+            evicted = []
+            total = sum(sizes.values())
+            while total > self.maxBytes and len(sizes) > 1:
+                oldKey, size = sizes.popitem(last=False)
+                total -= size
+                evicted.append(oldKey)
+        for oldKey in evicted:
+            try:
+                os.remove(self._path(oldKey))
+            except OSError:
+                pass
+
+    def _remove(self, key):
+        with self._lock:
+            self._entries().pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
@@ -0,0 +1,161 @@
+# Registre des motifs de structure : déclarations python et repères configurables
+
+"""
+Regroupe en un seul endroit les motifs qui reconnaissent une ligne de
+structure : fonction (def, async def), classe, décorateur, bloc
+if __name__ == "__main__" et repères ajoutés par l'utilisateur, comme les
+cellules "# %%" ou les "# region".
+
+Tous les motifs d'un registre sont compilés en une seule expression
+régulière (une alternative par type, dans des groupes nommés) : chaque
+ligne n'est examinée qu'une fois, quel que soit le nombre de types
+recherchés.
+"""
+
+import re
+from collections import namedtuple
+
+KIND_MODULE = "module"
+KIND_FUNCTION = "function"
+KIND_CLASS = "class"
+KIND_MAIN = "main"
+KIND_DECORATOR = "decorator"
+
+# Types réservés : un repère ne peut pas porter l'un de ces noms
+_RESERVED_KINDS = frozenset((KIND_MODULE, KIND_FUNCTION, KIND_CLASS, KIND_MAIN, KIND_DECORATOR))
+
+# Déclarations python, dans l'ordre où elles sont essayées
+_PYTHON_PATTERNS = (
+    (KIND_FUNCTION, r"(?:async[ \t]+)?def[ \t]+(?P<function_name>\w*)"),
+    (KIND_CLASS, r"class[ \t]+(?P<class_name>\w*)"),
+    (KIND_MAIN, r"if[ \t]+__name__\b.*__main__"),
+    (KIND_DECORATOR, r"@"),
+)
+
+# Référence arrière (\\1) ou condition sur un groupe ((?(1)...)) non échappée
+_BACKREFERENCE = re.compile(r"(?<!\\)(?:\\\\)*(?:\\[1-9]|\(\?\()")
+
+Landmark = namedtuple("Landmark", ("name", "pattern", "nextGesture", "previousGesture"))
+Landmark.__doc__ = """
+Un repère configurable.
+
+name : nom du repère, utilisé comme type de déclaration dans l'outline
+pattern : expression régulière reconnue au début de la ligne (après l'indentation)
+nextGesture, previousGesture : raccourcis vers le repère suivant et précédent (ou chaîne vide)
+"""
+
+
+def parseLandmark(spec):
+    """
+    Lit la description d'un repère dans la configuration.
+
+    Parameters
+    ----------
+    spec : str
+        Le nom, le motif et les deux raccourcis, séparés par "|", par
+        exemple "cell|# ?%%|kb:alt+pageDown|kb:alt+pageUp". Les raccourcis
+        sont facultatifs.
+
+    Returns
+    -------
+    Landmark
+        Le repère décrit.
+
+    Raises
+    ------
+    ValueError
+        Si le nom est invalide ou réservé, ou si le motif n'est pas une
+        expression régulière valide une fois inséré dans le registre : les
+        groupes nommés, les références arrière et les options globales
+        ("(?i)") y sont refusés.
+    """
+    fields = [field.strip() for field in spec.split("|")]
+    if len(fields) < 2 or len(fields) > 4:
+        raise ValueError(f"repère mal formé : {spec!r}")
+    fields += [""] * (4 - len(fields))
+    name, pattern, nextGesture, previousGesture = fields
+    if not re.fullmatch(r"[A-Za-z]\w*", name) or name in _RESERVED_KINDS:
+        raise ValueError(f"nom de repère invalide : {name!r}")
+    try:
+        # Le motif est compilé tel qu'il sera inséré dans l'expression du registre
+        compiled = re.compile(f"(?:{pattern})")
+    except re.error as e:
+        raise ValueError(f"motif invalide pour le repère {name} : {e}")
+    # Dans le registre, un groupe nommé entrerait en conflit avec ceux des autres
+    # motifs et une référence arrière désignerait un autre groupe
+    if compiled.groupindex:
+        raise ValueError(f"groupe nommé interdit dans le motif du repère {name}")
+    if _BACKREFERENCE.search(pattern):
+        raise ValueError(f"référence arrière interdite dans le motif du repère {name}")
+    return Landmark(name, pattern, nextGesture, previousGesture)
+
+
+class PatternRegistry:
+    """
+    Motifs de structure compilés en une seule expression régulière.
+
+    Parameters
+    ----------
+    landmarks : iterable of Landmark
+        Les repères à reconnaître en plus des déclarations python.
+    """
+
+    def __init__(self, landmarks=()):
+        self.landmarks = tuple(landmarks)
+        alternatives = []
+        self._groups = {}
+        patterns = list(_PYTHON_PATTERNS) + [(landmark.name, landmark.pattern) for landmark in self.landmarks]
+        for number, (kind, pattern) in enumerate(patterns):
+            group = f"k{number}"
+            self._groups[group] = kind
+            alternatives.append(f"(?P<{group}>{pattern})")
+        self._pattern = re.compile(r"(?P<indent>[ \t]*)(?:" + "|".join(alternatives) + ")")
+
+    @property
+    def signature(self):
+        """
+        Texte qui identifie les motifs reconnus : deux registres de même
+        signature construisent le même outline.
+        """
+        return "\n".join([self._pattern.pattern] + [self._groups[group] for group in sorted(self._groups)])
+
+    @property
+    def landmarkKinds(self):
+        """
+        Les types des repères du registre.
+        """
+        return tuple(landmark.name for landmark in self.landmarks)
+
+    def match(self, lineText):
+        """
+        Reconnaît une ligne de structure.
+
+        La ligne doit commencer une ligne logique (hors chaîne multiligne).
+
+        Parameters
+        ----------
+        lineText : str
+            Le texte de la ligne.
+
+        Returns
+        -------
+        tuple of (str, str, int) or None
+            Le type, le nom (nom de la fonction ou de la classe, "__main__",
+            ou le texte du repère) et la colonne, ou None.
+        """
+        match = self._pattern.match(lineText)
+        if match is None:
+            return None
+        kind = self._groups[match.lastgroup]
+        column = len(match.group("indent"))
+        if kind == KIND_FUNCTION:
+            return kind, match.group("function_name"), column
+        if kind == KIND_CLASS:
+            return kind, match.group("class_name"), column
+        if kind == KIND_MAIN:
+            return kind, "__main__", column
+        return kind, lineText[column:].strip(), column
+
+
+# Registre des seules déclarations python, sans repère
+PYTHON_PATTERNS = PatternRegistry()
@@ -0,0 +1,313 @@
+# Index des déclarations de tous les fichiers python d'un dossier de projet
+
+"""
+Liste récursivement les fichiers python d'un dossier (sauf les dossiers et
+fichiers exclus) et retient les classes, fonctions et méthodes de chacun,
+pour aller directement à une déclaration d'un autre fichier.
+
+Les fichiers sont analysés par l'indexeur (nppTools.indexer), lancé avec
+l'interpréteur python de l'utilisateur : l'interpréteur de NVDA ne peut pas
+lancer de groupe de processus (son exécutable est NVDA lui-même). L'index
+est enregistré sur le disque, chaque fichier avec sa date de modification
+et sa taille : à la session suivante, seuls les fichiers ajoutés ou
+modifiés depuis sont analysés.
+
+La construction a lieu sur un thread de travail unique (ProjectIndexer) et
+ne retarde pas NVDA.
+"""
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import threading
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+# Aucune console ne s'ouvre pour l'indexeur (Windows uniquement)
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# Script de l'indexeur
+_INDEXER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "indexer.py")
+
+# Extensions des fichiers indexés
+PYTHON_EXTENSIONS = (".py", ".pyw")
+
+# Version du format du fichier d'index : un index d'une autre version est ignoré
+CACHE_VERSION = 1
+
+ProjectSymbol = namedtuple("ProjectSymbol", ("name", "kind", "path", "line", "column", "parent"))
+ProjectSymbol.__doc__ = """
+Une déclaration d'un fichier du projet.
+
+name : nom de la classe ou de la fonction
+kind : "class", "function" ou "method"
+path : chemin complet du fichier
+line : numéro de ligne (à partir de 0)
+column : largeur de l'indentation de la déclaration
+parent : nom qualifié de la classe ou de la fonction englobante, ou chaîne vide
+"""
+
+
+def _excluded(name, excludes):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in excludes)
+
+
+def findPythonFiles(root, excludes=()):
+    """
+    Liste récursivement les fichiers python d'un dossier.
+
+    Parameters
+    ----------
+    root : str
+        Le dossier du projet.
+    excludes : iterable of str
+        Motifs (fnmatch) des noms de dossiers et de fichiers ignorés, par
+        exemple ".git" ou "*_pb2.py".
+
+    Returns
+    -------
+    dict
+        Pour chaque chemin complet, le couple (mtime, taille).
+    """
+    excludes = tuple(excludes)
+    found = {}
+    directories = [root]
+    while directories:
+        directory = directories.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if _excluded(entry.name, excludes):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.name.endswith(PYTHON_EXTENSIONS) and entry.is_file():
+                        # Sous Windows, stat() réutilise les informations lues avec le dossier
+                        stat = entry.stat()
+                        found[entry.path] = (stat.st_mtime, stat.st_size)
+        except OSError as e:
+            log.debug(f"Dossier ignoré lors de l'indexation : {e}")
+    return found
+
+
+class ProjectIndex:
+    """
+    Les déclarations des fichiers python d'un dossier.
+
+    Parameters
+    ----------
+    root : str
+        Le dossier du projet.
+    cachePath : str
+        Le fichier où l'index est enregistré entre deux sessions.
+    """
+
+    def __init__(self, root, cachePath):
+        self.root = root
+        self.cachePath = cachePath
+        # Pour chaque chemin : [mtime, taille, déclarations] (voir nppTools.indexer)
+        self._files = {}
+        self.symbols = []
+        self._process = None
+
+    def load(self):
+        """
+        Lit l'index enregistré ; un fichier absent, illisible ou d'une autre version est ignoré.
+        """
+        try:
+            with open(self.cachePath, encoding="utf-8") as cacheFile:
+                data = json.load(cacheFile)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION or data.get("root") != self.root:
+            return
+        self._files = data["files"]
+        self._buildSymbols()
+
+    def save(self):
+        """
+        Enregistre l'index ; le fichier est remplacé d'un coup, jamais laissé à moitié écrit.
+        """
+        os.makedirs(os.path.dirname(self.cachePath), exist_ok=True)
+        temporaryPath = f"{self.cachePath}.tmp"
+        with open(temporaryPath, "w", encoding="utf-8") as cacheFile:
+            json.dump({"version": CACHE_VERSION, "root": self.root, "files": self._files}, cacheFile)
+        os.replace(temporaryPath, self.cachePath)
+
+    def refresh(self, excludes, interpreter, workers=0):
+        """
+        Met l'index à jour : analyse les fichiers ajoutés ou modifiés, oublie les fichiers supprimés.
+
+        Parameters
+        ----------
+        excludes : iterable of str
+            Motifs des noms ignorés (voir findPythonFiles).
+        interpreter : str
+            L'interpréteur python qui lance l'indexeur.
+        workers : int
+            Nombre de processus de l'indexeur (0 : un par processeur).
+
+        Returns
+        -------
+        int
+            Le nombre de fichiers analysés.
+        """
+        found = findPythonFiles(self.root, excludes)
+        stale = [
+            path for path, (mtime, size) in found.items()
+            if path not in self._files or self._files[path][:2] != [mtime, size]
+        ]
+        removed = [path for path in self._files if path not in found]
+        for path in removed:
+            del self._files[path]
+        if stale:
+            for path, mtime, size, declarations in self._runIndexer(stale, interpreter, workers):
+                self._files[path] = [mtime, size, declarations]
+        if stale or removed:
+            self._buildSymbols()
+            self.save()
+        return len(stale)
+
+    def stop(self):
+        """
+        Arrête l'indexeur en cours d'exécution.
+        """
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _runIndexer(self, paths, interpreter, workers):
+        self._process = subprocess.Popen(
+            [interpreter, _INDEXER_SCRIPT, str(workers)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env=dict(os.environ, PYTHONIOENCODING="utf-8"),
+            creationflags=_CREATION_FLAGS, encoding="utf-8", errors="replace",
+        )
+        try:
+            output = self._process.communicate("\n".join(paths) + "\n")[0]
+        finally:
+            self._process = None
+        results = []
+        for line in output.splitlines():
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                log.debug(f"Ligne de l'indexeur ignorée : {line[:200]}")
+        return results
+
+    def _buildSymbols(self):
+        self.symbols = [
+            ProjectSymbol(name, kind, path, line, column, parent)
+            for path in sorted(self._files)
+            for name, kind, line, column, parent in self._files[path][2]
+        ]
+
+
+def describeProjectSymbol(symbol, root):
+    """
+    Retourne le libellé lu d'une déclaration, par exemple "run, méthode de Worker, tools\\jobs.py ligne 120".
+    """
+    kind = {"class": "classe", "function": "fonction", "method": "méthode"}.get(symbol.kind, symbol.kind)
+    if symbol.parent:
+        kind = f"{kind} de {symbol.parent}"
+    return f"{symbol.name}, {kind}, {os.path.relpath(symbol.path, root)} ligne {symbol.line + 1}"
+
+
+class ProjectIndexer:
+    """
+    Thread de travail qui construit et met à jour les index de projet.
+
+    Les index sont conservés en mémoire pendant toute la session, un par
+    dossier ; seule la demande la plus récente est traitée.
+
+    Parameters
+    ----------
+    cacheDirectory : str
+        Le dossier où les index sont enregistrés.
+    """
+
+    def __init__(self, cacheDirectory):
+        self.cacheDirectory = cacheDirectory
+        self._indexes = {}
+        self._current = None
+        self._condition = threading.Condition()
+        self._pending = None
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="nppProjectIndexer", daemon=True)
+        self._thread.start()
+
+    def isIndexed(self, root):
+        """
+        Indique si le dossier a déjà un index en mémoire.
+        """
+        return root in self._indexes
+
+    def request(self, root, excludes, interpreter, workers, onReady):
+        """
+        Demande la mise à jour de l'index d'un dossier.
+
+        Parameters
+        ----------
+        root : str
+            Le dossier du projet.
+        excludes : iterable of str
+            Motifs des noms ignorés (voir findPythonFiles).
+        interpreter : str
+            L'interpréteur python qui lance l'indexeur.
+        workers : int
+            Nombre de processus de l'indexeur (0 : un par processeur).
+        onReady : callable
+            Appelée depuis le thread de travail avec l'index (ProjectIndex)
+            une fois à jour, ou None en cas d'erreur.
+        """
+        with self._condition:
+            self._pending = (root, tuple(excludes), interpreter, workers, onReady)
+            self._condition.notify()
+
+    def stop(self):
+        """
+        Arrête le thread de travail et l'indexeur en cours ; la demande en attente est abandonnée.
+        """
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify()
+        current = self._current
+        if current is not None:
+            current.stop()
+        self._thread.join(1)
+
+    def _index(self, root):
+        index = self._indexes.get(root)
+        if index is None:
+            key = hashlib.sha1(os.path.normcase(root).encode("utf-8")).hexdigest()[:16]
+            index = ProjectIndex(root, os.path.join(self.cacheDirectory, f"{key}.json"))
+            index.load()
+            self._indexes[root] = index
+        return index
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                root, excludes, interpreter, workers, onReady = self._pending
+                self._pending = None
+            index = None
+            try:
+                self._current = self._index(root)
+                parsed = self._current.refresh(excludes, interpreter, workers)
+                log.debug(f"Index du projet {root} à jour : {parsed} fichiers analysés, {len(self._current.symbols)} déclarations.")
+                index = self._current
+            except Exception as e:
+                log.error(f"Erreur lors de l'indexation du projet {root} : {e}")
+            finally:
+                self._current = None
+            if self._running:
+                onReady(index)
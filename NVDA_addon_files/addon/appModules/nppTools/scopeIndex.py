@@ -0,0 +1,155 @@
+# Index des intervalles de lignes des portées : recherches d'inclusion en O(log n)
+
+"""
+Les portées d'un document (voir nppTools.structure) sont des intervalles de
+lignes parfaitement imbriqués. Rangées dans l'ordre du document (début
+croissant, portée englobante avant ses enfants), la portée la plus interne
+qui contient une ligne L est la dernière, parmi celles qui commencent au
+plus tard à L, dont la fin atteint L.
+
+L'index garde donc le tableau trié des débuts, et au-dessus du tableau des
+fins un arbre binaire implicite du maximum des fins (augmentation
+« max-end ») : une recherche dichotomique sur les débuts puis une descente
+dans l'arbre donnent cette portée en O(log n), quelle que soit la
+profondeur d'imbrication ou le nombre de portées sœurs.
+
+Sélection, suppression, fil d'Ariane et navigation structurelle partagent
+l'index de l'arbre des portées du snapshot (ScopeTree.index).
+"""
+
+import bisect
+from array import array
+
+from .patterns import KIND_MODULE
+
+
+def scopeChain(scope):
+    """
+    Retourne une portée et ses portées englobantes, de la plus externe à la
+    plus interne (le module exclu).
+
+    Parameters
+    ----------
+    scope : Scope or None
+        La portée la plus interne.
+
+    Returns
+    -------
+    list of Scope
+        La chaîne des portées, vide si `scope` est None ou le module.
+    """
+    chain = []
+    while scope is not None and scope.kind != KIND_MODULE:
+        chain.append(scope)
+        scope = scope.parent
+    chain.reverse()
+    return chain
+
+
+class ScopeIndex:
+    """
+    Index des intervalles de lignes d'un ensemble de portées imbriquées.
+
+    Parameters
+    ----------
+    scopes : iterable of Scope
+        Les portées, dans l'ordre du document (voir Scope.iterScopes).
+    """
+
+    def __init__(self, scopes):
+        self.scopes = list(scopes)
+        self.starts = array("i", (scope.startLine for scope in self.scopes))
+        # Arbre binaire implicite : feuilles à partir de `size`, chaque nœud interne
+        # porte la plus grande fin de ses feuilles (-1 pour les feuilles de remplissage)
+        size = 1
+        while size < len(self.scopes):
+            size *= 2
+        self._size = size
+        maxEnds = array("i", [-1]) * (2 * size)
+        maxEnds[size:size + len(self.scopes)] = array("i", (scope.endLine for scope in self.scopes))
+        for node in range(size - 1, 0, -1):
+            maxEnds[node] = max(maxEnds[2 * node], maxEnds[2 * node + 1])
+        self._maxEnds = maxEnds
+        self._filtered = {}
+
+    def __len__(self):
+        return len(self.scopes)
+
+    def _lastReaching(self, position, line):
+        # Dernière position <= `position` dont la fin atteint `line`, ou -1
+        maxEnds, size = self._maxEnds, self._size
+        node = position + size
+        if maxEnds[node] >= line:
+            return position
+        # Remonte jusqu'au premier sous-arbre situé à gauche qui atteint la ligne
+        while node > 1:
+            if node & 1 and maxEnds[node - 1] >= line:
+                node -= 1
+                break
+            node >>= 1
+        else:
+            return -1
+        # Redescend vers sa feuille la plus à droite qui atteint la ligne
+        while node < size:
+            node = 2 * node + 1 if maxEnds[2 * node + 1] >= line else 2 * node
+        return node - size
+
+    def innermostAt(self, line, kinds=None):
+        """
+        Retourne la portée la plus interne contenant une ligne.
+
+        Parameters
+        ----------
+        line : int
+            Le numéro de ligne.
+        kinds : iterable of str, optional
+            Si fourni, seules les portées de ces types sont retenues.
+
+        Returns
+        -------
+        Scope or None
+            La portée trouvée, ou None.
+        """
+        if kinds is not None:
+            return self._filter(kinds).innermostAt(line)
+        position = bisect.bisect_right(self.starts, line) - 1
+        if position < 0:
+            return None
+        position = self._lastReaching(position, line)
+        return self.scopes[position] if position >= 0 else None
+
+    def ancestorsAt(self, line):
+        """
+        Retourne les portées qui contiennent une ligne, de la plus externe à la plus interne.
+        """
+        return scopeChain(self.innermostAt(line))
+
+    def siblings(self, scope):
+        """
+        Retourne les portées sœurs d'une portée (elle comprise) et sa position parmi elles.
+
+        Parameters
+        ----------
+        scope : Scope
+            Une portée de l'index.
+
+        Returns
+        -------
+        tuple of (list of Scope, int)
+            Les enfants de la portée parente dans l'ordre du document et
+            l'indice de `scope` dans cette liste.
+        """
+        siblings = scope.parent.children
+        position = bisect.bisect_left(siblings, scope.startLine, key=lambda sibling: sibling.startLine)
+        # Des portées sœurs ne commencent jamais sur la même ligne, sauf analyse tolérante d'un code aberrant
+        while siblings[position] is not scope:
+            position += 1
+        return siblings, position
+
+    def _filter(self, kinds):
+        # Index des seules portées des types donnés, construit à la première demande
+        kinds = frozenset(kinds)
+        index = self._filtered.get(kinds)
+        if index is None:
+            index = self._filtered[kinds] = ScopeIndex(scope for scope in self.scopes if scope.kind in kinds)
+        return index
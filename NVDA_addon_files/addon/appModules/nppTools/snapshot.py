@@ -0,0 +1,415 @@
+# Photographie (snapshot) du document d'une fenêtre d'édition
+
+"""
+Un DocumentSnapshot conserve le texte complet du document, la table des
+débuts de ligne et les structures calculées à partir de ce texte (outline,
+arbre des portées, profil d'indentation, table des fins de bloc, première
+erreur de syntaxe).
+
+Tant que le document n'a pas changé, les commandes réutilisent le même
+snapshot sans relire tout le texte. Un gros document sans version
+précédente en mémoire (réouverture) retrouve ses structures dans le cache
+sur disque (voir nppTools.outlineCache) s'il n'a pas changé depuis. La
+validité est vérifiée à moindre coût : longueur du document, puis
+empreinte de quelques courtes zones échantillonnées (début, milieu, fin du
+document et ligne du curseur).
+"""
+
+import bisect
+import threading
+import time
+
+from .backends import PYTHON_BACKEND, outlineFromScopes
+from .blocks import BlockExtents, BlockRange
+from .document import computeLineStarts
+from .indentation import IndentationProfile
+from .instrumentation import countLines
+from .outlineCache import MIN_LINES, cacheKey
+from .patterns import PYTHON_PATTERNS
+
+# Nombre maximal de caractères relus pour une zone échantillonnée
+SAMPLE_LENGTH = 256
+
+
+class DocumentSnapshot:
+    """
+    Photographie du document d'une fenêtre d'édition.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+    byteOffsets : bool
+        True si les offsets du document sont des positions en octets UTF-8.
+    endOffset : int
+        La longueur du document, en offsets du document.
+    previous : DocumentSnapshot, optional
+        Le snapshot précédent de la même fenêtre : son outline est copié et
+        mis à jour de façon incrémentale au lieu d'être reconstruit.
+    patterns : PatternRegistry
+        Les motifs reconnus par l'outline (déclarations python et repères).
+    cache : OutlineCache, optional
+        Le cache sur disque des structures, consulté avant une construction complète.
+    backend : StructureBackend
+        Le moteur de structure du langage du document (voir nppTools.backends).
+
+    L'outline peut être construit par un thread de travail (voir
+    nppTools.background) : il n'est publié qu'une fois complet et n'est plus
+    modifié ensuite.
+    """
+
+    def __init__(self, text, byteOffsets, endOffset, previous=None, patterns=PYTHON_PATTERNS, cache=None, backend=PYTHON_BACKEND):
+        self.text = text
+        self.patterns = patterns
+        self.backend = backend
+        self.byteOffsets = byteOffsets
+        self.endOffset = endOffset
+        self.lineStarts = computeLineStarts(text.split("\n"))
+        countLines(len(self.lineStarts))
+        self.lastUsed = time.monotonic()
+        # Offset en octets du début de chaque ligne : une conversion ne ré-encode qu'une ligne
+        self._byteLineStarts = computeLineStarts(text.encode("utf-8").split(b"\n")) if byteOffsets else None
+        self._outline = None
+        # Outline d'une version précédente, point de départ de la mise à jour incrémentale
+        self._baseOutline = None
+        if previous is not None and previous.backend is backend and backend.incremental:
+            self._baseOutline = previous.readyOutline or previous._baseOutline
+        self._outlineLock = threading.Lock()
+        self._scopeTree = None
+        self._scopeTreeLock = threading.Lock()
+        self._profile = None
+        self._blocks = None
+        self._syntaxIssue = None
+        self._syntaxChecked = False
+        # Le cache n'est utile qu'aux gros documents dont l'outline est construit par motifs
+        self._cache = cache if len(self.lineStarts) >= MIN_LINES and backend.incremental else None
+        self._cacheKey = None
+        self._cached = False
+        lastLine = len(self.lineStarts) - 1
+        self.samples = [self.sampleLine(line) for line in sorted({0, lastLine // 2, lastLine})]
+
+    @property
+    def lineCount(self):
+        return len(self.lineStarts)
+
+    def touch(self):
+        """
+        Note l'utilisation du snapshot (pour l'éviction après le délai configuré).
+        """
+        self.lastUsed = time.monotonic()
+
+    def isExpired(self, ttl, now=None):
+        """
+        Indique si le snapshot n'a pas servi depuis plus de `ttl` secondes.
+        """
+        if now is None:
+            now = time.monotonic()
+        return now - self.lastUsed >= ttl
+
+    def indexToOffset(self, index):
+        """
+        Convertit un indice de caractère en offset du document.
+        """
+        if not self.byteOffsets:
+            return index
+        line = self.lineAt(index)
+        return self._byteLineStarts[line] + len(self.text[self.lineStarts[line]:index].encode("utf-8"))
+
+    def offsetToIndex(self, offset):
+        """
+        Convertit un offset du document en indice de caractère.
+        """
+        if not self.byteOffsets:
+            return offset
+        line = bisect.bisect_right(self._byteLineStarts, offset) - 1
+        lineStart = self.lineStarts[line]
+        encoded = self.text[lineStart:self.lineEndIndex(line)].encode("utf-8")
+        return lineStart + len(encoded[:offset - self._byteLineStarts[line]].decode("utf-8", "ignore"))
+
+    def lineAt(self, index):
+        """
+        Numéro de la ligne contenant l'indice de caractère donné.
+        """
+        return bisect.bisect_right(self.lineStarts, index) - 1
+
+    def lineEndIndex(self, line):
+        """
+        Indice de fin d'une ligne, saut de ligne compris.
+        """
+        if line + 1 < len(self.lineStarts):
+            return self.lineStarts[line + 1]
+        return len(self.text)
+
+    def sampleLine(self, line):
+        """
+        Prépare une zone échantillonnée au début d'une ligne.
+
+        Returns
+        -------
+        tuple of (int, int, int)
+            Les offsets de début et de fin de la zone dans le document et
+            l'empreinte de son texte.
+        """
+        start = self.lineStarts[line]
+        end = min(self.lineEndIndex(line), start + SAMPLE_LENGTH)
+        return self.indexToOffset(start), self.indexToOffset(end), hash(self.text[start:end])
+
+    def matches(self, endOffset, readRange, extraSamples=()):
+        """
+        Vérifie à moindre coût que le document n'a pas changé.
+
+        Parameters
+        ----------
+        endOffset : int
+            La longueur actuelle du document, en offsets du document.
+        readRange : callable
+            Fonction (début, fin) -> str qui lit une zone du document.
+        extraSamples : iterable of tuple
+            Zones supplémentaires à vérifier (voir sampleLine).
+
+        Returns
+        -------
+        bool
+            True si la longueur et toutes les zones échantillonnées sont identiques.
+        """
+        if endOffset != self.endOffset:
+            return False
+        for start, end, digest in (*self.samples, *extraSamples):
+            if hash(readRange(start, end)) != digest:
+                return False
+        return True
+
+    @property
+    def readyOutline(self):
+        """
+        L'outline du document s'il est déjà construit, sinon None (sans attendre).
+        """
+        return self._outline
+
+    @property
+    def hasBaseOutline(self):
+        """
+        Indique si un outline d'une version précédente permet une mise à jour
+        incrémentale (rapide) plutôt qu'une construction complète.
+        """
+        return self._baseOutline is not None
+
+    @property
+    def outline(self):
+        """
+        L'outline du document, construit à la première demande.
+
+        L'outline de la version précédente est copié puis mis à jour de façon
+        incrémentale ; à défaut, il est relu dans le cache sur disque avec le
+        profil d'indentation et la table des blocs, ou construit entièrement.
+        Hors python, il est déduit de l'arbre des portées.
+        Si un autre thread est en train de le construire, l'appel attend
+        qu'il soit prêt.
+        """
+        if self._outline is None:
+            with self._outlineLock:
+                if self._outline is None:
+                    if not self.backend.incremental:
+                        outline = outlineFromScopes(self.scopeTree, self.patterns)
+                    elif self._baseOutline is not None and self._baseOutline.patterns is self.patterns:
+                        outline = self._baseOutline.copy()
+                        outline.update(self.text)
+                    elif self._loadFromCache():
+                        outline = self._outline
+                    else:
+                        outline = self.backend.buildOutline(self.text, self.patterns)
+                    self._outline = outline
+                    self._baseOutline = None
+        return self._outline
+
+    def _loadFromCache(self):
+        # Relit outline, profil et table des blocs (appelée verrou de l'outline pris)
+        if self._cache is None:
+            return False
+        self._cacheKey = cacheKey(self.text, self.patterns)
+        structures = self._cache.load(self._cacheKey, self.text, self.patterns, self.lineStarts)
+        if structures is None:
+            return False
+        self._outline = structures.outline
+        if structures.profile is not None:
+            self._profile = structures.profile
+            self._blocks = structures.blocks
+        self._cached = True
+        return True
+
+    @property
+    def needsCaching(self):
+        """
+        Indique si les structures du document sont à enregistrer dans le cache sur disque.
+        """
+        return self._cache is not None and not self._cached
+
+    def saveToCache(self, tabWidth):
+        """
+        Calcule si besoin le profil d'indentation et la table des blocs, puis
+        enregistre les structures du document dans le cache sur disque.
+
+        Parameters
+        ----------
+        tabWidth : int
+            La largeur de tabulation du profil enregistré.
+        """
+        if not self.needsCaching:
+            return
+        profile = self.indentationProfile(tabWidth)
+        blocks = self.blockExtents(tabWidth)
+        if blocks.profile is not profile:
+            # Largeur de tabulation modifiée pendant le calcul : enregistrement à la prochaine analyse
+            return
+        if self._cacheKey is None:
+            self._cacheKey = cacheKey(self.text, self.patterns)
+        if self._cacheKey not in self._cache:
+            self._cache.store(self._cacheKey, self.outline, profile, blocks)
+        self._cached = True
+
+    @property
+    def syntaxChecked(self):
+        """
+        Indique si la syntaxe du document a déjà été vérifiée (voir syntaxIssue).
+        """
+        return self._syntaxChecked
+
+    @property
+    def syntaxIssue(self):
+        """
+        La première erreur de syntaxe du document (SyntaxIssue), ou None,
+        vérifiée à la première demande (python seulement).
+        """
+        if not self._syntaxChecked:
+            self._syntaxIssue = self.backend.checkSyntax(self.text)
+            self._syntaxChecked = True
+        return self._syntaxIssue
+
+    @property
+    def readyScopeTree(self):
+        """
+        L'arbre des portées s'il est déjà calculé, sinon None (sans attendre).
+        """
+        return self._scopeTree
+
+    @property
+    def scopeTree(self):
+        """
+        L'arbre des portées du document, calculé à la première demande.
+
+        Si un autre thread est en train de le calculer, l'appel attend qu'il soit prêt.
+        """
+        if self._scopeTree is None:
+            with self._scopeTreeLock:
+                if self._scopeTree is None:
+                    self._scopeTree = self.backend.buildScopeTree(self.text)
+        return self._scopeTree
+
+    def indentationProfile(self, tabWidth):
+        """
+        Le profil d'indentation du document pour la largeur de tabulation donnée.
+        """
+        if self._profile is None or self._profile.tabWidth != tabWidth:
+            self._profile = IndentationProfile(self.text, tabWidth)
+            self._blocks = None
+        return self._profile
+
+    def blockExtents(self, tabWidth):
+        """
+        La table des étendues de blocs du document (voir nppTools.blocks).
+        """
+        profile = self.indentationProfile(tabWidth)
+        if self._blocks is None:
+            self._blocks = BlockExtents(profile, self.outline.lineStates)
+        return self._blocks
+
+    def hasBlockExtents(self, tabWidth):
+        """
+        Indique si blockRange répond sans calcul : table des blocs déjà
+        construite pour cette largeur de tabulation, ou blocs délimités par
+        les accolades.
+        """
+        if not self.backend.indentedBlocks:
+            return True
+        blocks, profile = self._blocks, self._profile
+        return blocks is not None and blocks.profile is profile and profile.tabWidth == tabWidth
+
+    def window(self, line, maxLines):
+        """
+        Retourne une fenêtre du document autour d'une ligne, analysable sans
+        attendre les structures du document complet.
+
+        La fenêtre commence et se termine à des lignes qui commencent une
+        instruction de premier niveau (voir StructureBackend.startsTopLevel),
+        hors chaîne multiligne et ligne continuée d'après l'état lexical de
+        l'outline : les portées qu'elle contient y sont complètes. Elle
+        s'étend d'environ `maxLines` / 2 lignes de part et d'autre de `line`,
+        sans dépasser `maxLines` lignes d'un côté.
+
+        Parameters
+        ----------
+        line : int
+            La ligne autour de laquelle la fenêtre est prise.
+        maxLines : int
+            Le nombre de lignes examinées au plus de chaque côté.
+
+        Returns
+        -------
+        tuple of (DocumentSnapshot, int) or None
+            Le snapshot du texte de la fenêtre (offsets en caractères, sans
+            cache) et le numéro de sa première ligne dans le document, ou
+            None si l'outline n'est pas prêt ou si aucune limite n'a été
+            trouvée.
+        """
+        outline = self.readyOutline
+        if outline is None:
+            return None
+        states = outline.lineStates
+        text, lineStarts = self.text, self.lineStarts
+        lineCount = len(lineStarts)
+
+        def isBoundary(line):
+            # Une ligne précédée d'un décorateur n'est pas le début de l'instruction
+            if line == 0 or line == lineCount:
+                return True
+            if states[line] is not None:
+                return False
+            start = lineStarts[line]
+            return self.backend.startsTopLevel(text[start:start + 1]) and not text.startswith("@", lineStarts[line - 1])
+
+        first = max(0, line - maxLines // 2)
+        lowest = max(0, line - maxLines)
+        while first > lowest and not isBoundary(first):
+            first -= 1
+        end = min(lineCount, line + 1 + maxLines // 2)
+        highest = min(lineCount, line + 1 + maxLines)
+        while end < highest and not isBoundary(end):
+            end += 1
+        if not (isBoundary(first) and isBoundary(end)):
+            return None
+        startIndex = lineStarts[first]
+        endIndex = lineStarts[end] if end < lineCount else len(text)
+        return DocumentSnapshot(text[startIndex:endIndex], False, endIndex - startIndex, patterns=self.patterns, backend=self.backend), first
+
+    def blockRange(self, scope, tabWidth):
+        """
+        Résout l'étendue du bloc d'une portée (décorateurs, déclaration et corps).
+
+        En python, l'étendue vient de la table des fins de bloc ; dans les
+        langages à accolades, des lignes de début et de fin de la portée.
+
+        Parameters
+        ----------
+        scope : Scope
+            Une portée de l'arbre des portées du snapshot.
+        tabWidth : int
+            La largeur de tabulation du profil d'indentation.
+
+        Returns
+        -------
+        BlockRange
+            L'étendue du bloc.
+        """
+        if self.backend.indentedBlocks:
+            return self.blockExtents(tabWidth).resolve(scope.line)
+        return BlockRange(scope.line, scope.startLine, scope.endLine, self.lineStarts[scope.startLine], self.lineEndIndex(scope.endLine))
@@ -0,0 +1,133 @@
+# Lecture vocale au fil de l'eau de la sortie d'une exécution
+
+"""
+Un programme peut écrire des milliers de lignes par seconde : les lire
+toutes noierait la parole. Les lignes reçues sont regroupées et annoncées au
+plus une fois par intervalle ; si elles arrivent plus vite qu'elles ne
+peuvent être lues, seules les dernières sont conservées et le nombre de
+lignes omises est annoncé à leur place.
+
+La mémoire utilisée reste bornée quel que soit le débit du programme : au
+plus `maxLines` lignes sont en attente.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Délai minimal entre deux annonces, en secondes
+SPEECH_INTERVAL = 0.7
+
+# Nombre maximal de caractères lus d'une ligne
+MAX_SPOKEN_LENGTH = 200
+
+
+class OutputSpeaker:
+    """
+    Regroupe et limite l'annonce des lignes de sortie.
+
+    Parameters
+    ----------
+    speak : callable
+        Appelée avec le texte à annoncer, depuis le thread de l'annonceur
+        (ou celui qui appelle flush).
+    interval : float
+        Le délai minimal entre deux annonces, en secondes.
+    maxLines : int
+        Le nombre maximal de lignes lues dans une annonce.
+    """
+
+    def __init__(self, speak, interval=SPEECH_INTERVAL, maxLines=3):
+        self.speak = speak
+        self.interval = interval
+        self._condition = threading.Condition()
+        self._pending = deque(maxlen=maxLines)
+        self._skipped = 0
+        self._lastSpoken = 0.0
+        self._muted = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="nppOutputSpeaker", daemon=True)
+        self._thread.start()
+
+    @property
+    def muted(self):
+        return self._muted
+
+    def feed(self, text):
+        """
+        Ajoute une ligne à annoncer (ignorée si l'annonceur est muet) ;
+        seul le début d'une ligne très longue est lu.
+        """
+        if len(text) > MAX_SPOKEN_LENGTH:
+            text = text[:MAX_SPOKEN_LENGTH] + "…"
+        with self._condition:
+            if self._muted:
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self._skipped += 1
+            self._pending.append(text)
+            self._condition.notify()
+
+    def reset(self):
+        """
+        Oublie les lignes en attente et rend la parole à l'annonceur (nouvelle exécution).
+        """
+        with self._condition:
+            self._pending.clear()
+            self._skipped = 0
+            self._muted = False
+
+    def silence(self):
+        """
+        Rend l'annonceur muet jusqu'à la prochaine exécution ; les lignes en attente sont oubliées.
+        """
+        with self._condition:
+            self._pending.clear()
+            self._skipped = 0
+            self._muted = True
+
+    def flush(self):
+        """
+        Annonce tout de suite les lignes en attente, sans attendre l'intervalle.
+        """
+        with self._condition:
+            message = self._takeMessage()
+        if message:
+            self.speak(message)
+
+    def stop(self):
+        """
+        Arrête le thread de l'annonceur.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(1)
+
+    def _takeMessage(self):
+        # Vide les lignes en attente et retourne le texte à annoncer (appelée verrou pris)
+        if not self._pending:
+            return ""
+        message = " ".join(self._pending)
+        if self._skipped:
+            message = f"{self._skipped} lignes omises. {message}"
+        self._pending.clear()
+        self._skipped = 0
+        self._lastSpoken = time.monotonic()
+        return message
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                # Les lignes arrivées pendant l'intervalle sont regroupées
+                delay = self._lastSpoken + self.interval - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                message = self._takeMessage()
+            if message:
+                self.speak(message)
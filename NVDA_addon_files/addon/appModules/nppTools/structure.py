@@ -0,0 +1,410 @@
+# Moteur de structure d'un document python : arbre des portées (Scope)
+
+"""
+Construit l'arbre des portées (classes, fonctions, bloc __main__) d'un
+document python avec leurs lignes de début et de fin, leurs décorateurs et
+leur profondeur d'imbrication.
+
+Le document est d'abord analysé avec `ast`, exact et rapide car écrit en C.
+Lorsque le code est à moitié écrit et que `ast.parse` échoue, un analyseur
+ligne par ligne tolérant aux erreurs prend le relais : il suit l'état
+lexical de chaque ligne (chaîne triple, parenthèses ouvertes, ligne
+continuée) pour ne pas confondre une docstring avec une déclaration.
+"""
+
+import ast
+import bisect
+import re
+import threading
+
+from .document import computeLineStarts
+from .instrumentation import countLines
+from .patterns import KIND_MODULE, KIND_FUNCTION, KIND_CLASS, KIND_MAIN, KIND_DECORATOR, PYTHON_PATTERNS
+from .scopeIndex import ScopeIndex
+
+# Caractères qui peuvent modifier l'état lexical d'une ligne
+# Analyses ast.parse sérialisées : en python 3.11, deux conversions simultanées de
+# l'AST en objets python (thread de travail et fenêtre du thread principal)
+# faussent le compteur de récursion et lèvent SystemError. L'analyse garde le GIL :
+# la sérialiser ne retarde rien.
+_PARSE_LOCK = threading.Lock()
+
+_LEX_SPECIAL = re.compile(r"[\"'#()\[\]{}\\]")
+_LEX_TOKEN = re.compile(r"\"\"\"|'''|[\"'#()\[\]{}]")
+_STRING_END = {
+    '"""': re.compile(r'\\.|"""'),
+    "'''": re.compile(r"\\.|'''"),
+    '"': re.compile(r'\\.|"'),
+    "'": re.compile(r"\\.|'"),
+}
+
+
+def lexLine(lineText, state):
+    """
+    Calcule l'état lexical à la fin d'une ligne.
+
+    Parameters
+    ----------
+    lineText : str
+        Le texte de la ligne, sans le saut de ligne final.
+    state : tuple or None
+        L'état au début de la ligne : None pour le début d'une ligne logique,
+        sinon un tuple (guillemet ouvrant, profondeur de parenthèses, ligne
+        continuée par un antislash).
+
+    Returns
+    -------
+    tuple or None
+        L'état au début de la ligne suivante.
+    """
+    if state is None:
+        quote, depth = None, 0
+    else:
+        quote, depth, _ = state
+    if _LEX_SPECIAL.search(lineText) is None:
+        # Cas le plus fréquent : rien ne change, sauf la continuation
+        return None if quote is None and depth == 0 else (quote, depth, False)
+
+    position = 0
+    inComment = False
+    while True:
+        if quote is not None:
+            for match in _STRING_END[quote].finditer(lineText, position):
+                if match.group() == quote:
+                    position = match.end()
+                    quote = None
+                    break
+            else:
+                if len(quote) == 3 or lineText.rstrip("\r").endswith("\\"):
+                    # La chaîne se poursuit sur la ligne suivante
+                    return (quote, depth, False)
+                # Chaîne simple non terminée : erreur de syntaxe, on l'abandonne
+                quote = None
+                break
+            continue
+        match = _LEX_TOKEN.search(lineText, position)
+        if match is None:
+            break
+        token = match.group()
+        position = match.end()
+        if token == "#":
+            inComment = True
+            break
+        if token in "([{":
+            depth += 1
+        elif token in ")]}":
+            depth = max(0, depth - 1)
+        else:
+            quote = token
+
+    continued = not inComment and lineText.rstrip("\r").endswith("\\")
+    if depth == 0 and not continued:
+        return None
+    return (None, depth, continued)
+
+
+class Scope:
+    """
+    Une portée du document : classe, fonction (ou méthode) ou bloc __main__.
+
+    Les numéros de ligne commencent à 0. `startLine` inclut les décorateurs,
+    `line` est la ligne de la déclaration elle-même et `endLine` la dernière
+    ligne du corps.
+    """
+
+    __slots__ = ("kind", "name", "startLine", "line", "endLine", "column", "decorators", "depth", "parent", "children")
+
+    def __init__(self, kind, name, startLine, line, endLine, column, decorators=(), parent=None):
+        self.kind = kind
+        self.name = name
+        self.startLine = startLine
+        self.line = line
+        self.endLine = endLine
+        self.column = column
+        self.decorators = list(decorators)
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else -1
+        self.children = []
+
+    def __repr__(self):
+        return f"Scope({self.kind!r}, {self.name!r}, lines {self.startLine}-{self.endLine}, depth {self.depth})"
+
+    def contains(self, line):
+        """
+        Indique si la ligne donnée appartient à la portée.
+        """
+        return self.startLine <= line <= self.endLine
+
+    def iterScopes(self):
+        """
+        Parcourt les portées descendantes dans l'ordre du document.
+        """
+        stack = list(reversed(self.children))
+        while stack:
+            scope = stack.pop()
+            yield scope
+            stack.extend(reversed(scope.children))
+
+
+class ScopeTree:
+    """
+    L'arbre des portées d'un document.
+
+    Parameters
+    ----------
+    text : str
+        Le texte analysé.
+    root : Scope
+        La portée racine (le module).
+    lineStarts : array of int
+        L'indice du début de chaque ligne dans `text`.
+    parsed : bool
+        True si l'arbre vient de `ast`, False s'il vient de l'analyseur
+        tolérant (code incomplet).
+    """
+
+    def __init__(self, text, root, lineStarts, parsed):
+        self.text = text
+        self.root = root
+        self.lineStarts = lineStarts
+        self.parsed = parsed
+        self._index = None
+
+    def __iter__(self):
+        return self.root.iterScopes()
+
+    @property
+    def lineCount(self):
+        return len(self.lineStarts)
+
+    def lineText(self, line):
+        """
+        Retourne le texte d'une ligne, sans le saut de ligne final.
+        """
+        start = self.lineStarts[line]
+        end = self.text.find("\n", start)
+        return self.text[start:] if end == -1 else self.text[start:end]
+
+    def lineEndIndex(self, line):
+        """
+        Indice de fin d'une ligne, saut de ligne compris.
+        """
+        if line + 1 < len(self.lineStarts):
+            return self.lineStarts[line + 1]
+        return len(self.text)
+
+    @property
+    def index(self):
+        """
+        L'index des intervalles de lignes des portées (ScopeIndex), construit à la première demande.
+        """
+        if self._index is None:
+            self._index = ScopeIndex(self.root.iterScopes())
+        return self._index
+
+    def scopeAt(self, line, kinds=None):
+        """
+        Retourne la portée la plus interne contenant la ligne donnée, en O(log n).
+
+        Parameters
+        ----------
+        line : int
+            Le numéro de ligne.
+        kinds : iterable of str, optional
+            Si fourni, seules les portées de ces types sont retenues.
+
+        Returns
+        -------
+        Scope or None
+            La portée trouvée, ou None.
+        """
+        return self.index.innermostAt(line, kinds)
+
+    def declarationIndex(self, scope):
+        """
+        Indice du premier caractère (après l'indentation) de la déclaration d'une portée.
+        """
+        lineText = self.lineText(scope.line)
+        return self.lineStarts[scope.line] + len(lineText) - len(lineText.lstrip())
+
+    def siblingAt(self, line, forward):
+        """
+        Retourne la portée sœur suivante ou précédente de la portée contenant une ligne.
+
+        Au niveau du module (aucune portée ne contient la ligne), les sœurs
+        sont les portées de premier niveau : la suivante est la première qui
+        commence après la ligne, la précédente la dernière qui commence avant.
+
+        Parameters
+        ----------
+        line : int
+            Le numéro de ligne.
+        forward : bool
+            True pour la portée sœur suivante, False pour la précédente.
+
+        Returns
+        -------
+        Scope or None
+            La portée sœur, ou None s'il n'y en a pas dans cette direction.
+        """
+        scope = self.scopeAt(line)
+        if scope is None:
+            siblings = self.root.children
+            position = bisect.bisect_right(siblings, line, key=lambda sibling: sibling.startLine)
+            position = position if forward else position - 1
+        else:
+            siblings, position = self.index.siblings(scope)
+            position += 1 if forward else -1
+        return siblings[position] if 0 <= position < len(siblings) else None
+
+    def parentAt(self, line):
+        """
+        Retourne la portée englobante d'une ligne.
+
+        Dans le corps d'une portée, c'est cette portée elle-même (retour à sa
+        déclaration) ; sur sa déclaration ou ses décorateurs, c'est sa portée
+        parente.
+
+        Returns
+        -------
+        Scope or None
+            La portée englobante, ou None au niveau du module.
+        """
+        scope = self.scopeAt(line)
+        if scope is None or line > scope.line:
+            return scope
+        parent = scope.parent
+        return parent if parent.kind != KIND_MODULE else None
+
+    def childAt(self, line, last=False):
+        """
+        Retourne la première (ou la dernière) portée enfant de la portée
+        contenant une ligne ; au niveau du module, la première (ou la
+        dernière) portée de premier niveau.
+
+        Returns
+        -------
+        Scope or None
+            La portée enfant, ou None si la portée n'en a pas.
+        """
+        children = (self.scopeAt(line) or self.root).children
+        if not children:
+            return None
+        return children[-1] if last else children[0]
+
+
+def _isMainGuard(node):
+    # if __name__ == "__main__": au niveau du module
+    test = node.test
+    return (
+        isinstance(test, ast.Compare)
+        and isinstance(test.left, ast.Name)
+        and test.left.id == "__name__"
+        and len(test.comparators) == 1
+        and isinstance(test.comparators[0], ast.Constant)
+        and test.comparators[0].value == "__main__"
+    )
+
+
+_BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+def _scopesFromAst(node, parent, lines):
+    # Parcourt uniquement les listes d'instructions, pas les expressions
+    for field in _BLOCK_FIELDS:
+        statements = getattr(node, field, None)
+        if not isinstance(statements, list):
+            continue
+        for statement in statements:
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                kind = KIND_CLASS if isinstance(statement, ast.ClassDef) else KIND_FUNCTION
+                line = statement.lineno - 1
+                decoratorLines = [decorator.lineno - 1 for decorator in statement.decorator_list]
+                scope = Scope(
+                    kind,
+                    statement.name,
+                    min(decoratorLines) if decoratorLines else line,
+                    line,
+                    statement.end_lineno - 1,
+                    statement.col_offset,
+                    [lines[decoratorLine].strip() for decoratorLine in decoratorLines],
+                    parent,
+                )
+                parent.children.append(scope)
+                _scopesFromAst(statement, scope, lines)
+            elif isinstance(statement, ast.If) and parent.kind == KIND_MODULE and _isMainGuard(statement):
+                line = statement.lineno - 1
+                scope = Scope(KIND_MAIN, "__main__", line, line, statement.end_lineno - 1, statement.col_offset, (), parent)
+                parent.children.append(scope)
+                _scopesFromAst(statement, scope, lines)
+            elif isinstance(statement, ast.AST):
+                _scopesFromAst(statement, parent, lines)
+
+
+def _scopesFromLines(lines, root):
+    """
+    Analyseur tolérant : reconstruit les portées d'après l'indentation des
+    lignes logiques, en ignorant chaînes, commentaires et lignes continuées.
+    """
+    stack = [root]
+    pendingDecorators = []
+    state = None
+    lastCodeLine = -1
+    for number, lineText in enumerate(lines):
+        startState = state
+        state = lexLine(lineText, startState)
+        if startState is not None:
+            # Suite d'une ligne logique commencée plus haut
+            lastCodeLine = number
+            continue
+        stripped = lineText.strip()
+        if not stripped or stripped[0] == "#":
+            continue
+        column = len(lineText) - len(lineText.lstrip())
+        # Une ligne moins ou autant indentée ferme les portées ouvertes
+        while len(stack) > 1 and column <= stack[-1].column:
+            stack.pop().endLine = lastCodeLine
+        lastCodeLine = number
+        header = PYTHON_PATTERNS.match(lineText)
+        if header is not None and header[0] == KIND_DECORATOR:
+            pendingDecorators.append((number, stripped))
+            continue
+        if header is not None:
+            kind, name, column = header
+            parent = stack[-1]
+            startLine = pendingDecorators[0][0] if pendingDecorators else number
+            scope = Scope(kind, name, startLine, number, number, column, [text for _, text in pendingDecorators], parent)
+            parent.children.append(scope)
+            stack.append(scope)
+        pendingDecorators = []
+    while len(stack) > 1:
+        stack.pop().endLine = lastCodeLine
+
+
+def buildScopeTree(text):
+    """
+    Construit l'arbre des portées d'un document python.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+
+    Returns
+    -------
+    ScopeTree
+        L'arbre des portées du document.
+    """
+    lines = text.split("\n")
+    countLines(len(lines))
+    root = Scope(KIND_MODULE, "", 0, 0, len(lines) - 1, -1)
+    try:
+        with _PARSE_LOCK:
+            tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError):
+        _scopesFromLines(lines, root)
+        parsed = False
+    else:
+        _scopesFromAst(tree, root, lines)
+        parsed = True
+    return ScopeTree(text, root, computeLineStarts(lines), parsed)
@@ -0,0 +1,94 @@
+# Boîte de dialogue de choix d'un symbole, avec filtre de recherche incrémentale
+
+"""
+Liste des symboles (classes, fonctions et méthodes du document, ou de tout
+un projet) avec un champ de filtre : chaque caractère tapé restreint la
+liste (voir nppTools.symbols).
+
+Flèche bas dans le champ de filtre passe à la liste ; Entrée (dans le champ
+ou dans la liste) choisit le symbole sélectionné et ferme la boîte.
+"""
+
+import wx
+
+from .symbols import SymbolFilter
+
+
+class SymbolDialog(wx.Dialog):
+    """
+    Boîte de dialogue de choix d'un symbole.
+
+    Parameters
+    ----------
+    parent : wx.Window
+        La fenêtre parente (gui.mainFrame).
+    title : str
+        Le titre de la boîte.
+    symbols : list
+        Les symboles proposés (tout objet ayant un attribut `name`), dans
+        l'ordre d'affichage sans filtre.
+    describe : callable
+        Retourne le libellé d'un symbole dans la liste.
+    selection : int
+        L'indice du symbole sélectionné à l'ouverture.
+    """
+
+    def __init__(self, parent, title, symbols, describe, selection=0):
+        super().__init__(parent, title=title)
+        self._filter = SymbolFilter(symbols)
+        self._describe = describe
+        self._shown = []
+        # Le symbole choisi, lu après la fermeture de la boîte
+        self.symbol = None
+
+        mainSizer = wx.BoxSizer(wx.VERTICAL)
+        filterLabel = wx.StaticText(self, label=_("&Filtrer :"))
+        self.filterEdit = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER)
+        listLabel = wx.StaticText(self, label=_("&Symboles :"))
+        self.symbolList = wx.ListBox(self, size=(500, 300))
+        mainSizer.Add(filterLabel, flag=wx.LEFT | wx.TOP, border=8)
+        mainSizer.Add(self.filterEdit, flag=wx.EXPAND | wx.ALL, border=8)
+        mainSizer.Add(listLabel, flag=wx.LEFT, border=8)
+        mainSizer.Add(self.symbolList, proportion=1, flag=wx.EXPAND | wx.ALL, border=8)
+        mainSizer.Add(self.CreateButtonSizer(wx.OK | wx.CANCEL), flag=wx.EXPAND | wx.ALL, border=8)
+        self.SetSizerAndFit(mainSizer)
+
+        self.filterEdit.Bind(wx.EVT_TEXT, self.onFilterChanged)
+        self.filterEdit.Bind(wx.EVT_TEXT_ENTER, self.onChoose)
+        self.filterEdit.Bind(wx.EVT_KEY_DOWN, self.onFilterKeyDown)
+        self.symbolList.Bind(wx.EVT_LISTBOX_DCLICK, self.onChoose)
+        self.Bind(wx.EVT_BUTTON, self.onChoose, id=wx.ID_OK)
+
+        self._showSymbols(symbols)
+        if symbols:
+            self.symbolList.SetSelection(selection)
+        self.filterEdit.SetFocus()
+
+    def _showSymbols(self, symbols):
+        self._shown = symbols
+        labels = [self._describe(symbol) for symbol in symbols]
+        # Un seul rafraîchissement de la liste, même avec des milliers de symboles
+        self.symbolList.Freeze()
+        try:
+            self.symbolList.Set(labels)
+        finally:
+            self.symbolList.Thaw()
+        if symbols:
+            self.symbolList.SetSelection(0)
+
+    def onFilterChanged(self, event):
+        self._showSymbols(self._filter.filter(self.filterEdit.GetValue()))
+
+    def onFilterKeyDown(self, event):
+        if event.GetKeyCode() == wx.WXK_DOWN and self._shown:
+            self.symbolList.SetFocus()
+        else:
+            event.Skip()
+
+    def onChoose(self, event):
+        selection = self.symbolList.GetSelection()
+        if selection == wx.NOT_FOUND or not self._shown:
+            wx.Bell()
+            return
+        self.symbol = self._shown[selection]
+        self.EndModal(wx.ID_OK)
@@ -0,0 +1,141 @@
+# Liste des symboles d'un document et filtre de recherche incrémentale
+
+"""
+Transforme les entrées de l'outline en symboles hiérarchisés (une méthode
+connaît sa classe) et les filtre au fil de la frappe.
+
+Le filtre retient d'abord les symboles dont le nom commence par le texte
+tapé, puis ceux qui le contiennent comme sous-séquence ("gtn" trouve
+"getTextNode"), sans tenir compte de la casse et dans l'ordre du document.
+Quand le texte tapé prolonge le précédent, seuls les symboles retenus la
+fois précédente sont examinés : le filtre reste rapide avec des milliers
+de symboles.
+"""
+
+import bisect
+import re
+from collections import namedtuple
+
+from .patterns import KIND_CLASS, KIND_FUNCTION, KIND_MAIN
+
+Symbol = namedtuple("Symbol", ("name", "kind", "line", "offset", "depth", "parent"))
+Symbol.__doc__ = """
+Un symbole du document.
+
+name : nom de la fonction ou de la classe, "__main__", ou texte du repère
+kind : type de l'entrée de l'outline (KIND_FUNCTION, KIND_CLASS, KIND_MAIN ou nom d'un repère)
+line : numéro de ligne (à partir de 0)
+offset : indice du premier caractère non blanc de la déclaration dans le texte
+depth : profondeur d'imbrication (0 au niveau du module)
+parent : le symbole englobant, ou None
+"""
+
+
+def buildSymbols(entries, patterns):
+    """
+    Construit la liste hiérarchisée des symboles à partir de l'outline.
+
+    Parameters
+    ----------
+    entries : list of OutlineEntry
+        Les entrées de l'outline, triées par ligne.
+    patterns : PatternRegistry
+        Les motifs de l'outline, pour retrouver le nom de chaque déclaration.
+
+    Returns
+    -------
+    list of Symbol
+        Les symboles dans l'ordre du document.
+    """
+    symbols = []
+    # Symboles englobants, du plus externe au plus interne
+    stack = []
+    for entry in entries:
+        match = patterns.match(entry.text)
+        name = match[1] if match is not None and match[0] == entry.kind else entry.text
+        while stack and stack[-1][0] >= entry.column:
+            stack.pop()
+        parent = stack[-1][1] if stack else None
+        symbol = Symbol(name, entry.kind, entry.line, entry.offset, len(stack), parent)
+        symbols.append(symbol)
+        if entry.kind in (KIND_CLASS, KIND_FUNCTION, KIND_MAIN):
+            stack.append((entry.column, symbol))
+    return symbols
+
+
+class SymbolFilter:
+    """
+    Filtre incrémental d'une liste de symboles.
+
+    Parameters
+    ----------
+    symbols : list of Symbol
+        Les symboles, dans l'ordre du document.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        self._keys = [symbol.name.lower() for symbol in symbols]
+        self._lastQuery = ""
+        self._lastMatches = range(len(symbols))
+
+    def filter(self, query):
+        """
+        Retourne les symboles qui correspondent au texte tapé.
+
+        Parameters
+        ----------
+        query : str
+            Le texte tapé.
+
+        Returns
+        -------
+        list of Symbol
+            Les symboles dont le nom commence par `query`, puis ceux qui le
+            contiennent comme sous-séquence ; tous les symboles si `query`
+            est vide.
+        """
+        query = query.strip().lower()
+        if not query:
+            self._lastQuery, self._lastMatches = "", range(len(self.symbols))
+            return list(self.symbols)
+        # Un texte plus long ne peut retenir que des symboles déjà retenus
+        candidates = self._lastMatches if query.startswith(self._lastQuery) else range(len(self.symbols))
+        subsequence = re.compile(".*?".join(re.escape(char) for char in query))
+        keys = self._keys
+        prefixMatches = []
+        otherMatches = []
+        for index in candidates:
+            key = keys[index]
+            if key.startswith(query):
+                prefixMatches.append(index)
+            elif subsequence.search(key):
+                otherMatches.append(index)
+        self._lastQuery = query
+        self._lastMatches = sorted(prefixMatches + otherMatches)
+        return [self.symbols[index] for index in prefixMatches + otherMatches]
+
+
+def describeSymbol(symbol):
+    """
+    Retourne le libellé lu d'un symbole, par exemple "run, méthode de Worker, ligne 120".
+    """
+    if symbol.kind == KIND_CLASS:
+        kind = "classe"
+    elif symbol.kind == KIND_FUNCTION:
+        kind = "méthode" if symbol.parent is not None and symbol.parent.kind == KIND_CLASS else "fonction"
+    elif symbol.kind == KIND_MAIN:
+        kind = "bloc principal"
+    else:
+        kind = f"repère {symbol.kind}"
+    if symbol.parent is not None:
+        kind = f"{kind} de {symbol.parent.name}"
+    return f"{symbol.name}, {kind}, ligne {symbol.line + 1}"
+
+
+def symbolIndexAtLine(symbols, line):
+    """
+    Retourne l'indice du dernier symbole déclaré au plus tard à une ligne (0 s'il n'y en a pas).
+    """
+    index = bisect.bisect_right([symbol.line for symbol in symbols], line) - 1
+    return max(index, 0)
@@ -0,0 +1,54 @@
+# Vérification de la syntaxe python d'un document
+
+"""
+Compile le texte du document (compile(), sans l'exécuter) et retient la
+première erreur de syntaxe.
+
+Le résultat est mis en cache selon le texte : une nouvelle demande sur un
+texte déjà vérifié (même snapshot, ou retour à une version précédente par
+une annulation) ne recompile rien.
+"""
+
+import functools
+from collections import namedtuple
+
+# Nombre de textes dont le résultat est conservé
+CACHE_SIZE = 8
+
+SyntaxIssue = namedtuple("SyntaxIssue", ("line", "column", "message"))
+SyntaxIssue.__doc__ = """
+Une erreur de syntaxe.
+
+line : numéro de ligne (à partir de 0)
+column : indice du caractère dans la ligne (à partir de 0)
+message : le message de python, par exemple "invalid syntax"
+"""
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def checkSyntax(text):
+    """
+    Compile un texte python et retourne sa première erreur de syntaxe.
+
+    Parameters
+    ----------
+    text : str
+        Le texte complet du document.
+
+    Returns
+    -------
+    SyntaxIssue or None
+        La première erreur, ou None si le texte compile.
+    """
+    try:
+        # Les avertissements de compilation (séquences d'échappement...) passent par les
+        # filtres globaux : les modifier depuis le thread de travail (catch_warnings) n'est pas sûr
+        compile(text, "<document>", "exec", dont_inherit=True)
+    except SyntaxError as e:
+        line = max((e.lineno or 1) - 1, 0)
+        column = max((e.offset or 1) - 1, 0)
+        return SyntaxIssue(line, column, e.msg)
+    except ValueError as e:
+        # Caractère nul dans le texte
+        return SyntaxIssue(0, 0, str(e))
+    return None
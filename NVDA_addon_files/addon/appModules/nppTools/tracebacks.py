@@ -0,0 +1,72 @@
+# Lecture des traces d'appels python dans la sortie d'erreur
+
+"""
+Retrouve les appels (fichier, ligne, fonction) de la trace d'appels qui a
+terminé une exécution, pour ramener le curseur sur la ligne en cause.
+
+Le code exécuté est un fichier temporaire qui ne contient que la sélection
+ou les cellules envoyées : la ligne n de ce fichier correspond à la ligne
+firstLine + n - 1 du document (voir documentLine).
+"""
+
+import re
+from collections import namedtuple
+
+Frame = namedtuple("Frame", ("path", "line", "function"))
+Frame.__doc__ = """
+Un appel de la trace d'appels.
+
+path : chemin du fichier
+line : numéro de ligne dans ce fichier (à partir de 1)
+function : nom de la fonction ("<module>" au niveau du module), ou chaîne
+vide pour une erreur de syntaxe
+"""
+
+_FRAME_PATTERN = re.compile(r'\s*File "(?P<path>[^"]+)", line (?P<line>\d+)(?:, in (?P<function>.+))?')
+
+
+def parseTraceback(lines):
+    """
+    Retourne les appels de la dernière trace d'appels de la sortie d'erreur.
+
+    Parameters
+    ----------
+    lines : list of str
+        Les lignes de la sortie d'erreur.
+
+    Returns
+    -------
+    list of Frame
+        Les appels, du plus externe au plus interne (ordre d'affichage de
+        python). Pour une erreur de syntaxe, l'emplacement de l'erreur. Une
+        liste vide si la sortie ne contient aucune trace.
+    """
+    frames = []
+    for text in lines:
+        if text.startswith("Traceback "):
+            # Exceptions enchaînées : seule la dernière trace compte
+            frames = []
+            continue
+        match = _FRAME_PATTERN.match(text)
+        if match is not None:
+            frames.append(Frame(match.group("path"), int(match.group("line")), match.group("function") or ""))
+    return frames
+
+
+def documentLine(frame, firstLine):
+    """
+    Convertit la ligne d'un appel du code exécuté en ligne du document.
+
+    Parameters
+    ----------
+    frame : Frame
+        Un appel situé dans le fichier temporaire du code exécuté.
+    firstLine : int
+        La ligne du document (à partir de 0) où commence le code exécuté.
+
+    Returns
+    -------
+    int
+        Le numéro de ligne dans le document, à partir de 0.
+    """
+    return firstLine + frame.line - 1
@@ -0,0 +1,176 @@
+# Interpréteur préchargé ou session : exécute les fichiers reçus sur son entrée standard
+
+"""
+Lancé par nppTools.execution avec l'interpréteur python de l'utilisateur
+(et non celui de NVDA), dans l'un des deux modes suivants.
+
+Interpréteur préchargé (InterpreterPool) :
+
+    python worker.py <nombre d'exécutions> [module à précharger ...]
+
+Les modules sont importés dès le lancement, avant la première demande.
+Chaque ligne reçue sur l'entrée standard est le chemin d'un fichier à
+exécuter comme script principal. Le processus se termine après le nombre
+d'exécutions demandé, pour que l'état laissé par le code exécuté ne
+s'accumule pas.
+
+Session (un interpréteur par document) :
+
+    python worker.py --session
+
+Les commandes "run <chemin>" exécutent chaque fichier dans le même espace
+de noms, comme une console interactive : la valeur d'une expression finale
+est affichée et signalée par VALUE_MARKER. La commande "interrupt"
+interrompt le code en cours (KeyboardInterrupt) sans perdre l'espace de
+noms.
+
+Dans les deux modes, la fin de chaque exécution est signalée par END_MARKER
+suivi du code de sortie, sur la sortie standard et sur la sortie d'erreur.
+
+Ce fichier ne dépend que de la bibliothèque standard.
+"""
+
+import _thread
+import ast
+import builtins
+import os
+import queue
+import runpy
+import signal
+import sys
+import threading
+import traceback
+
+# Identiques à nppTools.execution.END_MARKER et VALUE_MARKER
+END_MARKER = "\x00nppEnd"
+VALUE_MARKER = "\x00nppValue"
+
+
+def _printException(path):
+    # La trace d'appels commence au fichier exécuté, sans les appels de runpy ni de ce module
+    errorType, error, callStack = sys.exc_info()
+    while callStack is not None and callStack.tb_frame.f_code.co_filename != path:
+        callStack = callStack.tb_next
+    traceback.print_exception(errorType, error, callStack)
+
+
+def _exitCode(error):
+    # Code de sortie correspondant à un SystemExit
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=sys.stderr)
+    return 1
+
+
+def _endRun(returnCode):
+    # Flux d'origine : le code exécuté a pu remplacer sys.stdout ou sys.stderr
+    for stream in (sys.__stdout__, sys.__stderr__):
+        stream.write(f"{END_MARKER} {returnCode}\n")
+        stream.flush()
+
+
+def _runPath(path):
+    # Exécute un fichier comme script principal et retourne son code de sortie
+    sys.argv = [path]
+    sys.path[0] = os.path.dirname(path)
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        return _exitCode(e)
+    except BaseException:
+        _printException(path)
+        return 1
+    return 0
+
+
+def _runInNamespace(path, namespace):
+    # Exécute un fichier dans l'espace de noms de la session ; la valeur d'une
+    # expression finale est affichée, comme dans une console interactive
+    try:
+        with open(path, encoding="utf-8") as sourceFile:
+            tree = ast.parse(sourceFile.read(), path)
+        last = None
+        if tree.body and isinstance(tree.body[-1], ast.Expr):
+            last = ast.Expression(tree.body.pop().value)
+        exec(compile(tree, path, "exec"), namespace)
+        if last is not None:
+            value = eval(compile(last, path, "eval"), namespace)
+            if value is not None:
+                namespace["_"] = value
+                text = repr(value)
+                print(text)
+                sys.__stdout__.write(f"{VALUE_MARKER} {text.splitlines()[0] if text else ''}\n")
+    except SystemExit as e:
+        return _exitCode(e)
+    except BaseException:
+        _printException(path)
+        return 1
+    return 0
+
+
+def _pool(arguments):
+    maxRuns = int(arguments[0])
+    for name in arguments[1:]:
+        try:
+            __import__(name)
+        except Exception:
+            # Module absent : il sera importé (ou l'erreur signalée) par le code exécuté
+            pass
+    for _ in range(maxRuns):
+        path = sys.stdin.readline().rstrip("\r\n")
+        if not path:
+            return
+        _endRun(_runPath(path))
+
+
+def _interruptRun(signum, frame):
+    # Gestionnaire de l'interruption envoyée par "interrupt" : KeyboardInterrupt
+    # n'est levée que pendant _runInNamespace. Arrivée entre deux exécutions ou
+    # juste après la fin du code, elle est ignorée ; levée hors de tout
+    # gestionnaire, elle arrêterait la session sans END_MARKER
+    while frame is not None:
+        if frame.f_code is _runInNamespace.__code__:
+            raise KeyboardInterrupt
+        frame = frame.f_back
+
+
+def _session():
+    namespace = {"__name__": "__main__", "__builtins__": builtins}
+    requests = queue.Queue()
+
+    def readCommands():
+        # Les commandes sont lues sur un thread à part : "interrupt" doit
+        # pouvoir arriver pendant une exécution
+        for line in sys.stdin:
+            command, _, argument = line.rstrip("\r\n").partition(" ")
+            if command == "run":
+                requests.put(argument)
+            elif command == "interrupt":
+                _thread.interrupt_main()
+        requests.put(None)
+
+    signal.signal(signal.SIGINT, _interruptRun)
+    threading.Thread(target=readCommands, daemon=True).start()
+    while True:
+        path = requests.get()
+        if path is None:
+            return
+        sys.argv = [path]
+        sys.path[0] = os.path.dirname(path)
+        try:
+            returnCode = _runInNamespace(path, namespace)
+        except KeyboardInterrupt:
+            # Interruption arrivée pendant l'affichage de l'erreur du code exécuté
+            returnCode = 1
+        _endRun(returnCode)
+
+
+if __name__ == "__main__":
+    # Le répertoire de ce script (nppTools) ne doit pas masquer les modules du code exécuté
+    sys.path[0] = os.getcwd()
+    if sys.argv[1:2] == ["--session"]:
+        _session()
+    else:
+        _pool(sys.argv[1:])
@@ -0,0 +1,68 @@
+# Benchmark des moteurs de structure des langages à accolades : linéarité en taille de fichier
+#
+# Usage : python benchmarks/benchBackends.py [nombre de lignes maximal]
+
+import argparse
+import time
+
+from generatedSources import generateBraceSource
+from nppTools.backends import BACKENDS, outlineFromScopes
+from nppTools.patterns import PYTHON_PATTERNS
+
+# Extension d'un fichier de chaque langage généré
+_EXTENSIONS = {"c": ".c", "java": ".java", "javascript": ".js"}
+
+
+def _bestOf(function, repeat):
+    # Meilleur temps (en secondes) sur `repeat` exécutions
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchBackends(lineCounts=(12500, 25000, 50000), repeat=3):
+    """
+    Mesure la construction de l'arbre des portées et de l'outline de
+    fichiers C, Java et JavaScript générés, de tailles croissantes.
+
+    Parameters
+    ----------
+    lineCounts : sequence of int
+        Les nombres de lignes des fichiers générés.
+    repeat : int
+        Le nombre de répétitions de chaque mesure.
+
+    Returns
+    -------
+    dict
+        Pour chaque langage, le temps en millisecondes à chaque taille.
+    """
+    backends = {extension: backend for backend in BACKENDS for extension in backend.extensions}
+    results = {}
+    for language, extension in _EXTENSIONS.items():
+        backend = backends[extension]
+        timings = results[language] = []
+        for lineCount in lineCounts:
+            text, declarations = generateBraceSource(lineCount, language)
+            tree = backend.buildScopeTree(text)
+            # Toutes les déclarations générées sont trouvées, rien de plus
+            assert len(list(tree)) == declarations, (language, len(list(tree)), declarations)
+            timings.append(_bestOf(lambda: outlineFromScopes(backend.buildScopeTree(text), PYTHON_PATTERNS), repeat) * 1000)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure la linéarité des moteurs des langages à accolades.")
+    parser.add_argument("lines", type=int, nargs="?", default=50000, help="nombre de lignes du plus grand fichier généré")
+    maxLines = parser.parse_args().lines
+    lineCounts = (maxLines // 4, maxLines // 2, maxLines)
+    results = benchBackends(lineCounts)
+    print("Arbre des portées et outline, en ms, fichiers de " + " / ".join(map(str, lineCounts)) + " lignes")
+    for language, timings in results.items():
+        # Un rapport proche de 4 entre la plus grande et la plus petite taille : temps linéaire
+        print(f"  {language:<12}" + "".join(f"{value:10.1f}" for value in timings) + f"   x{timings[-1] / timings[0]:.2f}")
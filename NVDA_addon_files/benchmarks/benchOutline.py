@@ -0,0 +1,73 @@
+# Benchmark de l'outline : construction complète et mise à jour incrémentale
+#
+# Usage : python benchmarks/benchOutline.py [nombre de lignes]
+
+import argparse
+import time
+
+from generatedSources import generatePythonSource
+from nppTools.outline import buildOutline
+
+
+def _bestOf(function, repeat):
+    # Meilleur temps (en secondes) sur `repeat` exécutions
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchOutline(lineCount=20000, repeat=50):
+    """
+    Mesure le coût de construction de l'outline et de sa mise à jour après
+    une modification d'une ligne.
+
+    Parameters
+    ----------
+    lineCount : int
+        Le nombre de lignes du fichier généré.
+    repeat : int
+        Le nombre de répétitions de chaque mesure.
+
+    Returns
+    -------
+    dict
+        Les temps mesurés, en millisecondes.
+    """
+    text = generatePythonSource(lineCount)
+    lines = text.split("\n")
+    middle = len(lines) // 2
+
+    # Trois variantes d'une modification d'une ligne au milieu du fichier
+    edited = list(lines)
+    edited[middle] = edited[middle] + " # modifié"
+    typedText = "\n".join(edited)
+    inserted = list(lines)
+    inserted.insert(middle, "    def inserted(self):\r")
+    insertedText = "\n".join(inserted)
+    deleted = list(lines)
+    del deleted[middle]
+    deletedText = "\n".join(deleted)
+
+    results = {"build": _bestOf(lambda: buildOutline(text), 5) * 1000}
+    for name, newText in (("typing", typedText), ("insertLine", insertedText), ("deleteLine", deletedText)):
+        outlines = [buildOutline(text) for _ in range(repeat)]
+        outlinesIter = iter(outlines)
+        results[name] = _bestOf(lambda: next(outlinesIter).update(newText), repeat) * 1000
+        # L'outline incrémental doit être identique à une reconstruction complète
+        assert outlines[0].entries == buildOutline(newText).entries, name
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure la construction complète et la mise à jour incrémentale de l'outline.")
+    parser.add_argument("lines", type=int, nargs="?", default=20000, help="nombre de lignes du fichier généré")
+    lineCount = parser.parse_args().lines
+    results = benchOutline(lineCount)
+    print(f"Outline, fichier de {lineCount} lignes")
+    for name, milliseconds in results.items():
+        print(f"  {name:<12} {milliseconds:8.3f} ms")
@@ -0,0 +1,114 @@
+# Benchmark du cache sur disque des structures : analyse complète, enregistrement, relecture, taux de succès
+#
+# Usage : python benchmarks/benchOutlineCache.py [nombre de lignes]
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+from generatedSources import generatePythonSource
+from nppTools.outlineCache import MIN_LINES, OutlineCache
+from nppTools.snapshot import DocumentSnapshot
+
+TAB_WIDTH = 4
+
+
+def _analyze(text, cache=None):
+    # Analyse d'un document à l'ouverture : outline, profil d'indentation, table des blocs
+    snapshot = DocumentSnapshot(text, False, len(text), cache=cache)
+    snapshot.outline
+    snapshot.blockExtents(TAB_WIDTH)
+    return snapshot
+
+
+def _bestOf(function, repeat):
+    # Meilleur temps (en secondes) sur `repeat` exécutions
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchOutlineCache(lineCount=20000, repeat=5, documents=8, openings=40):
+    """
+    Mesure le coût d'ouverture d'un document avec et sans le cache, puis le
+    taux de succès du cache sur une suite d'ouvertures de documents dont
+    certains ont été modifiés entre-temps.
+
+    Parameters
+    ----------
+    lineCount : int
+        Le nombre de lignes de chaque fichier généré.
+    repeat : int
+        Le nombre de répétitions de chaque mesure.
+    documents : int
+        Le nombre de documents distincts de la suite d'ouvertures.
+    openings : int
+        Le nombre d'ouvertures de la suite.
+
+    Returns
+    -------
+    dict
+        Les temps mesurés en millisecondes, la taille d'un fichier du cache
+        en kilo-octets et le taux de succès en pourcentage.
+    """
+    directory = tempfile.mkdtemp(prefix="nppOutlineCache")
+    try:
+        text = generatePythonSource(lineCount)
+        cache = OutlineCache(directory, 256 * 1024 * 1024)
+        results = {"parse": _bestOf(lambda: _analyze(text), repeat) * 1000}
+
+        # Enregistrement seul : chaque snapshot déjà analysé est enregistré dans un cache vide
+        snapshots = [
+            _analyze(text, OutlineCache(tempfile.mkdtemp(dir=directory), 256 * 1024 * 1024))
+            for _ in range(repeat)
+        ]
+        snapshotsIter = iter(snapshots)
+        results["store"] = _bestOf(lambda: next(snapshotsIter).saveToCache(TAB_WIDTH), repeat) * 1000
+        _analyze(text, cache).saveToCache(TAB_WIDTH)
+        results["load"] = _bestOf(lambda: _analyze(text, cache), repeat) * 1000
+
+        # Les structures relues doivent être identiques à une analyse complète
+        loaded, parsed = _analyze(text, cache), _analyze(text)
+        assert loaded.outline.entries == parsed.outline.entries
+        assert loaded.outline.lineStates == parsed.outline.lineStates
+        assert list(loaded.indentationProfile(TAB_WIDTH).nextSame) == list(parsed.indentationProfile(TAB_WIDTH).nextSame)
+        assert all(
+            loaded.blockExtents(TAB_WIDTH).extent(line) == parsed.blockExtents(TAB_WIDTH).extent(line)
+            for line in range(0, parsed.lineCount, 97)
+        )
+        results["fileKB"] = next(iter(cache._entries().values())) / 1024
+
+        # Suite d'ouvertures : un document sur cinq a été modifié depuis sa dernière ouverture
+        sources = [generatePythonSource(lineCount // 4, seed=number) for number in range(documents)]
+        sessionCache = OutlineCache(tempfile.mkdtemp(dir=directory), 256 * 1024 * 1024)
+        randomizer = random.Random(0)
+        for _ in range(openings):
+            number = randomizer.randrange(documents)
+            if randomizer.random() < 0.2:
+                sources[number] += f"\ndef edited_{randomizer.randrange(1 << 30)}():\n    pass\n"
+            _analyze(sources[number], sessionCache).saveToCache(TAB_WIDTH)
+        results["hitRate%"] = 100 * sessionCache.hits / (sessionCache.hits + sessionCache.misses)
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure le cache sur disque des structures : analyse, enregistrement, relecture.")
+    parser.add_argument("lines", type=int, nargs="?", default=20000, help="nombre de lignes du fichier généré")
+    lineCount = parser.parse_args().lines
+    if lineCount < 4 * MIN_LINES:
+        # Les documents de la suite d'ouvertures (lineCount // 4 lignes) doivent être mis en cache
+        parser.error(f"au moins {4 * MIN_LINES} lignes")
+    results = benchOutlineCache(lineCount)
+    print(f"Cache des structures, fichier de {lineCount} lignes")
+    for name, value in results.items():
+        unit = "ms" if name in ("parse", "store", "load") else ""
+        print(f"  {name:<12} {value:8.3f} {unit}")
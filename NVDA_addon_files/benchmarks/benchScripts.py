@@ -0,0 +1,117 @@
+# Benchmark de toutes les commandes de notepadPlusPlus.py sur un faux Notepad++
+#
+# Usage : python benchmarks/benchScripts.py [--lines 100 1000 10000 100000] [--latency 0.1] [--repeat 5]
+
+import argparse
+import logging
+import statistics
+import time
+
+from fakeNvda import FakeDocument, FakeEditWindow, installFakeNvda
+from generatedSources import generatePythonSource
+
+fake, notepadPlusPlus = installFakeNvda()
+
+# Commandes non mesurées : elles lancent un programme externe ou ouvrent une boîte de dialogue
+SKIPPED_SCRIPTS = ("executePythonCode", "showQuickOutline", "goToProjectSymbol")
+
+
+def scriptNames():
+    """
+    Retourne le nom (sans le préfixe script_) de chaque commande mesurable.
+    """
+    return [
+        name[len("script_"):]
+        for name in vars(notepadPlusPlus.AppModule)
+        if name.startswith("script_") and name[len("script_"):] not in SKIPPED_SCRIPTS
+    ]
+
+
+def _caretOffset(text):
+    # Début de la première ligne d'un corps de fonction situé au milieu du document
+    middle = text.find("\n", len(text) // 2) + 1
+    declaration = text.find("def ", middle)
+    if declaration == -1:
+        return middle
+    return text.find("\n", declaration) + 1
+
+
+def _runScript(module, document, text, caret, name):
+    # Exécute une commande depuis un état connu et mesure son temps et ses allers-retours
+    if document.text is not text:
+        document.setText(text)
+    # Une boîte de dialogue de la commande précédente a pu faire perdre le focus au module
+    module.edit = FakeEditWindow(document)
+    fake.focusedModule = module
+    document.caret = caret
+    document.selection = (caret, caret)
+    document.roundTrips = 0
+    fake.reset()
+    start = time.perf_counter()
+    getattr(module, "script_" + name)(None)
+    elapsed = (time.perf_counter() - start) * 1000
+    # Les commandes annoncent leurs exceptions au lieu de les laisser passer
+    errors = [message for message in fake.spoken if message.startswith("Erreur")]
+    if errors:
+        raise AssertionError(f"{name} : {errors[0]}")
+    return elapsed, document.roundTrips
+
+
+def benchScripts(lineCounts=(100, 1000, 10000, 100000), latency=0.0, repeat=5):
+    """
+    Exécute chaque commande sur des fichiers générés de différentes tailles.
+
+    Pour chaque commande, une première exécution à froid (module neuf, rien
+    en cache) est suivie de `repeat` exécutions à chaud depuis la même
+    position du curseur.
+
+    Parameters
+    ----------
+    lineCounts : iterable of int
+        Les tailles de fichier, en lignes.
+    latency : float
+        Le délai simulé de chaque aller-retour vers Notepad++, en secondes.
+    repeat : int
+        Le nombre d'exécutions à chaud.
+
+    Returns
+    -------
+    list of tuple
+        Une ligne par taille et par commande : (lignes, commande, temps à
+        froid en ms, allers-retours à froid, temps médian à chaud en ms,
+        allers-retours médians à chaud).
+    """
+    results = []
+    for lineCount in lineCounts:
+        text = generatePythonSource(lineCount)
+        caret = _caretOffset(text)
+        document = FakeDocument(text, latency)
+        fake.document = document
+        for name in scriptNames():
+            module = notepadPlusPlus.AppModule()
+            try:
+                coldTime, coldTrips = _runScript(module, document, text, caret, name)
+                warm = [_runScript(module, document, text, caret, name) for _ in range(repeat)]
+            finally:
+                module.terminate()
+            results.append((
+                lineCount, name, coldTime, coldTrips,
+                statistics.median(sample[0] for sample in warm),
+                statistics.median(sample[1] for sample in warm),
+            ))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure les commandes de notepadPlusPlus.py sur un faux Notepad++.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[100, 1000, 10000, 100000], help="tailles de fichier, en lignes")
+    parser.add_argument("--latency", type=float, default=0.0, help="délai de chaque aller-retour, en millisecondes")
+    parser.add_argument("--repeat", type=int, default=5, help="nombre d'exécutions à chaud")
+    arguments = parser.parse_args()
+
+    # Les messages de débogage du module fausseraient les mesures
+    logging.getLogger(notepadPlusPlus.__name__).setLevel(logging.WARNING)
+    results = benchScripts(arguments.lines, arguments.latency / 1000, arguments.repeat)
+    print(f"{'lignes':>7}  {'commande':<30} {'froid ms':>9} {'a/r':>5} {'chaud ms':>9} {'a/r':>5}")
+    for lineCount, name, coldTime, coldTrips, warmTime, warmTrips in results:
+        print(f"{lineCount:>7}  {name:<30} {coldTime:9.2f} {coldTrips:5d} {warmTime:9.2f} {warmTrips:5.0f}")
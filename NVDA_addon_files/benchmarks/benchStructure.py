@@ -0,0 +1,81 @@
+# Benchmark du moteur de structure : arbre des portées complet
+#
+# Usage : python benchmarks/benchStructure.py [nombre de lignes]
+
+import argparse
+import time
+
+from generatedSources import generatePythonSource
+from nppTools.blocks import BlockExtents
+from nppTools.indentation import IndentationProfile
+from nppTools.outline import buildOutline
+from nppTools.scopeIndex import ScopeIndex
+from nppTools.structure import buildScopeTree
+
+
+def _bestOf(function, repeat):
+    # Meilleur temps (en secondes) sur `repeat` exécutions
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchStructure(lineCount=10000, repeat=5):
+    """
+    Mesure la construction de l'arbre des portées, avec `ast` (code valide)
+    et avec l'analyseur tolérant (code en cours d'écriture), celle de la
+    table des fins de bloc et celle de l'index des portées, puis la
+    recherche de la portée de chaque ligne.
+
+    Parameters
+    ----------
+    lineCount : int
+        Le nombre de lignes du fichier généré.
+    repeat : int
+        Le nombre de répétitions de chaque mesure.
+
+    Returns
+    -------
+    dict
+        Les temps mesurés, en millisecondes.
+    """
+    text = generatePythonSource(lineCount)
+    # Une parenthèse non fermée à la fin rend le fichier invalide pour ast
+    brokenText = text + "value = call(\r\n"
+    parsedTree = buildScopeTree(text)
+    brokenTree = buildScopeTree(brokenText)
+    assert parsedTree.parsed and not brokenTree.parsed
+    # Les deux analyseurs doivent trouver les mêmes portées
+    assert [(scope.kind, scope.name, scope.startLine, scope.line) for scope in parsedTree] == [
+        (scope.kind, scope.name, scope.startLine, scope.line) for scope in brokenTree
+    ]
+    # La table des fins de bloc doit donner les mêmes étendues que ast
+    profile = IndentationProfile(text)
+    lineStates = buildOutline(text).lineStates
+    blocks = BlockExtents(profile, lineStates)
+    assert all(blocks.extent(scope.line) == (scope.startLine, scope.endLine) for scope in parsedTree)
+    # L'index doit trouver, pour chaque portée, la portée elle-même sur sa déclaration
+    assert all(parsedTree.scopeAt(scope.line) is scope for scope in parsedTree)
+    lines = range(parsedTree.lineCount)
+    return {
+        "ast": _bestOf(lambda: buildScopeTree(text), repeat) * 1000,
+        "tolerant": _bestOf(lambda: buildScopeTree(brokenText), repeat) * 1000,
+        "blocks": _bestOf(lambda: BlockExtents(profile, lineStates), repeat) * 1000,
+        "index": _bestOf(lambda: ScopeIndex(parsedTree), repeat) * 1000,
+        "scopeAt": _bestOf(lambda: [parsedTree.scopeAt(line) for line in lines], repeat) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure la construction de l'arbre des portées et des structures voisines.")
+    parser.add_argument("lines", type=int, nargs="?", default=10000, help="nombre de lignes du fichier généré")
+    lineCount = parser.parse_args().lines
+    results = benchStructure(lineCount)
+    print(f"Arbre des portées, fichier de {lineCount} lignes")
+    for name, milliseconds in results.items():
+        print(f"  {name:<12} {milliseconds:8.3f} ms")
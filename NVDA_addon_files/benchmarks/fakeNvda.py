@@ -0,0 +1,482 @@
+# Remplaçant en python pur des modules de NVDA et d'une fenêtre Scintilla
+#
+# Permet d'exécuter les commandes de notepadPlusPlus.py hors de Windows, pour
+# mesurer leur temps et leurs allers-retours vers Notepad++.
+
+import builtins
+import importlib
+import os
+import re
+import tempfile
+import sys
+import time
+import types
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "addon")
+
+# Messages Scintilla reconnus par le faux winUser.sendMessage
+SCI_GETTEXTLENGTH = 2183
+SCI_GETLENGTH = 2006
+SCI_DELETERANGE = 2645
+SCI_INSERTTEXT = 2003
+SCI_GETCODEPAGE = 2137
+SC_CP_UTF8 = 65001
+
+POSITION_ALL = "all"
+POSITION_CARET = "caret"
+POSITION_SELECTION = "selection"
+POSITION_FIRST = "first"
+POSITION_LAST = "last"
+UNIT_CHARACTER = "character"
+UNIT_LINE = "line"
+UNIT_STORY = "story"
+
+
+class Offsets:
+    """
+    Équivalent de textInfos.offsets.Offsets : un couple d'offsets.
+    """
+
+    def __init__(self, startOffset, endOffset):
+        self.startOffset = startOffset
+        self.endOffset = endOffset
+
+    def __eq__(self, other):
+        return (self.startOffset, self.endOffset) == (other.startOffset, other.endOffset)
+
+    def __repr__(self):
+        return f"Offsets({self.startOffset}, {self.endOffset})"
+
+
+class FakeDocument:
+    """
+    Le contenu d'une fenêtre Scintilla : texte, curseur et sélection.
+
+    Chaque échange qui, avec le vrai Notepad++, traverserait la frontière
+    entre processus est compté dans `roundTrips` et peut être ralenti de
+    `latency` secondes.
+
+    Parameters
+    ----------
+    text : str
+        Le texte du document (offsets en caractères).
+    latency : float
+        Le délai ajouté à chaque aller-retour, en secondes.
+    """
+
+    def __init__(self, text="", latency=0.0):
+        self.text = text
+        self.latency = latency
+        self.caret = 0
+        self.selection = (0, 0)
+        self.roundTrips = 0
+
+    def roundTrip(self):
+        """
+        Compte un aller-retour (et attend la latence simulée).
+        """
+        self.roundTrips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def setText(self, text):
+        """
+        Remplace le texte ; le curseur et la sélection sont ramenés dans le document.
+        """
+        self.text = text
+        self.caret = min(self.caret, len(text))
+        self.selection = (self.caret, self.caret)
+
+    def deleteRange(self, start, length):
+        """
+        Supprime une zone du texte, comme SCI_DELETERANGE.
+        """
+        self.text = self.text[:start] + self.text[start + length:]
+        self.caret = min(self.caret, start) if self.caret < start + length else self.caret - length
+        self.selection = (self.caret, self.caret)
+
+    def insertText(self, position, text):
+        """
+        Insère du texte, comme SCI_INSERTTEXT.
+        """
+        self.text = self.text[:position] + text + self.text[position:]
+        self.selection = (self.caret, self.caret)
+
+    def lineBounds(self, offset):
+        """
+        Offsets de début et de fin (saut de ligne compris) de la ligne contenant `offset`.
+        """
+        start = self.text.rfind("\n", 0, offset) + 1
+        end = self.text.find("\n", offset)
+        return start, len(self.text) if end == -1 else end + 1
+
+
+class FakeTextInfo:
+    """
+    Équivalent d'un ScintillaTextInfo de NVDA, basé sur des offsets.
+
+    Parameters
+    ----------
+    obj : FakeEditWindow
+        La fenêtre d'édition.
+    position : str or Offsets
+        Une constante POSITION_* ou des offsets.
+    """
+
+    def __init__(self, obj, position):
+        self.obj = obj
+        document = obj.document
+        if isinstance(position, Offsets):
+            self._start, self._end = position.startOffset, position.endOffset
+        elif position == POSITION_ALL:
+            document.roundTrip()
+            self._start, self._end = 0, len(document.text)
+        elif position == POSITION_CARET:
+            document.roundTrip()
+            self._start = self._end = document.caret
+        elif position == POSITION_SELECTION:
+            document.roundTrip()
+            self._start, self._end = document.selection
+        elif position == POSITION_FIRST:
+            self._start = self._end = 0
+        elif position == POSITION_LAST:
+            document.roundTrip()
+            self._start = self._end = len(document.text)
+        else:
+            raise NotImplementedError(position)
+
+    @property
+    def document(self):
+        return self.obj.document
+
+    @property
+    def bookmark(self):
+        return Offsets(self._start, self._end)
+
+    @property
+    def text(self):
+        self.document.roundTrip()
+        return self.document.text[self._start:self._end]
+
+    def copy(self):
+        return FakeTextInfo(self.obj, Offsets(self._start, self._end))
+
+    def collapse(self, end=False):
+        if end:
+            self._start = self._end
+        else:
+            self._end = self._start
+
+    def isCollapsed(self):
+        return self._start == self._end
+
+    def compareEndPoints(self, other, which):
+        selfEnd, otherEnd = {
+            "startToStart": (self._start, other._start),
+            "startToEnd": (self._start, other._end),
+            "endToStart": (self._end, other._start),
+            "endToEnd": (self._end, other._end),
+        }[which]
+        return (selfEnd > otherEnd) - (selfEnd < otherEnd)
+
+    def setEndPoint(self, other, which):
+        source = other._start if which.startswith("start") else other._end
+        if which.endswith("ToStart"):
+            self._start = source
+            self._end = max(self._end, source)
+        else:
+            self._end = source
+            self._start = min(self._start, source)
+
+    def expand(self, unit):
+        document = self.document
+        document.roundTrip()
+        if unit == UNIT_LINE:
+            self._start, self._end = document.lineBounds(self._start)
+        elif unit == UNIT_CHARACTER:
+            self._end = min(self._start + 1, len(document.text))
+        elif unit == UNIT_STORY:
+            self._start, self._end = 0, len(document.text)
+        else:
+            raise NotImplementedError(unit)
+
+    def move(self, unit, direction, endPoint=None):
+        """
+        Déplace le TextInfo (ou une de ses extrémités) de `direction` unités.
+
+        Returns
+        -------
+        int
+            Le nombre d'unités effectivement parcourues (signé).
+        """
+        document = self.document
+        document.roundTrip()
+        text = document.text
+        position = self._end if endPoint == "end" else self._start
+        moved = 0
+        step = 1 if direction > 0 else -1
+        while moved != direction:
+            if unit == UNIT_CHARACTER:
+                target = position + step
+                if not 0 <= target <= len(text):
+                    break
+            elif unit == UNIT_LINE:
+                lineStart, lineEnd = document.lineBounds(position)
+                if step > 0:
+                    # Pas de ligne suivante après la dernière ligne
+                    if lineEnd == position or (lineEnd == len(text) and not text.endswith("\n")):
+                        break
+                    target = lineEnd
+                else:
+                    if lineStart == 0:
+                        break
+                    target = document.lineBounds(lineStart - 1)[0]
+            else:
+                raise NotImplementedError(unit)
+            position = target
+            moved += step
+        if endPoint == "start":
+            self._start = position
+            self._end = max(self._end, position)
+        elif endPoint == "end":
+            self._end = position
+            self._start = min(self._start, position)
+        else:
+            self._start = self._end = position
+        return moved
+
+    def updateCaret(self):
+        document = self.document
+        document.roundTrip()
+        document.caret = self._start
+        document.selection = (self._start, self._start)
+
+    def updateSelection(self):
+        document = self.document
+        document.roundTrip()
+        document.selection = (self._start, self._end)
+        document.caret = self._end
+
+
+class FakeEditWindow:
+    """
+    Équivalent de l'objet NVDA d'une fenêtre d'édition Scintilla.
+
+    Parameters
+    ----------
+    document : FakeDocument
+        Le document affiché.
+    windowHandle : int
+        L'identifiant de la fenêtre.
+    """
+
+    windowClassName = "Scintilla"
+
+    def __init__(self, document, windowHandle=1):
+        self.document = document
+        self.windowHandle = windowHandle
+        self.processHandle = 1
+
+    def makeTextInfo(self, position):
+        return FakeTextInfo(self, position)
+
+    @property
+    def selection(self):
+        return FakeTextInfo(self, POSITION_SELECTION)
+
+
+class FakeNvda:
+    """
+    Les faux modules de NVDA installés dans sys.modules, et ce qu'ils ont reçu.
+
+    Attributes
+    ----------
+    spoken : list of str
+        Les messages passés à speech.speakMessage.
+    document : FakeDocument or None
+        Le document visé par les messages Scintilla (winUser.sendMessage).
+    messageBoxAnswer : int
+        La réponse des boîtes de dialogue (wx.YES par défaut).
+    focusedModule : AppModule or None
+        Le module de Notepad++ qui perd le focus (event_loseFocus) à
+        l'ouverture d'une boîte de dialogue ; il ne le retrouve pas avant
+        que la commande ne soit terminée.
+    repeatCount : int
+        La valeur de scriptHandler.getLastScriptRepeatCount.
+    windowTitle : str
+        Le titre de la fenêtre de Notepad++ (nom de api.getForegroundObject()).
+    configPath : str
+        Le répertoire de configuration de NVDA (globalVars.appArgs.configPath).
+    """
+
+    YES = 2
+    NO = 8
+
+    def __init__(self):
+        self.spoken = []
+        self.document = None
+        self.messageBoxAnswer = self.YES
+        self.focusedModule = None
+        self.repeatCount = 0
+        self.windowTitle = "new 1 - Notepad++"
+        self.configPath = os.path.join(tempfile.gettempdir(), "nppFakeNvdaConfig")
+
+    def reset(self):
+        del self.spoken[:]
+
+
+class _CallLater:
+    # Équivalent de wx.CallLater : la fonction n'est appelée que par fire()
+    def __init__(self, milliseconds, function, *args, **kwargs):
+        self.milliseconds = milliseconds
+        self.function = lambda: function(*args, **kwargs)
+        self.running = True
+
+    def IsRunning(self):
+        return self.running
+
+    def Restart(self, milliseconds=None):
+        self.milliseconds = milliseconds or self.milliseconds
+        self.running = True
+
+    def Stop(self):
+        self.running = False
+
+    def fire(self):
+        self.running = False
+        self.function()
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def _defaultValue(spec):
+    # Valeur par défaut d'une spécification configobj, par ex. "integer(default=4, min=1)"
+    listMatch = re.match(r"\w+_list\(default=list\((.*)\)", spec)
+    if listMatch is not None:
+        return re.findall(r'"([^"]*)"', listMatch.group(1))
+    match = re.match(r"(\w+)\(.*?default=([^,)]*)", spec)
+    if match is None:
+        return None
+    kind, value = match.groups()
+    value = value.strip().strip("'\"")
+    if kind == "integer":
+        return int(value)
+    if kind == "float":
+        return float(value)
+    if kind == "boolean":
+        return value.lower() in ("true", "1", "yes", "on")
+    return value
+
+
+class _ConfigSection(dict):
+    # Section de configuration qui prend la valeur par défaut de sa spécification
+    def __init__(self, spec):
+        super().__init__((key, _defaultValue(value)) for key, value in spec.items())
+
+
+class _Config(dict):
+    def __init__(self):
+        super().__init__()
+        self.spec = {}
+
+    def __missing__(self, key):
+        section = self[key] = _ConfigSection(self.spec[key])
+        return section
+
+
+def installFakeNvda():
+    """
+    Installe les faux modules de NVDA et importe le module de Notepad++.
+
+    Returns
+    -------
+    tuple of (FakeNvda, module)
+        L'état des faux modules et le module appModules.notepadPlusPlus.
+    """
+    fake = FakeNvda()
+    builtins.__dict__.setdefault("_", lambda message: message)
+
+    offsets = types.ModuleType("textInfos.offsets")
+    offsets.Offsets = Offsets
+    sys.modules["textInfos.offsets"] = offsets
+    _module(
+        "textInfos", offsets=offsets,
+        POSITION_ALL=POSITION_ALL, POSITION_CARET=POSITION_CARET, POSITION_SELECTION=POSITION_SELECTION,
+        POSITION_FIRST=POSITION_FIRST, POSITION_LAST=POSITION_LAST,
+        UNIT_CHARACTER=UNIT_CHARACTER, UNIT_LINE=UNIT_LINE, UNIT_STORY=UNIT_STORY,
+    )
+
+    class AppModule:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def terminate(self):
+            pass
+
+        def bindGesture(self, gestureIdentifier, scriptName):
+            if not hasattr(self, "script_" + scriptName):
+                raise LookupError(f"No such script: {scriptName}")
+            self.__dict__.setdefault("boundGestures", {})[gestureIdentifier] = scriptName
+
+    _module("appModuleHandler", AppModule=AppModule)
+    _module("speech", speakMessage=fake.spoken.append, cancelSpeech=lambda: None)
+    _module("ui", message=fake.spoken.append)
+    _module("config", conf=_Config())
+    _module("api", getForegroundObject=lambda: types.SimpleNamespace(name=fake.windowTitle))
+    # wx.CallAfter appelle directement la fonction, depuis le thread appelant
+    _module(
+        "wx", YES=FakeNvda.YES, NO=FakeNvda.NO, YES_NO=FakeNvda.YES | FakeNvda.NO, ICON_QUESTION=0x400,
+        CallAfter=lambda function, *args, **kwargs: function(*args, **kwargs),
+        CallLater=_CallLater,
+    )
+    def messageBox(*args, **kwargs):
+        # La boîte de dialogue prend le focus : NVDA signale sa perte au module
+        if fake.focusedModule is not None:
+            fake.focusedModule.event_loseFocus(None, lambda: None)
+        return fake.messageBoxAnswer
+
+    _module("gui", messageBox=messageBox)
+    _module("globalVars", appArgs=types.SimpleNamespace(configPath=fake.configPath))
+    _module("scriptHandler", getLastScriptRepeatCount=lambda: fake.repeatCount)
+
+    # Mémoire de Notepad++ : tampons alloués par le faux winKernel, par adresse
+    memory = {}
+
+    def sendMessage(windowHandle, message, wParam, lParam):
+        document = fake.document
+        document.roundTrip()
+        if message in (SCI_GETTEXTLENGTH, SCI_GETLENGTH):
+            return len(document.text)
+        if message == SCI_GETCODEPAGE:
+            return SC_CP_UTF8
+        if message == SCI_DELETERANGE:
+            return document.deleteRange(wParam, lParam)
+        if message == SCI_INSERTTEXT:
+            return document.insertText(wParam, memory[lParam].split(b"\0", 1)[0].decode("utf-8"))
+        raise NotImplementedError(message)
+
+    _module("winUser", sendMessage=sendMessage)
+
+    def virtualAllocEx(processHandle, address, size, allocationType, protection):
+        address = max(memory, default=0) + 1
+        memory[address] = bytes(size)
+        return address
+
+    def writeProcessMemory(processHandle, address, buffer, size, written):
+        memory[address] = bytes(buffer)[:size]
+
+    _module(
+        "winKernel", MEM_COMMIT=0x1000, MEM_RELEASE=0x8000, PAGE_READWRITE=0x04,
+        virtualAllocEx=virtualAllocEx, writeProcessMemory=writeProcessMemory,
+        virtualFreeEx=lambda processHandle, address, size, freeType: memory.pop(address, None),
+    )
+
+    if ADDON_DIR not in sys.path:
+        sys.path.insert(0, ADDON_DIR)
+    notepadPlusPlus = importlib.import_module("appModules.notepadPlusPlus")
+    return fake, notepadPlusPlus
@@ -0,0 +1,163 @@
+# Génération de fichiers python synthétiques pour les benchmarks
+
+import os
+import random
+import sys
+
+# Les modules nppTools sont en python pur : on les importe directement depuis l'add-on
+APP_MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "addon", "appModules")
+if APP_MODULES_DIR not in sys.path:
+    sys.path.insert(0, APP_MODULES_DIR)
+
+
+# Blocs d'instructions valides, insérés tels quels dans les corps de fonction
+_BODY_SNIPPETS = (
+    ("value = compute(value, {n})",),
+    ("if value > {n}:", "    return value"),
+    ("for item in range({n}):", "    total += item"),
+    ("# commentaire {n}",),
+    ("",),
+    ("result = call(", "    argument_{n},", ")"),
+    ('text = """', "def pas_une_fonction_{n}():", '"""'),
+)
+
+
+def _indent(snippet, prefix, n):
+    # Les lignes d'une chaîne multiligne restent telles quelles (sauf l'ouverture)
+    inString = False
+    for line in snippet:
+        yield line.format(n=n) if inString else (prefix + line.format(n=n)).rstrip()
+        if line.count('"""') == 1:
+            inString = not inString
+
+
+def generatePythonSource(lineCount, seed=0):
+    """
+    Génère un module python réaliste d'environ `lineCount` lignes.
+
+    Parameters
+    ----------
+    lineCount : int
+        Le nombre de lignes souhaité.
+    seed : int
+        La graine du générateur aléatoire, pour des sources reproductibles.
+
+    Returns
+    -------
+    str
+        Le texte du module, avec des fins de ligne "\\r\\n" comme dans Notepad++.
+    """
+    rng = random.Random(seed)
+    lines = ["import os", "import sys", ""]
+    n = 0
+    while len(lines) < lineCount - 2:
+        n += 1
+        if rng.random() < 0.3:
+            lines.append(f"def function_{n}(value, total=0):")
+            lines.append(f'    """Docstring de function_{n}."""')
+            for _ in range(rng.randrange(2, 8)):
+                lines.extend(_indent(rng.choice(_BODY_SNIPPETS), "    ", n))
+            lines.append("    return value")
+            lines.append("")
+        else:
+            lines.append(f"class Class{n}(object):")
+            lines.append(f'    """Docstring de Class{n}."""')
+            for method in range(rng.randrange(2, 6)):
+                prefix = "async def" if rng.random() < 0.1 else "def"
+                lines.append(f"    {prefix} method_{method}(self, value, total=0):")
+                for _ in range(rng.randrange(1, 6)):
+                    lines.extend(_indent(rng.choice(_BODY_SNIPPETS), "        ", n))
+                lines.append("        return value")
+                lines.append("")
+    lines.append('if __name__ == "__main__":')
+    lines.append("    main()")
+    return "\r\n".join(lines) + "\r\n"
+
+
+# Instructions des corps de fonction des langages à accolades : accolades dans
+# les chaînes et commentaires, blocs de contrôle, initialiseurs, lambdas
+_BRACE_BODY_SNIPPETS = {
+    "c": (
+        ("value = compute(value, {n});",),
+        ("if (value > {n}) {{", "    return value;", "}}"),
+        ("for (int i = 0; i < {n}; i++) {{", "    total += i;", "}}"),
+        ('const char *text = "}} {{ {n}";',),
+        ("/* commentaire {{ {n} */",),
+        ("int table[] = {{{n}, 2, 3}};",),
+        ("",),
+    ),
+    "java": (
+        ("value = compute(value, {n});",),
+        ("if (value > {n}) {{", "    return value;", "}} else {{", "    total++;", "}}"),
+        ("items.forEach(item -> {{", "    total += item;", "}});",),
+        ('String text = "}} {{ {n}";',),
+        ("// commentaire {{ {n}",),
+        ("",),
+    ),
+    "javascript": (
+        ("value = compute(value, {n});",),
+        ("if (value > {n}) {{", "  return value;", "}}"),
+        ("items.forEach((item) => {{", "  total += item;", "}});",),
+        ("const text = `}} ${{value}} {{ {n}`;",),
+        ("const pattern = /[{{]{n}/g;",),
+        ("const options = {{ size: {n}, name: 'x' }};",),
+        ("",),
+    ),
+}
+
+
+def generateBraceSource(lineCount, language="c", seed=0):
+    """
+    Génère un fichier C, Java ou JavaScript réaliste d'environ `lineCount` lignes.
+
+    Parameters
+    ----------
+    lineCount : int
+        Le nombre de lignes souhaité.
+    language : str
+        "c", "java" ou "javascript".
+    seed : int
+        La graine du générateur aléatoire, pour des sources reproductibles.
+
+    Returns
+    -------
+    tuple of (str, int)
+        Le texte, avec des fins de ligne "\\r\\n", et le nombre de classes,
+        fonctions et méthodes qu'il déclare.
+    """
+    rng = random.Random(seed)
+    snippets = _BRACE_BODY_SNIPPETS[language]
+    step = "  " if language == "javascript" else "    "
+    lines = ["// Fichier généré", ""]
+    declarations = 0
+    n = 0
+
+    def body(prefix):
+        for _ in range(rng.randrange(2, 7)):
+            lines.extend((prefix + line.format(n=n)).rstrip() for line in rng.choice(snippets))
+
+    while len(lines) < lineCount:
+        n += 1
+        if language == "c":
+            lines.append(f"int function_{n}(int value, int total)")
+            lines.append("{")
+            body(step)
+            lines.append(f"{step}return value;")
+            lines.append("}")
+            declarations += 1
+        else:
+            lines.append(f"class Class{n} {{" if language == "javascript" else f"public class Class{n} extends Base {{")
+            declarations += 1
+            for method in range(rng.randrange(2, 6)):
+                if language == "javascript":
+                    lines.append(f"{step}method_{method}(value, total = 0) {{")
+                else:
+                    lines.append(f"{step}@Override")
+                    lines.append(f"{step}public int method_{method}(int value, int total) throws Exception {{")
+                body(step * 2)
+                lines.append(f"{step * 2}return value;")
+                lines.append(f"{step}}}")
+                declarations += 1
+            lines.append("}")
+        lines.append("")
+    return "\r\n".join(lines) + "\r\n", declarations
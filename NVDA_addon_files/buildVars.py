@@ -36,6 +36,18 @@ This NVDA APP module helps to interact with Notepad++ for python development. It
 - **F7**: Move the cursor to the next class declaration  
 - **Shift+F7**: Move the cursor to the previous class declaration  
 - **F8**: Move the cursor to the next __main__ bloc if exists 
+- **Alt+F7**: List the classes, functions and methods of the document; type to filter the list (prefix or letters in order), Enter moves the cursor to the chosen symbol  
+- **NVDA+Shift+F7**: List the classes, functions and methods of every Python file in the folder of the document and its subfolders (`projectExcludes` option), type to filter, Enter opens the chosen file on the declaration; the index is saved between sessions and only changed files are parsed again  
+- **Control+F7**: Speak the classes and functions containing the cursor, outermost first, then its line number ("classe Parser > méthode parse_line, ligne 412 sur 9000")  
+- **Control+Shift+F7**: Toggle the automatic announcement of the scope when the cursor enters another class or function, once the cursor stays still (`announceScope` and `announceScopeDelay` options)  
+
+### Navigation by structure ###
+- **NVDA+Alt+DownArrow**: Move the cursor to the next class or function at the same level  
+- **NVDA+Alt+UpArrow**: Move the cursor to the previous class or function at the same level  
+- **NVDA+Alt+LeftArrow**: Move the cursor to the declaration of the enclosing class or function  
+- **NVDA+Alt+RightArrow**: Move the cursor to the first class or function inside the current one  
+- **NVDA+Alt+Shift+RightArrow**: Move the cursor to the last class or function inside the current one  
+Blank lines, comments, strings and continued lines are skipped: only declarations are visited.  
 
 ### Navigation by indentation level ###
 - **Alt+DownArrow**: Move the cursor to the next indentation level  
@@ -45,6 +57,13 @@ This NVDA APP module helps to interact with Notepad++ for python development. It
 - **Alt+Home**: Move the cursor to the first line of the current indentation level  
 - **Alt+End**: Move the cursor to the last line of the current indentation level  
 
+### Navigation by landmark ###
+- **Alt+PageDown**: Move the cursor to the next cell (`# %%` comment)  
+- **Alt+PageUp**: Move the cursor to the previous cell  
+- **Control+Alt+PageDown**: Move the cursor to the next region (`# region` comment)  
+- **Control+Alt+PageUp**: Move the cursor to the previous region  
+Landmarks and their shortcuts are configured with the `landmarks` option (`name|pattern|next gesture|previous gesture`).
+
 ### Bloc text selection ###
 - **Control+Shift+R**: Select the current class  
 - **Control+R**: Select the current function  
@@ -54,11 +73,28 @@ This NVDA APP module helps to interact with Notepad++ for python development. It
 ### Bloc text deletion ###
 - **Control+Shift+Delete**: Delete the current class  
 - **Control+Delete**: Delete the current function  
+- **Control+Shift+Insert**: Restore the last deleted class or function of the document, if it has not changed since  
 
 ### Python code execution ###
-- **Control+F5**: Execute Python code in a terminal  
+- **Control+F5**: Execute the selection or the whole file in the background, the exit status and the exception are spoken (`executionTimeout` option)  
+- **Control+Shift+F5**: Stop the running code (interrupt it in session mode)  
+- **Control+Alt+Shift+F5**: Toggle session mode: each document keeps one Python interpreter, code runs in its namespace and the value of a final expression is spoken  
+- **Control+Alt+F5**: Restart the session of the current document  
+In session mode, Control+F5 without a selection on a script split into `# %%` cells runs only the first changed cell and the cells after it.  
+- **Alt+F9**: Read the next line of the output  
+- **Alt+Shift+F9**: Read the previous line of the output  
+- **Control+Alt+F6**: Read the latest error line of the output  
+- **Control+F6**: Move the cursor to the line of the error of the last run; press again to go through the other calls of the traceback  
+- **Control+Shift+F6**: Speak the first syntax error of the document and move the cursor to it (checked in the background after a typing pause, `syntaxCheckDelay` option)  
+- **Alt+Shift+F6**: Silence the output read while the code runs  
+The output is read as it arrives, grouped and rate limited (`speakOutput` option); only the last `outputLines` lines are kept.  
+
+### Performance measurements ###
+- **Control+Shift+F12**: Speak the slowest commands (median, 95th percentile and maximum time); press twice to save all measurements to a file  
 
 ## Notes ##
+The structure commands (F2, F7, Alt+F7, Control+F7, NVDA+Alt+arrows, Control+R, Control+Shift+R and the deletions) also work in C, C++, Java, C# and JavaScript files, chosen by the file extension of the current tab: classes, structures, interfaces, namespaces, functions and methods are found by matching braces, ignoring comments and strings. The syntax check and code execution remain Python only.  
+The structure of large documents (outline, indentation and blocks) is saved in the NVDA configuration folder and read back when an unchanged file is reopened (`outlineCacheSize` option, in MB, 0 disables it).  
 This module is designed to enhance productivity while working with Python code in Notepad++ (32 bits only) using NVDA. Each shortcut is carefully assigned to streamline navigation and code manipulation.
 
 ---